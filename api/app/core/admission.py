@@ -0,0 +1,300 @@
+"""Admission control in front of the simulation engine.
+
+A fixed number of engine requests run at once; the rest wait in a bounded
+queue that is served round-robin across clients, so one busy client cannot
+starve the others. Requests that cannot be admitted fail fast with 429/503
+and a `Retry-After` header instead of slowing down everything already
+running.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+from api.app.core.config import get_settings
+from api.app.core.logging import get_logger
+from api.app.core.serialization import FastJSONResponse
+from src.utils.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+CLIENT_ID_HEADER = b"x-client-id"
+
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "forcepath_admission_wait_seconds", "Time admitted requests waited for an engine slot"
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "forcepath_admission_rejected_total",
+    "Engine requests turned away by admission control",
+    labels=("reason",),
+)
+
+
+class AdmissionRejected(Exception):
+    """A request was not admitted; carries the HTTP status and retry hint."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass
+class AdmissionStats:
+    """Counters and wait-time totals since startup."""
+
+    admitted: int = 0
+    rejected_queue_full: int = 0
+    rejected_client_limit: int = 0
+    timed_out: int = 0
+    waited: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, per-client fair wait queue.
+
+    Every waiting request holds a future in its client's FIFO. When a slot
+    frees up it is handed to the head of the least recently served client,
+    which keeps the queue fair between clients.
+
+    Rejections:
+      - 503 when `max_queue` requests are already waiting, or when a request
+        waited `queue_timeout` seconds without being admitted;
+      - 429 when the client already has `client_queue` requests waiting.
+
+    `Retry-After` is estimated from the average time a slot is held and the
+    current queue depth. All methods must be called from the event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        max_queue: int = 32,
+        client_queue: int = 8,
+        queue_timeout: float = 10.0,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.client_queue = client_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.stats = AdmissionStats()
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        # Exponentially weighted mean of how long a slot is held
+        self._service_seconds = 1.0
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a new request could be admitted."""
+        rounds = self.queued / max(1, self.max_concurrency) + 1
+        return max(1, math.ceil(self._service_seconds * rounds))
+
+    async def acquire(self, client: str) -> float:
+        """
+        Wait for an engine slot.
+
+        Args:
+            client: Key used for fair queuing (peer address or trusted client id)
+
+        Returns:
+            Seconds spent waiting in the queue
+
+        Raises:
+            AdmissionRejected: If the queue is full, the client's share is
+                used up, or the wait timed out
+        """
+        if self.active < self.max_concurrency and self.queued == 0:
+            self.active += 1
+            self.stats.admitted += 1
+            ADMISSION_WAIT_SECONDS.observe(0.0)
+            return 0.0
+
+        if self.queued >= self.max_queue:
+            self.stats.rejected_queue_full += 1
+            ADMISSION_REJECTED.inc(reason="queue_full")
+            raise AdmissionRejected(503, "Server is at capacity", self.retry_after())
+        waiters = self._waiters.setdefault(client, deque())
+        if len(waiters) >= self.client_queue:
+            self.stats.rejected_client_limit += 1
+            ADMISSION_REJECTED.inc(reason="client_limit")
+            raise AdmissionRejected(
+                429, "Too many queued requests for this client", self.retry_after()
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up: pass it on.
+                self.release()
+            else:
+                self._discard(client, future)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self.stats.timed_out += 1
+            ADMISSION_REJECTED.inc(reason="timeout")
+            raise AdmissionRejected(
+                503, "Timed out waiting for engine capacity", self.retry_after()
+            )
+
+        waited = time.monotonic() - started
+        self.stats.admitted += 1
+        self.stats.waited += 1
+        self.stats.wait_seconds_total += waited
+        self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+        ADMISSION_WAIT_SECONDS.observe(waited)
+        return waited
+
+    def release(self, held_seconds: float | None = None) -> None:
+        """Free a slot, handing it straight to the next waiter if there is one."""
+        if held_seconds is not None:
+            self._service_seconds += 0.2 * (held_seconds - self._service_seconds)
+        while self._waiters:
+            client, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            self.queued -= 1
+            if waiters:
+                self._waiters.move_to_end(client)
+            else:
+                del self._waiters[client]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, client: str) -> AsyncIterator[float]:
+        """Hold an engine slot for the duration of the block (see `acquire`)."""
+        waited = await self.acquire(client)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(time.monotonic() - started)
+
+    def _discard(self, client: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(client)
+        if waiters is None or future not in waiters:
+            return
+        waiters.remove(future)
+        self.queued -= 1
+        if not waiters:
+            del self._waiters[client]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current load and counters, for metrics and health checks."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "clients_waiting": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            **asdict(self.stats),
+        }
+
+
+def client_key(scope, trusted_proxies: list[str] | None = None) -> str:
+    """
+    Key a connection is queued under: its peer address.
+
+    The `X-Client-Id` header is only honoured on connections from
+    `trusted_proxies` (default: `admission_trusted_proxies`), since any other
+    caller could pick a fresh id per request to dodge the per-client limit.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "anonymous"
+    if trusted_proxies is None:
+        trusted_proxies = get_settings().admission_trusted_proxies
+    if peer in trusted_proxies:
+        client_id = dict(scope.get("headers") or []).get(CLIENT_ID_HEADER)
+        if client_id:
+            return client_id.decode("latin-1")
+    return peer
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    """Shared controller configured from settings, with its load exported as gauges."""
+    settings = get_settings()
+    controller = AdmissionController(
+        max_concurrency=settings.admission_max_concurrency,
+        max_queue=settings.admission_max_queue,
+        client_queue=settings.admission_client_queue,
+        queue_timeout=settings.admission_queue_timeout,
+    )
+    REGISTRY.gauge(
+        "forcepath_admission_active",
+        "Engine requests currently running",
+        function=lambda: controller.active,
+    )
+    REGISTRY.gauge(
+        "forcepath_admission_queued",
+        "Engine requests waiting for a slot",
+        function=lambda: controller.queued,
+    )
+    return controller
+
+
+class AdmissionMiddleware:
+    """
+    Gate engine endpoints (POST requests under `ADMISSION_PATHS`) behind the
+    AdmissionController.
+
+    The slot is held until the response has been fully sent, so streaming
+    endpoints count against the limit for as long as they compute steps.
+    Clients are told apart by `client_key`.
+    """
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController | None = None,
+        trusted_proxies: list[str] | None = None,
+    ) -> None:
+        self.app = app
+        self.controller = controller
+        self.trusted_proxies = trusted_proxies
+
+    def _applies(self, scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return False
+        path = scope["path"]
+        return any(path.startswith(prefix) for prefix in get_settings().admission_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller or get_admission_controller()
+        try:
+            await controller.acquire(client_key(scope, self.trusted_proxies))
+        except AdmissionRejected as e:
+            logger.warning("Request to %s rejected: %s", scope["path"], e.detail)
+            response = FastJSONResponse(
+                {"detail": e.detail},
+                status_code=e.status_code,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(time.monotonic() - started)
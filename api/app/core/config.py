@@ -23,6 +23,49 @@ class Settings(BaseSettings):
     api_port: int = 8000
     api_reload: bool = False
 
+    # Response encoding: round floats in JSON bodies and NDJSON lines to this
+    # many decimals (None keeps full precision); compress complete responses
+    # of at least this many bytes
+    response_float_digits: int | None = None
+    compression_min_size: int = 1024
+
+    # Engine: threads running simulations off the event loop, and threads
+    # decoding batch results concurrently
+    engine_workers: int = 4
+    decode_workers: int = 8
+
+    # Interactive transition sessions: LRU bound and idle TTL in seconds
+    max_sessions: int = 256
+    session_ttl_seconds: float = 900.0
+    # Most steps one WebSocket command may queue
+    channel_max_budget: int = 50
+
+    # Job queue: directory for the SQLite table and run files (default
+    # <repo>/runs/jobs), worker threads, the step limit per job and the
+    # seconds without heartbeat after which a running job is requeued
+    jobs_dir: str | None = None
+    job_workers: int = 2
+    job_max_steps: int = 200
+    job_lease_seconds: float = 60.0
+
+    # Admission control for engine endpoints: concurrent requests, waiting
+    # requests (in total and per client), seconds a request may wait, the
+    # path prefixes whose POST requests are gated, and the proxy addresses
+    # whose X-Client-Id header identifies the client
+    admission_max_concurrency: int = 4
+    admission_max_queue: int = 32
+    admission_client_queue: int = 8
+    admission_queue_timeout: float = 10.0
+    admission_paths: list[str] = ["/api/simulate", "/api/transition"]
+    admission_trusted_proxies: list[str] = []
+
+    # Request profiling: requests with `X-Profile: <profile_token>` are
+    # profiled (disabled while unset); profiles go to profiles_dir (default
+    # <repo>/runs/profiles); stack sampling interval in seconds
+    profile_token: str | None = None
+    profiles_dir: str | None = None
+    profile_sample_interval: float = 0.005
+
     # CORS
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
 
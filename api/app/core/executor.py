@@ -0,0 +1,53 @@
+"""Thread pool that runs blocking engine work off the event loop."""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import AsyncIterator, Callable, Iterator, TypeVar
+
+from api.app.core.config import get_settings
+from src.utils.metrics import bind_context
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+@lru_cache()
+def get_engine_executor() -> ThreadPoolExecutor:
+    """Shared executor for simulations (NumPy releases the GIL in the heavy parts)."""
+    return ThreadPoolExecutor(
+        max_workers=get_settings().engine_workers, thread_name_prefix="engine"
+    )
+
+
+async def run_in_pool(executor: Executor, func: Callable[..., T], *args, **kwargs) -> T:
+    """Run one blocking call on `executor`, in the caller's context."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, bind_context(partial(func, *args, **kwargs)))
+
+
+async def run_in_engine(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run one blocking engine call on the engine executor, in the caller's context."""
+    return await run_in_pool(get_engine_executor(), func, *args, **kwargs)
+
+
+async def iterate_in_executor(
+    iterator: Iterator[T], executor: ThreadPoolExecutor | None = None
+) -> AsyncIterator[T]:
+    """
+    Advance a blocking iterator on the engine executor, one item at a time.
+
+    The event loop stays free between items, so other requests and stream
+    flushes proceed while a step is being computed. Items are produced in
+    the caller's context, so engine spans reach the request's timings.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or get_engine_executor()
+    advance = bind_context(next)
+    while True:
+        item = await loop.run_in_executor(executor, advance, iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
@@ -0,0 +1,93 @@
+"""Opt-in profiling of single requests through the engine path."""
+from __future__ import annotations
+
+import asyncio
+import hmac
+import re
+import uuid
+from pathlib import Path
+
+from api.app.core.config import get_settings
+from api.app.core.logging import get_logger
+from api.app.core.serialization import FastJSONResponse
+from src.config.settings import get_settings as get_engine_settings
+from src.utils.profiling import PROFILE_MODES, ProfileSession
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_MODE_HEADER = b"x-profile-mode"
+REQUEST_ID_HEADER = b"x-request-id"
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def profiles_dir() -> Path:
+    settings = get_settings()
+    if settings.profiles_dir:
+        return Path(settings.profiles_dir)
+    return get_engine_settings().paths.repo_root / "runs" / "profiles"
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that carry `X-Profile: <PROFILE_TOKEN>`.
+
+    Disabled unless PROFILE_TOKEN is set; requests without the header or
+    with a wrong token run unprofiled. `X-Profile-Mode` picks "cprofile"
+    (default) or "sample". The profile id is the `X-Request-Id` header when
+    it is a safe file name, a random id otherwise, and is returned in
+    `X-Profile-Id`. The profile is written to PROFILES_DIR once the response
+    has been sent, streams included.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        token = get_settings().profile_token
+        if scope["type"] != "http" or not token:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        supplied = headers.get(PROFILE_HEADER, b"")
+        if not supplied or not hmac.compare_digest(supplied, token.encode("utf-8")):
+            await self.app(scope, receive, send)
+            return
+
+        mode = headers.get(PROFILE_MODE_HEADER, b"cprofile").decode("latin-1")
+        if mode not in PROFILE_MODES:
+            response = FastJSONResponse(
+                {"detail": f"Unknown profile mode: {mode}; expected one of {list(PROFILE_MODES)}"},
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")
+        profile_id = request_id if _SAFE_ID.match(request_id) else uuid.uuid4().hex
+        session = ProfileSession(
+            profile_id, mode=mode, interval=get_settings().profile_sample_interval
+        )
+        logger.info("Profiling %s %s as %s (%s)", scope["method"], scope["path"], profile_id, mode)
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", []))
+                    + [(b"x-profile-id", profile_id.encode("latin-1"))],
+                }
+            await send(message)
+
+        try:
+            with session.activate():
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            try:
+                path = await asyncio.to_thread(session.save, profiles_dir())
+                if path is None:
+                    logger.info("Profile %s is empty (no engine work ran)", profile_id)
+            except Exception as e:
+                logger.error("Saving profile %s failed: %s", profile_id, e, exc_info=True)
@@ -0,0 +1,225 @@
+"""JSON encoding, vector encoding and response compression for the API.
+
+orjson is used when installed (it serializes NumPy arrays natively); the
+standard library json module with a NumPy-aware default is the fallback.
+"""
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+from typing import Any, Sequence
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from api.app.core.config import get_settings
+
+try:  # optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Headers for NDJSON streams: every step is flushed as its own chunk, and
+# proxies must neither buffer nor recompress the stream.
+STREAM_HEADERS = {"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"}
+
+
+def _round_floats(value: Any, digits: int) -> Any:
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, np.ndarray) and value.dtype.kind == "f":
+        return np.round(value, digits)
+    if isinstance(value, np.floating):
+        return round(float(value), digits)
+    if isinstance(value, dict):
+        return {key: _round_floats(item, digits) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round_floats(item, digits) for item in value]
+    return value
+
+
+def _numpy_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any, float_digits: int | None = None) -> bytes:
+    """
+    Encode `value` as compact UTF-8 JSON.
+
+    NumPy arrays and scalars are accepted anywhere in `value`. With
+    `float_digits` every float is rounded to that many decimals first.
+    """
+    if float_digits is not None:
+        value = _round_floats(value, float_digits)
+    if orjson is not None:
+        return orjson.dumps(
+            value, default=_numpy_default, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(
+        value, default=_numpy_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def ndjson_line(value: Any) -> bytes:
+    """One NDJSON record, using the configured float rounding."""
+    return dumps(value, get_settings().response_float_digits) + b"\n"
+
+
+def encode_vector(
+    values: Sequence[float] | np.ndarray | None, encoding: str = "list"
+) -> list[float] | dict[str, Any] | None:
+    """
+    Encode a vector field for a response.
+
+    "list" keeps a plain JSON list. "base64_f16" packs little-endian float16
+    values as base64, about 2.7 bytes per element instead of ~20.
+    """
+    if values is None or encoding == "list":
+        return values if values is None or isinstance(values, list) else list(values)
+    if encoding != "base64_f16":
+        raise ValueError(f"Unknown vector encoding: {encoding}")
+    array = np.asarray(values, dtype="<f2")
+    return {
+        "encoding": encoding,
+        "shape": list(array.shape),
+        "data": base64.b64encode(array.tobytes()).decode("ascii"),
+    }
+
+
+def decode_vector(payload: list[float] | dict[str, Any]) -> np.ndarray:
+    """Inverse of `encode_vector`; returns float32."""
+    if isinstance(payload, list):
+        return np.asarray(payload, dtype=np.float32)
+    data = np.frombuffer(base64.b64decode(payload["data"]), dtype="<f2")
+    return data.reshape(payload["shape"]).astype(np.float32)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through `dumps` with the configured float rounding."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, get_settings().response_float_digits)
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token.lower()] = quality
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick "br" (when brotli is installed) or "gzip" from an Accept-Encoding header."""
+    accepted = _accepted_encodings(accept_encoding)
+    options = (["br"] if brotli is not None else []) + ["gzip"]
+    ranked = [
+        (accepted.get(name, accepted.get("*", 0.0)), -index, name)
+        for index, name in enumerate(options)
+    ]
+    quality, _, name = max(ranked)
+    return name if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli compression for complete responses.
+
+    Only responses delivered as a single body message are compressed.
+    Streaming responses (NDJSON) pass through untouched, so every step
+    still reaches the client as soon as it is written.
+    """
+
+    def __init__(self, app, minimum_size: int | None = None) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        minimum_size = self.minimum_size
+        if minimum_size is None:
+            minimum_size = get_settings().compression_min_size
+        start_message: dict | None = None
+        passthrough = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if start_message is not None:
+                response_headers = {
+                    key.lower(): value for key, value in start_message.get("headers", [])
+                }
+                body = message.get("body", b"")
+                eligible = (
+                    not message.get("more_body", False)
+                    and b"content-encoding" not in response_headers
+                    and not response_headers.get(b"content-type", b"").startswith(
+                        NDJSON_MEDIA_TYPE.encode()
+                    )
+                    and len(body) >= minimum_size
+                )
+                start, start_message = start_message, None
+                if not eligible:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressed = compress(body, encoding)
+                new_headers = [
+                    (key, value)
+                    for key, value in start.get("headers", [])
+                    if key.lower() != b"content-length"
+                ]
+                new_headers += [
+                    (b"content-encoding", encoding.encode()),
+                    (b"content-length", str(len(compressed)).encode()),
+                    (b"vary", b"Accept-Encoding"),
+                ]
+                await send({**start, "headers": new_headers})
+                await send({**message, "body": compressed})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
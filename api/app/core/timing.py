@@ -0,0 +1,66 @@
+"""Per-request stage timings and HTTP latency metrics."""
+from __future__ import annotations
+
+import time
+
+from src.utils.metrics import REGISTRY, Timings
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "forcepath_http_request_seconds",
+    "HTTP request latency until the response has been fully sent",
+    labels=("method", "handler", "status"),
+)
+
+
+def _handler_name(scope) -> str:
+    # Route names rather than paths keep the label set bounded (no session
+    # or job ids in the labels).
+    return getattr(scope.get("route"), "name", None) or "unmatched"
+
+
+class TimingMiddleware:
+    """
+    Collect engine stage timings for every HTTP request.
+
+    Spans finished before the response starts are reported in a
+    `Server-Timing` header together with `total` (time to first byte). For
+    streams that is little more than the set-up, so streaming endpoints
+    carry per-step timings in their verbose records instead. The complete
+    request duration feeds `forcepath_http_request_seconds`.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = round((time.perf_counter() - started) * 1000.0, 3)
+                header = ", ".join(filter(None, [timings.server_timing(), f"total;dur={total}"]))
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", []))
+                    + [(b"server-timing", header.encode("latin-1"))],
+                }
+            await send(message)
+
+        try:
+            with timings.collect():
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                handler=_handler_name(scope),
+                status=str(status),
+            )
@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.app.core.admission import AdmissionMiddleware
 from api.app.core.logging import setup_logging
-from api.app.routes import health, simulate, transition, ai
+from api.app.core.profiling import ProfilingMiddleware
+from api.app.core.serialization import CompressionMiddleware, FastJSONResponse
+from api.app.core.timing import TimingMiddleware
+from api.app.routes import health, simulate, transition, ai, forces, channel, jobs, metrics
 
 setup_logging()
 
@@ -10,9 +14,13 @@ app = FastAPI(
     title="ForcePath API",
     description="API for ForcePath social dynamics simulation engine",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
-
+# Profiling only covers admitted requests
+app.add_middleware(ProfilingMiddleware)
+# Inside CORS, so rejections still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["https://forcepath.dev"],
@@ -20,12 +28,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+# Outermost, so request latency includes admission waits and compression
+app.add_middleware(TimingMiddleware)
 
 # routers
 app.include_router(health.router, prefix="/api")
 app.include_router(simulate.router, prefix="/api")
 app.include_router(transition.router, prefix="/api")
 app.include_router(ai.router, prefix="/api")
+app.include_router(forces.router, prefix="/api")
+app.include_router(channel.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 # Render health check
 @app.get("/", include_in_schema=False)
@@ -8,6 +8,7 @@ from openai import OpenAI
 
 from api.app.core.config import get_settings
 from api.app.core.logging import get_logger
+from src.utils.openai_client import create_openai_client
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/ai", tags=["ai"])
@@ -30,7 +31,7 @@ def get_openai_client() -> OpenAI:
         logger.error("Attempted to initialize OpenAI client but OPENAI_API_KEY is missing")
         raise HTTPException(status_code=500, detail="OpenAI API key not configured")
         
-    return OpenAI(api_key=api_key)
+    return create_openai_client(api_key)
 
 
 class StepSummary(BaseModel):
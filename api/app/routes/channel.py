@@ -0,0 +1,199 @@
+"""WebSocket channel for interactive simulation control."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, get_args
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from api.app.core.admission import AdmissionRejected, client_key, get_admission_controller
+from api.app.core.config import get_settings
+from api.app.core.executor import run_in_engine, run_in_pool
+from api.app.core.logging import get_logger
+from api.app.core.serialization import dumps
+from api.app.routes.simulate import service
+from api.app.routes.utils import create_step_response, step_serialization
+from api.app.schemas.request import VectorEncoding
+
+logger = get_logger(__name__)
+
+router = APIRouter(tags=["simulation"])
+
+
+class SimulationChannel:
+    """
+    One engine session bound to one WebSocket connection.
+
+    Commands (client -> server), one JSON object per message:
+      {"type": "start", "sentence": str, "optimizer"?: str, "budget"?: int,
+       "verbose"?: bool, "vector_encoding"?: str}
+      {"type": "step", "count"?: int}     run `count` more steps (default 1)
+      {"type": "pause"}                   stop after the step in flight
+      {"type": "budget", "steps": int}    set the remaining steps and resume
+      {"type": "cancel"}                  drop the session and pending work
+
+    Events (server -> client): "started", "step" (as soon as a step is
+    computed), "decoded" (when its summary is ready), "paused", "idle"
+    (budget used up), "cancelled" and "error".
+
+    Steps run one at a time on the engine executor, each holding an
+    admission slot like an HTTP engine request; decodes run alongside on the
+    service's decode pool so the next step does not wait for the LLM. A
+    rejected step pauses the session with an "error" event carrying
+    `retry_after`. A `generation` counter discards results of work that was
+    in flight when the session was cancelled or restarted.
+    """
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        self.client = client_key(websocket.scope)
+        self.admission = get_admission_controller()
+        self.max_budget = get_settings().channel_max_budget
+        self.state = None
+        self.budget = 0
+        self.paused = False
+        self.verbose = False
+        self.vector_encoding = "list"
+        self.generation = 0
+        self.wake = asyncio.Event()
+        self.send_lock = asyncio.Lock()
+        self.decodes: set[asyncio.Task] = set()
+
+    async def send(self, event: dict[str, Any]) -> None:
+        async with self.send_lock:
+            await self.websocket.send_text(dumps(event).decode("utf-8"))
+
+    def _set_budget(self, steps: int) -> None:
+        self.budget = max(0, min(int(steps), self.max_budget))
+
+    def _reset(self) -> None:
+        self.generation += 1
+        self.state = None
+        self.budget = 0
+        for task in self.decodes:
+            task.cancel()
+        self.decodes.clear()
+
+    async def _engine(self, func, *args, **kwargs):
+        async with self.admission.slot(self.client):
+            return await run_in_engine(func, *args, **kwargs)
+
+    async def handle(self, message: dict[str, Any]) -> None:
+        kind = message.get("type")
+        if kind == "start":
+            vector_encoding = message.get("vector_encoding", "list")
+            if vector_encoding not in get_args(VectorEncoding):
+                raise ValueError(f"Unknown vector encoding: {vector_encoding}")
+            self._reset()
+            generation = self.generation
+            self.verbose = bool(message.get("verbose", False))
+            self.vector_encoding = vector_encoding
+            state = await self._engine(
+                service.start_state, message["sentence"], optimizer=message.get("optimizer")
+            )
+            if generation != self.generation:
+                return
+            self.state = state
+            self.paused = False
+            self._set_budget(message.get("budget", 0))
+            await self.send({"type": "started", "step": state.step, "budget": self.budget})
+        elif kind == "cancel":
+            self._reset()
+            await self.send({"type": "cancelled"})
+            return
+        elif self.state is None:
+            raise ValueError("No active session; send a 'start' command first")
+        elif kind == "step":
+            self.paused = False
+            self._set_budget(self.budget + int(message.get("count", 1)))
+        elif kind == "budget":
+            self.paused = False
+            self._set_budget(message["steps"])
+        elif kind == "pause":
+            self.paused = True
+            await self.send({"type": "paused", "step": self.state.step, "budget": self.budget})
+            return
+        else:
+            raise ValueError(f"Unknown command type: {kind}")
+        self.wake.set()
+
+    async def _decode(self, step_result, generation: int) -> None:
+        summary = await run_in_pool(service.decode_pool, service.decode_step, step_result)
+        if generation == self.generation:
+            await self.send({"type": "decoded", "step": step_result.step, "summary": summary})
+
+    async def work(self) -> None:
+        """Background loop that spends the step budget."""
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            ran = False
+            while self.state is not None and self.budget > 0 and not self.paused:
+                state, generation = self.state, self.generation
+                try:
+                    step_result, step_dict = await self._engine(
+                        service.advance_state, state, **step_serialization(self.verbose)
+                    )
+                    step = create_step_response(step_dict, self.verbose, self.vector_encoding)
+                except AdmissionRejected as e:
+                    logger.warning("Simulation channel step rejected: %s", e.detail)
+                    self.paused = True
+                    await self.send(
+                        {"type": "error", "detail": e.detail, "retry_after": e.retry_after}
+                    )
+                    break
+                except Exception as e:
+                    logger.error("Simulation channel step failed: %s", e, exc_info=True)
+                    self.paused = True
+                    await self.send({"type": "error", "detail": f"Step failed: {e}"})
+                    break
+                if generation != self.generation:
+                    break
+                self.budget -= 1
+                ran = True
+                payload = step.model_dump(exclude={"summary"})
+                await self.send({"type": "step", **payload, "budget": self.budget})
+
+                task = asyncio.create_task(self._decode(step_result, generation))
+                self.decodes.add(task)
+                task.add_done_callback(self.decodes.discard)
+            if ran and self.state is not None and self.budget == 0:
+                await self.send({"type": "idle", "step": self.state.step})
+
+    def close(self) -> None:
+        self._reset()
+
+
+@router.websocket("/ws/simulate")
+async def simulation_channel(websocket: WebSocket) -> None:
+    """
+    Interactive simulation over a WebSocket (see SimulationChannel for the protocol).
+
+    The engine state lives as long as the connection; disconnecting cancels
+    every pending step and decode.
+    """
+    await websocket.accept()
+    channel = SimulationChannel(websocket)
+    worker = asyncio.create_task(channel.work())
+    try:
+        while True:
+            message = await websocket.receive_json()
+            try:
+                await channel.handle(message)
+            except WebSocketDisconnect:
+                raise
+            except AdmissionRejected as e:
+                logger.warning("Simulation channel start rejected: %s", e.detail)
+                await channel.send(
+                    {"type": "error", "detail": e.detail, "retry_after": e.retry_after}
+                )
+            except Exception as e:
+                logger.warning("Simulation channel command failed: %s", e)
+                await channel.send({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        logger.info("Simulation channel closed by client")
+    except Exception as e:
+        logger.error("Simulation channel error: %s", e, exc_info=True)
+    finally:
+        worker.cancel()
+        channel.close()
@@ -0,0 +1,28 @@
+"""Force store endpoint."""
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+
+from api.app.core.logging import get_logger
+from api.app.routes.simulate import service
+from api.app.schemas.response import ForceStoreResponse
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/forces", tags=["forces"])
+
+
+@router.get("", response_model=ForceStoreResponse)
+async def forces() -> ForceStoreResponse:
+    """
+    Report the active force snapshot.
+
+    Force vectors and weights are hot-reloaded when `cache/force_vectors.npy`,
+    its manifest or `src/config/force_weights.json` change on disk, so the
+    version returned here shows which definitions new simulations will use.
+    """
+    try:
+        return ForceStoreResponse(**service.force_info())
+    except Exception as e:
+        logger.error("Force store error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Force store unavailable: {str(e)}")
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
+from api.app.core.admission import get_admission_controller
 from api.app.schemas.response import HealthResponse
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -14,5 +15,10 @@ async def health_check() -> HealthResponse:
     return HealthResponse(status="ok", version="1.0.0")
 
 
-
-
+@router.get("/admission")
+async def admission_status() -> dict:
+    """
+    Engine admission load: running and queued requests, admissions,
+    rejections by reason, timeouts and queue wait times.
+    """
+    return get_admission_controller().snapshot()
@@ -0,0 +1,119 @@
+"""Job queue endpoints for long simulations."""
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from api.app.core.config import get_settings
+from api.app.core.logging import get_logger
+from api.app.core.serialization import NDJSON_MEDIA_TYPE, STREAM_HEADERS, ndjson_line
+from api.app.routes.simulate import service
+from api.app.schemas.request import JobRequest
+from api.app.schemas.response import JobResponse
+from api.app.services.job_queue import TERMINAL_STATUSES, Job, get_job_queue
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Seconds between checks of a running job's run file while streaming
+STREAM_POLL_INTERVAL = 0.5
+
+
+def _job_response(job: Job) -> JobResponse:
+    queue = get_job_queue(service)
+    return JobResponse(
+        **{key: value for key, value in job.to_dict().items() if key in JobResponse.model_fields},
+        run_path=str(queue.run_path(job.id)),
+        store_path=str(queue.store_path(job.id)),
+    )
+
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_queue(service).store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+async def submit_job(request: JobRequest) -> JobResponse:
+    """
+    Queue a simulation that runs outside the HTTP request.
+
+    Jobs are not limited to the 5 steps of `/api/simulate`; the limit is
+    `JOB_MAX_STEPS`. Poll `GET /api/jobs/{id}` or follow
+    `GET /api/jobs/{id}/stream` for progress.
+    """
+    max_steps = get_settings().job_max_steps
+    if request.steps > max_steps:
+        raise HTTPException(status_code=422, detail=f"steps must be at most {max_steps}")
+    try:
+        job = get_job_queue(service).submit(
+            {
+                "sentence": request.sentence,
+                "optimizer": request.optimizer,
+                "decode": request.decode,
+            },
+            total=request.steps,
+            priority=request.priority,
+        )
+        return _job_response(job)
+
+    except Exception as e:
+        logger.error("Job submission error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Job submission failed: {str(e)}")
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str) -> JobResponse:
+    """Current status and progress of a job."""
+    return _job_response(_get_job(job_id))
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str) -> JobResponse:
+    """Cancel a job; a running job stops after its current step."""
+    _get_job(job_id)
+    return _job_response(get_job_queue(service).store.request_cancel(job_id))
+
+
+@router.get("/{job_id}/stream")
+async def stream_job(job_id: str) -> StreamingResponse:
+    """
+    Stream a job's step records as NDJSON, from its first step until it ends.
+
+    Records already computed are sent immediately; new ones follow as the
+    worker appends them to the run file. The last line is
+    `{"type": "status", ...}` with the final job state.
+    """
+    _get_job(job_id)
+    queue = get_job_queue(service)
+    run_path = queue.run_path(job_id)
+
+    async def generate():
+        offset = 0
+        pending = b""
+        while True:
+            job = queue.store.get(job_id)
+            if run_path.exists():
+                with run_path.open("rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                offset += len(data)
+                lines = (pending + data).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    if line:
+                        yield line + b"\n"
+            if job is None or job.status in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+        if job is not None:
+            yield ndjson_line({"type": "status", **_job_response(job).model_dump()})
+
+    return StreamingResponse(
+        generate(), media_type=NDJSON_MEDIA_TYPE, headers=STREAM_HEADERS
+    )
@@ -0,0 +1,23 @@
+"""Prometheus metrics endpoint."""
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.utils.metrics import REGISTRY
+
+router = APIRouter(prefix="/metrics", tags=["health"])
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    All metrics in the Prometheus text format.
+
+    Includes per-stage engine latency (`forcepath_stage_seconds`), HTTP
+    latency, upstream API calls and tokens, embedding cache lookups and
+    admission control load.
+    """
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
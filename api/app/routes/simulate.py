@@ -2,16 +2,35 @@
 from __future__ import annotations
 
 import asyncio
-import json
 
 from fastapi import APIRouter, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 
-from api.app.schemas.request import SimulateRequest
-from api.app.schemas.response import SimulateResponse
+from api.app.schemas.request import (
+    BatchSimulateRequest,
+    BeamRequest,
+    EnsembleRequest,
+    SimulateRequest,
+)
+from api.app.schemas.response import (
+    BeamResponse,
+    BeamTrajectoryResponse,
+    EnsembleResponse,
+    EnsembleStepResponse,
+    SimulateResponse,
+)
 from api.app.services.forcepath_service import ForcePathService
+from api.app.core.executor import iterate_in_executor, run_in_engine
 from api.app.core.logging import get_logger
-from api.app.routes.utils import create_step_response
+from api.app.core.serialization import NDJSON_MEDIA_TYPE, STREAM_HEADERS, ndjson_line
+from api.app.routes.utils import (
+    LIGHTWEIGHT_STEP_FIELDS,
+    complete_pending,
+    complete_pending_group,
+    completed_steps,
+    create_step_response,
+    step_serialization,
+)
 
 logger = get_logger(__name__)
 
@@ -98,10 +117,16 @@ async def simulate(
     try:
         steps = []
         sanitized_steps = max(1, min(5, request.steps))
-        for step_dict in service.simulate(
-            sentence=request.sentence, steps=sanitized_steps, decode=True
-        ):
-            step_response = create_step_response(step_dict, use_verbose)
+        pending_steps = service.simulate_pending(
+            sentence=request.sentence,
+            steps=sanitized_steps,
+            optimizer=request.optimizer,
+            **step_serialization(use_verbose),
+        )
+        async for step_dict in completed_steps(service, pending_steps):
+            step_response = create_step_response(
+                step_dict, use_verbose, request.vector_encoding
+            )
             steps.append(step_response)
 
         return SimulateResponse(success=True, steps=steps)
@@ -111,19 +136,153 @@ async def simulate(
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
 
+@router.post("/ensemble", response_model=EnsembleResponse)
+async def simulate_ensemble(request: EnsembleRequest) -> EnsembleResponse:
+    """
+    Run an ensemble of independent trajectories from one input sentence.
+
+    The sentence is embedded once and `members` trajectories are advanced
+    together as one batched computation. Each step reports the spread across
+    members instead of a single noisy trajectory.
+
+    **Response Fields (per step):**
+    - `mean_height`, `height_quantiles`: height distribution across members
+    - `force_score_distributions`: per-force mean/std/quantiles across members
+    - `best_member`, `best_height`, `best_trajectory`, `force_scores`: the best member
+    - `summary`: decoded description of the best member
+
+    No raw embedding vectors are returned.
+    """
+    try:
+        steps = []
+        sanitized_steps = max(1, min(5, request.steps))
+        pending_steps = service.ensemble_pending(
+            sentence=request.sentence,
+            steps=sanitized_steps,
+            members=request.members,
+            optimizer=request.optimizer,
+        )
+        async for step_dict in completed_steps(service, pending_steps):
+            steps.append(
+                EnsembleStepResponse(
+                    **{k: v for k, v in step_dict.items() if k != "best_vector"}
+                )
+            )
+
+        return EnsembleResponse(success=True, steps=steps)
+
+    except Exception as e:
+        logger.error("Ensemble simulation error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Ensemble simulation failed: {str(e)}")
+
+
+@router.post("/beam", response_model=BeamResponse)
+async def simulate_beam(request: BeamRequest) -> BeamResponse:
+    """
+    Explore the trajectory space with beam search.
+
+    Instead of keeping only the lowest-height candidate per step, the engine
+    keeps the `width` best candidates as parallel frontier states and returns
+    the `width` best trajectories, each with its per-step heights and a decoded
+    summary of its final state.
+
+    No raw embedding vectors are returned.
+    """
+    try:
+        sanitized_steps = max(1, min(5, request.steps))
+        pending = await run_in_engine(
+            service.beam_pending,
+            sentence=request.sentence,
+            steps=sanitized_steps,
+            width=request.width,
+            optimizer=request.optimizer,
+        )
+        # The final states of all trajectories are decoded concurrently.
+        trajectories = await asyncio.gather(
+            *(complete_pending(service, item) for item in pending)
+        )
+        return BeamResponse(
+            success=True,
+            trajectories=[
+                BeamTrajectoryResponse(
+                    **{k: v for k, v in item.items() if k != "final_vector"}
+                )
+                for item in trajectories
+            ],
+        )
+
+    except Exception as e:
+        logger.error("Beam search error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Beam search failed: {str(e)}")
+
+
+@router.post("/batch")
+async def simulate_batch(request: BatchSimulateRequest) -> StreamingResponse:
+    """
+    Simulate many scenarios in one request, streamed as NDJSON.
+
+    All sentences are embedded with a single embedding call and their
+    trajectories advance together in one batched computation on the engine
+    executor. Each line is one step of one item, tagged with the item `id`
+    (the list index when no id was given); lines of one step arrive before
+    any line of the next step.
+
+    **Example Output:**
+    ```
+    {"id": "a", "step": 0, "current_height": 123.3, "best_height": 5.1, "summary": "..."}
+    {"id": "b", "step": 0, "current_height": 98.7, "best_height": 4.9, "summary": "..."}
+    {"id": "a", "step": 1, "current_height": 90.2, "best_height": 4.3, "summary": "..."}
+    ```
+
+    With `verbose`, lines also carry `force_scores` and truncated vector previews.
+    """
+    ids = [
+        item.id if item.id is not None else str(index)
+        for index, item in enumerate(request.items)
+    ]
+
+    async def generate():
+        try:
+            groups = service.batch_pending(
+                sentences=[item.sentence for item in request.items],
+                steps=[item.steps for item in request.items],
+                optimizer=request.optimizer,
+                **step_serialization(request.verbose),
+            )
+            # Steps are computed on the engine executor; the items of each
+            # step are decoded together on the decode pool.
+            async for group in iterate_in_executor(groups):
+                step_dicts = await complete_pending_group(
+                    service, [pending for _, pending in group]
+                )
+                for (index, _), step_dict in zip(group, step_dicts):
+                    step_response = create_step_response(step_dict, request.verbose)
+                    yield ndjson_line({"id": ids[index], **step_response.model_dump()})
+        except asyncio.CancelledError:
+            logger.info("Batch stream cancelled (client disconnected)")
+        except Exception as e:
+            logger.error("Batch stream error: %s", e, exc_info=True)
+            yield ndjson_line({"error": str(e), "success": False})
+
+    return StreamingResponse(
+        generate(), media_type=NDJSON_MEDIA_TYPE, headers=STREAM_HEADERS
+    )
+
+
 async def _stream_simulation_steps(
-    sentence: str, steps: int, decode: bool = True
+    sentence: str, steps: int, decode: bool = True, optimizer: str | None = None
 ):
     """
     Async generator that yields simulation steps as they are computed.
     
-    This function wraps the synchronous service.simulate() generator
-    and yields lightweight step data suitable for streaming.
+    Steps are computed on the engine executor and decoded on the decode
+    pool, and are yielded as lightweight step data suitable for streaming.
     
     Args:
         sentence: Input sentence describing a social state
         steps: Number of simulation steps
         decode: Whether to decode steps to natural language
+        optimizer: Optimizer backend name, None for the server default
     
     Yields:
         Dictionary with only lightweight fields:
@@ -135,10 +294,14 @@ async def _stream_simulation_steps(
         }
     """
     try:
-        # Iterate over synchronous generator
-        # Since it yields step-by-step, we can iterate without blocking too long
         sanitized_steps = max(1, min(5, steps))
-        for step_dict in service.simulate(sentence=sentence, steps=sanitized_steps, decode=decode):
+        pending_steps = service.simulate_pending(
+            sentence=sentence,
+            steps=sanitized_steps,
+            optimizer=optimizer,
+            fields=LIGHTWEIGHT_STEP_FIELDS,
+        )
+        async for step_dict in completed_steps(service, pending_steps, decode=decode):
             lightweight_step = {
                 "step": step_dict["step"],
                 "current_height": step_dict["current_height"],
@@ -233,11 +396,11 @@ async def simulate_stream(request: SimulateRequest) -> StreamingResponse:
             async for step in _stream_simulation_steps(
                 sentence=request.sentence,
                 steps=request.steps,
-                decode=True
+                decode=True,
+                optimizer=request.optimizer,
             ):
-                # Serialize to JSON and add newline
-                json_line = json.dumps(step, ensure_ascii=False) + "\n"
-                yield json_line.encode("utf-8")
+                # Serialize to JSON and add newline; each step is its own chunk
+                yield ndjson_line(step)
                 
         except asyncio.CancelledError:
             # Client disconnected - this is expected, just log and exit
@@ -245,12 +408,12 @@ async def simulate_stream(request: SimulateRequest) -> StreamingResponse:
         except Exception as e:
             # Send error as final JSON line
             logger.error("Stream error: %s", e, exc_info=True)
-            error_line = json.dumps({"error": str(e), "success": False}, ensure_ascii=False) + "\n"
-            yield error_line.encode("utf-8")
+            yield ndjson_line({"error": str(e), "success": False})
     
     return StreamingResponse(
         generate(),
-        media_type="application/x-ndjson",
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=STREAM_HEADERS,
     )
 
 
@@ -277,19 +440,27 @@ async def simulate_stream_legacy(
     """
     use_verbose = verbose or request.verbose
 
-    def generate():
+    async def generate():
         try:
-            for step_dict in service.simulate(
-                sentence=request.sentence, steps=request.steps, decode=True
-            ):
+            pending_steps = service.simulate_pending(
+                sentence=request.sentence,
+                steps=request.steps,
+                optimizer=request.optimizer,
+                **step_serialization(use_verbose),
+            )
+            async for step_dict in completed_steps(service, pending_steps):
                 # Create lightweight or verbose response
-                step_response = create_step_response(step_dict, use_verbose)
+                step_response = create_step_response(
+                    step_dict, use_verbose, request.vector_encoding
+                )
                 # Convert to dict for JSON serialization
                 step_dict_clean = step_response.model_dump()
-                yield json.dumps(step_dict_clean) + "\n"
+                yield ndjson_line(step_dict_clean)
         except Exception as e:
             logger.error("Streaming simulation error: %s", e, exc_info=True)
             error_dict = {"error": str(e), "success": False}
-            yield json.dumps(error_dict) + "\n"
+            yield ndjson_line(error_dict)
 
-    return StreamingResponse(generate(), media_type="application/x-ndjson")
\ No newline at end of file
+    return StreamingResponse(
+        generate(), media_type=NDJSON_MEDIA_TYPE, headers=STREAM_HEADERS
+    )
\ No newline at end of file
@@ -3,11 +3,16 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query
 
-from api.app.schemas.request import TransitionRequest
-from api.app.schemas.response import TransitionResponse
+from api.app.core.executor import run_in_engine
+from api.app.schemas.request import SessionCreateRequest, TransitionRequest, VectorEncoding
+from api.app.schemas.response import (
+    SessionResponse,
+    SessionTransitionResponse,
+    TransitionResponse,
+)
 from api.app.services.forcepath_service import ForcePathService
 from api.app.core.logging import get_logger
-from api.app.routes.utils import create_step_response
+from api.app.routes.utils import complete_pending, create_step_response, step_serialization
 
 logger = get_logger(__name__)
 
@@ -45,15 +50,86 @@ async def transition(
     
     try:
         sanitized_steps = max(1, min(5, request.steps))
-        step_dict = service.transition(
-            sentence=request.sentence, steps=sanitized_steps, decode=True
+        pending = await run_in_engine(
+            service.transition_pending,
+            sentence=request.sentence,
+            steps=sanitized_steps,
+            optimizer=request.optimizer,
+            **step_serialization(use_verbose),
         )
+        step_dict = await complete_pending(service, pending)
         
         # Create lightweight or verbose response based on flag
-        step_response = create_step_response(step_dict, use_verbose)
+        step_response = create_step_response(
+            step_dict, use_verbose, request.vector_encoding
+        )
 
         return TransitionResponse(success=True, step=step_response)
 
     except Exception as e:
         logger.error("Transition error: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Transition failed: {str(e)}")
+
+
+@router.post("/sessions", response_model=SessionResponse)
+async def create_session(request: SessionCreateRequest) -> SessionResponse:
+    """
+    Start an interactive session from an input sentence.
+
+    The sentence is embedded once; each `POST /api/transition/{session_id}`
+    then advances the stored state by one step. Sessions expire after
+    `SESSION_TTL_SECONDS` without use, and the least recently used session
+    is evicted once `MAX_SESSIONS` are open.
+    """
+    try:
+        session = await run_in_engine(
+            service.create_session, request.sentence, optimizer=request.optimizer
+        )
+        return SessionResponse(success=True, **session)
+
+    except Exception as e:
+        logger.error("Session creation error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Session creation failed: {str(e)}")
+
+
+@router.post("/{session_id}", response_model=SessionTransitionResponse)
+async def advance_session(
+    session_id: str,
+    verbose: bool = Query(
+        False,
+        description="If True, include detailed fields (vectors, candidates). "
+        "If False (default), return only essential fields."
+    ),
+    vector_encoding: VectorEncoding = Query(
+        "list", description="Encoding of vector previews in verbose mode"
+    ),
+) -> SessionTransitionResponse:
+    """
+    Advance an interactive session by exactly one step.
+
+    Costs one optimization step plus decode: no embedding call and no
+    re-initialization. Returns 404 once the session has expired.
+    """
+    try:
+        pending = await run_in_engine(
+            service.advance_session_pending, session_id, **step_serialization(verbose)
+        )
+        step_dict = await complete_pending(service, pending)
+        step_response = create_step_response(step_dict, verbose, vector_encoding)
+        return SessionTransitionResponse(
+            success=True, session_id=session_id, step=step_response
+        )
+
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    except Exception as e:
+        logger.error("Session transition error: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Transition failed: {str(e)}")
+
+
+@router.delete("/{session_id}")
+async def close_session(session_id: str) -> dict:
+    """Close an interactive session and free its state."""
+    if not service.close_session(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    return {"success": True, "session_id": session_id}
@@ -1,14 +1,79 @@
 """Shared utilities for route handlers."""
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+from typing import Any, AsyncIterator, Iterator
 
+from api.app.core.executor import iterate_in_executor, run_in_pool
+from api.app.core.serialization import encode_vector
 from api.app.schemas.response import StepResponseLightweight, StepResponseVerbose
+from api.app.services.forcepath_service import ForcePathService, PendingStep
 
 # Safety limits to ensure response stays under 50KB
 MAX_VECTOR_PREVIEW_LENGTH = 10
 MAX_CANDIDATES_PREVIEW = 10
 
+# StepResult fields needed by the lightweight (verbose=False) responses
+LIGHTWEIGHT_STEP_FIELDS = ("step", "current_height", "best_height")
+
+
+def step_serialization(verbose: bool) -> dict[str, Any]:
+    """
+    Keyword arguments for ForcePathService.simulate()/transition() and their
+    *_pending() counterparts.
+
+    Lightweight responses never convert vectors or candidates; verbose ones
+    only convert the truncated previews they return and carry per-stage timings.
+    """
+    if not verbose:
+        return {"fields": LIGHTWEIGHT_STEP_FIELDS}
+    return {
+        "vector_limit": MAX_VECTOR_PREVIEW_LENGTH,
+        "candidate_limit": MAX_CANDIDATES_PREVIEW,
+        "timings": True,
+    }
+
+
+async def complete_pending(
+    service: ForcePathService, pending: PendingStep, decode: bool = True
+) -> dict[str, Any]:
+    """Decode a pending step on the service's decode pool and return its step dict."""
+    if decode:
+        await run_in_pool(service.decode_pool, service.decode_pending, pending)
+    return service.complete(pending, decode=False)
+
+
+async def complete_pending_group(
+    service: ForcePathService, group: list[PendingStep], decode: bool = True
+) -> list[dict[str, Any]]:
+    """
+    Decode pending steps concurrently on the decode pool and return their step dicts.
+
+    Steps are completed only once every decode finished, so steps sharing
+    timings (the items of one batch step) all report the same totals.
+    """
+    if decode:
+        await asyncio.gather(
+            *(
+                run_in_pool(service.decode_pool, service.decode_pending, pending)
+                for pending in group
+            )
+        )
+    return [service.complete(pending, decode=False) for pending in group]
+
+
+async def completed_steps(
+    service: ForcePathService, pending_steps: Iterator[PendingStep], decode: bool = True
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Step dicts of a *_pending() generator, without blocking the event loop.
+
+    Steps are computed on the engine executor and decoded on the decode
+    pool, so engine threads never sit idle waiting for an LLM response.
+    """
+    async for pending in iterate_in_executor(pending_steps):
+        yield await complete_pending(service, pending, decode)
+
 
 def truncate_vector(vector: list[float] | None, max_length: int = MAX_VECTOR_PREVIEW_LENGTH) -> list[float] | None:
     """Truncate vector to max_length elements for safety."""
@@ -30,13 +95,16 @@ def truncate_candidates(
     return candidates[:max_count]
 
 
-def create_step_response(step_dict: dict[str, Any], verbose: bool) -> StepResponseLightweight | StepResponseVerbose:
+def create_step_response(
+    step_dict: dict[str, Any], verbose: bool, vector_encoding: str = "list"
+) -> StepResponseLightweight | StepResponseVerbose:
     """
     Create step response based on verbose flag.
     
     Args:
         step_dict: Raw step data from service
         verbose: If True, include detailed fields (truncated). If False, only essential fields.
+        vector_encoding: "list" or "base64_f16" for vector previews (verbose only)
     
     Returns:
         StepResponseLightweight or StepResponseVerbose
@@ -51,14 +119,21 @@ def create_step_response(step_dict: dict[str, Any], verbose: bool) -> StepRespon
         )
     else:
         # Verbose: include detailed fields but truncated
+        candidates = truncate_candidates(step_dict.get("candidates"))
+        if candidates is not None and vector_encoding != "list":
+            candidates = [
+                {**candidate, "vector": encode_vector(candidate["vector"], vector_encoding)}
+                for candidate in candidates
+            ]
         return StepResponseVerbose(
             step=step_dict["step"],
             current_height=step_dict["current_height"],
             best_height=step_dict["best_height"],
             summary=step_dict.get("summary"),
             force_scores=step_dict.get("force_scores", {}),
-            best_vector_preview=truncate_vector(step_dict.get("best_vector")),
-            candidates_preview=truncate_candidates(step_dict.get("candidates")),
+            best_vector_preview=encode_vector(
+                truncate_vector(step_dict.get("best_vector")), vector_encoding
+            ),
+            candidates_preview=candidates,
+            timings=step_dict.get("timings"),
         )
-
-
@@ -1,24 +1,138 @@
 """Request schemas for API endpoints."""
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+Optimizer = Literal["cma", "gradient"]
+VectorEncoding = Literal["list", "base64_f16"]
+
 
 class SimulateRequest(BaseModel):
     sentence: str = Field(..., description="Input sentence describing a social state")
     steps: int = Field(default=1, ge=1, le=5, description="Number of simulation steps")
+    optimizer: Optimizer | None = Field(
+        default=None,
+        description="Optimizer backend ('cma' or 'gradient'). Defaults to the server setting.",
+    )
     verbose: bool = Field(
         default=False,
         description="If True, include detailed fields (vectors, candidates). "
         "If False (default), return only essential fields to keep response under 50KB."
     )
+    vector_encoding: VectorEncoding = Field(
+        default="list",
+        description="Encoding of vector previews in verbose mode: JSON lists ('list') "
+        "or base64 little-endian float16 ('base64_f16').",
+    )
 
 
 class TransitionRequest(BaseModel):
     sentence: str = Field(..., description="Input sentence describing a social state")
     steps: int = Field(default=1, ge=1, le=5, description="Number of transition steps")
+    optimizer: Optimizer | None = Field(
+        default=None,
+        description="Optimizer backend ('cma' or 'gradient'). Defaults to the server setting.",
+    )
     verbose: bool = Field(
         default=False,
         description="If True, include detailed fields (vectors, candidates). "
         "If False (default), return only essential fields to keep response under 50KB."
     )
+    vector_encoding: VectorEncoding = Field(
+        default="list",
+        description="Encoding of vector previews in verbose mode: JSON lists ('list') "
+        "or base64 little-endian float16 ('base64_f16').",
+    )
+
+
+class EnsembleRequest(BaseModel):
+    sentence: str = Field(..., description="Input sentence describing a social state")
+    steps: int = Field(default=1, ge=1, le=5, description="Number of simulation steps")
+    optimizer: Literal["cma"] | None = Field(
+        default=None,
+        description="Optimizer backend; only 'cma', since gradient descent would give "
+        "identical members. Defaults to the server setting.",
+    )
+    members: int = Field(
+        default=8, ge=1, le=64, description="Number of independent trajectories"
+    )
+
+
+class BeamRequest(BaseModel):
+    sentence: str = Field(..., description="Input sentence describing a social state")
+    steps: int = Field(default=1, ge=1, le=5, description="Number of simulation steps")
+    optimizer: Optimizer | None = Field(
+        default=None,
+        description="Optimizer backend ('cma' or 'gradient'). Defaults to the server setting.",
+    )
+    width: int = Field(
+        default=4, ge=1, le=8, description="Number of trajectories kept per step"
+    )
+
+
+class BatchItem(BaseModel):
+    id: str | None = Field(
+        default=None, description="Client tag echoed in every result line (default: list index)"
+    )
+    sentence: str = Field(..., description="Input sentence describing a social state")
+    steps: int = Field(default=1, ge=1, le=5, description="Number of simulation steps")
+
+
+class BatchSimulateRequest(BaseModel):
+    """Request for /api/simulate/batch.
+
+    Example:
+        {
+            "items": [
+                {"id": "a", "sentence": "Technology is advancing rapidly", "steps": 3},
+                {"id": "b", "sentence": "Trust in institutions is eroding", "steps": 2}
+            ]
+        }
+    """
+
+    items: list[BatchItem] = Field(
+        ..., min_length=1, max_length=64, description="Scenarios to simulate"
+    )
+    optimizer: Optimizer | None = Field(
+        default=None,
+        description="Optimizer backend ('cma' or 'gradient'). Defaults to the server setting.",
+    )
+    verbose: bool = Field(
+        default=False,
+        description="If True, include force scores and truncated vector previews per line.",
+    )
+
+
+class SessionCreateRequest(BaseModel):
+    sentence: str = Field(..., description="Input sentence describing a social state")
+    optimizer: Optimizer | None = Field(
+        default=None,
+        description="Optimizer backend ('cma' or 'gradient'). Defaults to the server setting.",
+    )
+
+
+class JobRequest(BaseModel):
+    """Request for POST /api/jobs.
+
+    Example:
+        {
+            "sentence": "Technology is advancing rapidly",
+            "steps": 50,
+            "priority": 5
+        }
+    """
+
+    sentence: str = Field(..., description="Input sentence describing a social state")
+    steps: int = Field(
+        default=10, ge=1, description="Number of simulation steps (up to JOB_MAX_STEPS)"
+    )
+    optimizer: Optimizer | None = Field(
+        default=None,
+        description="Optimizer backend ('cma' or 'gradient'). Defaults to the server setting.",
+    )
+    priority: int = Field(
+        default=0, ge=-10, le=10, description="Higher priorities are started first"
+    )
+    decode: bool = Field(default=True, description="Decode every step to natural language")
@@ -47,7 +47,8 @@ class StepResponseVerbose(BaseModel):
             "summary": "Natural language description...",
             "force_scores": {"security": 0.5, "sustainability": 0.3},
             "best_vector_preview": [0.1, 0.2, ...],  # First 10 elements only
-            "candidates_preview": [...]  # Max 10 candidates
+            "candidates_preview": [...],  # Max 10 candidates
+            "timings": {"sample": 1.8, "score": 0.4, "retrieve": 0.9, "llm": 812.5}
         }
     """
 
@@ -59,14 +60,19 @@ class StepResponseVerbose(BaseModel):
         default_factory=dict,
         description="Force alignment scores (all forces included)"
     )
-    best_vector_preview: list[float] | None = Field(
+    best_vector_preview: list[float] | dict[str, Any] | None = Field(
         None,
-        description="First 10 elements of best candidate embedding vector (truncated for safety)"
+        description="First 10 elements of best candidate embedding vector (truncated for safety); "
+        "an {encoding, shape, data} object when vector_encoding is 'base64_f16'"
     )
     candidates_preview: list[dict[str, Any]] | None = Field(
         None,
         description="First 10 candidate scores (truncated for safety)"
     )
+    timings: dict[str, float] | None = Field(
+        None,
+        description="Milliseconds spent per engine stage (embed, sample, score, retrieve, llm) on this step"
+    )
 
 
 # Alias for backward compatibility (will use lightweight by default)
@@ -114,6 +120,161 @@ class TransitionResponse(BaseModel):
     message: str | None = Field(None, description="Optional message")
 
 
+class SessionResponse(BaseModel):
+    """Response for POST /api/transition/sessions.
+
+    Example:
+        {
+            "success": true,
+            "session_id": "5f0c8d3e9a2b4c71a6e2d9b1f3c4e5a6",
+            "step": 0,
+            "ttl_seconds": 900.0
+        }
+    """
+
+    success: bool = Field(..., description="Whether the session was created")
+    session_id: str = Field(..., description="Id to pass to POST /api/transition/{session_id}")
+    step: int = Field(..., description="Index of the next step")
+    ttl_seconds: float = Field(..., description="Idle time after which the session expires")
+
+
+class SessionTransitionResponse(TransitionResponse):
+    """Response for POST /api/transition/{session_id}."""
+
+    session_id: str = Field(..., description="Session that was advanced")
+
+
+class EnsembleStepResponse(BaseModel):
+    """Aggregated statistics for one step of an ensemble simulation.
+
+    Example:
+        {
+            "step": 0,
+            "mean_height": 1.2345,
+            "height_quantiles": {"p10": 1.01, "p50": 1.22, "p90": 1.48},
+            "force_score_distributions": {
+                "security": {"mean": 0.5, "std": 0.02, "p10": 0.47, "p50": 0.5, "p90": 0.53}
+            },
+            "best_member": 3,
+            "best_height": 0.9876,
+            "best_trajectory": [0.9876],
+            "force_scores": {"security": 0.51},
+            "summary": "Natural language description of the best member..."
+        }
+    """
+
+    step: int = Field(..., description="Step number (0-indexed)")
+    mean_height: float = Field(..., description="Mean height across ensemble members")
+    height_quantiles: dict[str, float] = Field(
+        default_factory=dict, description="Height quantiles across members"
+    )
+    force_score_distributions: dict[str, dict[str, float]] = Field(
+        default_factory=dict,
+        description="Per-force mean, std and quantiles across members",
+    )
+    best_member: int = Field(..., description="Index of the lowest-height member")
+    best_height: float = Field(..., description="Height of the best member")
+    best_trajectory: list[float] = Field(
+        default_factory=list, description="Heights of the best member so far"
+    )
+    force_scores: dict[str, float] = Field(
+        default_factory=dict, description="Force scores of the best member"
+    )
+    summary: str | None = Field(None, description="Natural language summary of the best member")
+
+
+class EnsembleResponse(BaseModel):
+    """Response for /api/simulate/ensemble endpoint."""
+
+    success: bool = Field(..., description="Whether simulation completed successfully")
+    steps: list[EnsembleStepResponse] = Field(..., description="Per-step ensemble aggregates")
+    message: str | None = Field(None, description="Optional message")
+
+
+class BeamTrajectoryResponse(BaseModel):
+    """One trajectory surviving a beam search.
+
+    Example:
+        {
+            "rank": 0,
+            "heights": [1.12, 0.98],
+            "final_height": 0.98,
+            "force_scores": {"security": 0.51},
+            "summary": "Natural language description of the final state..."
+        }
+    """
+
+    rank: int = Field(..., description="Rank within the beam (0 is best)")
+    heights: list[float] = Field(..., description="Height at each step")
+    final_height: float = Field(..., description="Height of the final state")
+    force_scores: dict[str, float] = Field(
+        default_factory=dict, description="Force scores of the final state"
+    )
+    summary: str | None = Field(None, description="Natural language summary of the final state")
+
+
+class BeamResponse(BaseModel):
+    """Response for /api/simulate/beam endpoint."""
+
+    success: bool = Field(..., description="Whether the search completed successfully")
+    trajectories: list[BeamTrajectoryResponse] = Field(
+        ..., description="Best trajectories ordered from best to worst"
+    )
+    message: str | None = Field(None, description="Optional message")
+
+
+class ForceStoreResponse(BaseModel):
+    """Response for /api/forces endpoint.
+
+    Example:
+        {
+            "version": "3f9a1c2b7d4e",
+            "names": ["equality", "hierarchy"],
+            "weights": {"equality": 1.2, "hierarchy": 1.1},
+            "model_name": "text-embedding-3-small",
+            "source_hash": "9c1e..."
+        }
+    """
+
+    version: str = Field(..., description="Active force snapshot version")
+    names: list[str] = Field(..., description="Force names in scoring order")
+    weights: dict[str, float] = Field(..., description="Active force weights")
+    model_name: str | None = Field(None, description="Embedding model used for the force cache")
+    source_hash: str | None = Field(None, description="Hash of the force definition file")
+
+
+class JobResponse(BaseModel):
+    """State of a queued simulation job.
+
+    Example:
+        {
+            "id": "9b2f6c1e0d3a4f5b8c7d6e5f4a3b2c1d",
+            "status": "running",
+            "priority": 0,
+            "progress": 12,
+            "total": 50,
+            "created_at": 1760832000.0,
+            "started_at": 1760832001.5,
+            "finished_at": null,
+            "error": null,
+            "run_path": "runs/jobs/9b2f....jsonl",
+            "store_path": "runs/jobs/9b2f....store"
+        }
+    """
+
+    id: str = Field(..., description="Job id")
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    priority: int = Field(..., description="Scheduling priority (higher first)")
+    progress: int = Field(..., description="Completed steps")
+    total: int = Field(..., description="Requested steps")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    started_at: float | None = Field(None, description="Start time of the latest attempt")
+    finished_at: float | None = Field(None, description="Completion time")
+    error: str | None = Field(None, description="Failure reason")
+    run_path: str = Field(..., description="JSONL file receiving one record per step")
+    store_path: str = Field(..., description="Trajectory store written when the job succeeds")
+
+
 class HealthResponse(BaseModel):
     """Response for /api/health endpoint."""
 
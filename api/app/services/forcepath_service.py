@@ -9,15 +9,41 @@ The service does NOT contain engine logic itself - it delegates to src/ componen
 """
 from __future__ import annotations
 
-from typing import Generator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Generator, Sequence
 
+import numpy as np
+
+from api.app.core.config import get_settings
 from src.decoder.future_decoder import FutureDecoder
-from src.engine.simulator import Simulator, StepResult
+from api.app.services.session_store import SessionStore
+from src.engine.simulator import SimulationState, Simulator, StepResult
 from src.utils.logger import get_logger
+from src.utils.metrics import Timings, bind_context, timed
+from src.utils.profiling import profiled
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class PendingStep:
+    """
+    One computed step (or ensemble step, or beam trajectory) awaiting its decode.
+
+    Splitting the engine work from the LLM decode lets async callers run each
+    on its own pool: engine threads never wait on an upstream round trip.
+    """
+
+    result: dict
+    force_scores: Dict[str, float]
+    vector: np.ndarray
+    timings: Timings = field(default_factory=Timings)
+    # complete() adds the per-stage milliseconds as a "timings" field
+    report_timings: bool = False
+    label: str = "step"
+
+
 class ForcePathService:
     """Service for running ForcePath simulations.
     
@@ -40,8 +66,46 @@ class ForcePathService:
         # Uses src/decoder/future_decoder.py
         self.decoder = FutureDecoder()
 
+        # Interactive sessions: simulation states stepped one transition at a time
+        settings = get_settings()
+        self.sessions: SessionStore[SimulationState] = SessionStore(
+            max_sessions=settings.max_sessions, ttl_seconds=settings.session_ttl_seconds
+        )
+
+        # LLM decodes run here, never on the engine executor; the decodes of
+        # one batch step run concurrently (each is an upstream round trip)
+        self.decode_pool = ThreadPoolExecutor(
+            max_workers=settings.decode_workers, thread_name_prefix="decode"
+        )
+
+    def force_info(self) -> dict:
+        """
+        Describe the force snapshot new simulations will use.
+
+        The version changes whenever the force cache or weights file is
+        replaced on disk; running simulations keep the version they started with.
+        """
+        manager = self.simulator.height_calculator.force_interaction.manager.pinned()
+        data = manager.data
+        return {
+            "version": data.version,
+            "names": manager.names(),
+            "weights": {name: manager.weight(name) for name in manager.names()},
+            "model_name": data.manifest.get("model_name"),
+            "source_hash": data.manifest.get("source_hash"),
+        }
+
+    @profiled
     def simulate(
-        self, sentence: str, steps: int = 4, decode: bool = True
+        self,
+        sentence: str,
+        steps: int = 4,
+        decode: bool = True,
+        optimizer: str | None = None,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
     ) -> Generator[dict, None, None]:
         """
         Run a full simulation as a generator yielding step-by-step dicts.
@@ -58,6 +122,11 @@ class ForcePathService:
             sentence: Input sentence describing a social state
             steps: Number of simulation steps
             decode: Whether to decode steps to natural language (adds "summary" field)
+            optimizer: Optimizer backend name ("cma" or "gradient"), None for default
+            fields: StepResult fields to serialize, None for all of them
+            vector_limit: Keep only the leading vector elements, None for full vectors
+            candidate_limit: Keep only the first candidates, None for all
+            timings: Add per-stage milliseconds of each step ("timings" field)
         
         Yields:
             Dictionary containing step results with minimal but working JSON structure:
@@ -74,37 +143,340 @@ class ForcePathService:
         Raises:
             Exception: If simulation fails (with logging)
         """
+        for pending in self.simulate_pending(
+            sentence,
+            steps=steps,
+            optimizer=optimizer,
+            fields=fields,
+            vector_limit=vector_limit,
+            candidate_limit=candidate_limit,
+            timings=timings,
+        ):
+            yield self.complete(pending, decode=decode)
+
+    @profiled
+    def simulate_pending(
+        self,
+        sentence: str,
+        steps: int = 4,
+        optimizer: str | None = None,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> Generator[PendingStep, None, None]:
+        """
+        Engine part of simulate(): yields each step before it is decoded.
+
+        Pass the items to complete() (or decode them with decode_pending() on
+        the decode pool first) to get simulate()'s step dicts.
+        """
         logger.info("Starting simulation: sentence='%s', steps=%d", sentence, steps)
 
         try:
             # Simulator.run() handles:
             # - Embedding via src/embeddings/embedder.py embed_texts() (internal _embed_sentence)
             # - CMA-ES via src/engine/cma_runner.py CMARunner (runner.sample generates candidates)
-            for step_result in self.simulator.run(sentence, steps=steps):
-                # Convert StepResult to dict (minimal JSON structure)
-                # StepResult.to_dict() returns the required JSON structure
-                result_dict = step_result.to_dict()
-
-                # Decode candidate via src/decoder/future_decoder.py
-                # FutureDecoder.decode() converts vectors + force scores into natural language
-                if decode:
-                    try:
-                        summary_data = self.decoder.decode(
-                            step_result.force_scores, step_result.best_vector
-                        )
-                        result_dict["summary"] = summary_data.get("summary")
-                        logger.debug("Decoded summary for step %d", step_result.step)
-                    except Exception as e:
-                        logger.warning("Failed to decode step %d: %s", step_result.step, e)
-                        result_dict["summary"] = None
-
-                yield result_dict
+            for step_result, step_timings in timed(
+                self.simulator.run(sentence, steps=steps, optimizer=optimizer)
+            ):
+                # Convert StepResult to dict, materializing only the requested
+                # fields; vectors stay NumPy arrays until serialized here
+                yield PendingStep(
+                    result=step_result.to_dict(
+                        fields, vector_limit=vector_limit, candidate_limit=candidate_limit
+                    ),
+                    force_scores=step_result.force_scores,
+                    vector=step_result.best_vector,
+                    timings=step_timings,
+                    report_timings=timings,
+                    label=f"step {step_result.step}",
+                )
 
         except Exception as e:
             logger.error("Simulation failed: %s", e, exc_info=True)
             raise
 
-    def transition(self, sentence: str, steps: int = 1, decode: bool = True) -> dict:
+    @profiled
+    def decode_pending(self, pending: PendingStep) -> None:
+        """
+        Decode a pending step into its "summary" field (None if decoding fails).
+
+        Decode time is added to the step's timings.
+        """
+        # Decode candidate via src/decoder/future_decoder.py
+        # FutureDecoder.decode() converts vectors + force scores into natural language
+        with pending.timings.collect():
+            try:
+                summary_data = self.decoder.decode(pending.force_scores, pending.vector)
+                pending.result["summary"] = summary_data.get("summary")
+                logger.debug("Decoded summary for %s", pending.label)
+            except Exception as e:
+                logger.warning("Failed to decode %s: %s", pending.label, e)
+                pending.result["summary"] = None
+
+    def complete(self, pending: PendingStep, decode: bool = True) -> dict:
+        """
+        Finish a pending step into its step dict.
+
+        Args:
+            pending: Item from one of the *_pending() methods
+            decode: Decode it now (adds "summary"); pass False once decode_pending() ran
+        """
+        if decode:
+            self.decode_pending(pending)
+        if pending.report_timings:
+            pending.result["timings"] = pending.timings.milliseconds()
+        return pending.result
+
+    @profiled
+    def decode_step(self, step_result: StepResult) -> str | None:
+        """Decode one step result to its summary (None if decoding fails)."""
+        try:
+            return self.decoder.decode(
+                step_result.force_scores, step_result.best_vector
+            ).get("summary")
+        except Exception as e:
+            logger.warning("Failed to decode step %d: %s", step_result.step, e)
+            return None
+
+    @profiled
+    def simulate_batch(
+        self,
+        sentences: Sequence[str],
+        steps: Sequence[int],
+        decode: bool = True,
+        optimizer: str | None = None,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> Generator[tuple[int, dict], None, None]:
+        """
+        Simulate many sentences together, yielding results as steps complete.
+
+        The step results of one lockstep step (see batch_pending()) are
+        decoded concurrently on the decode pool.
+
+        Args:
+            sentences: Input sentences, one per item
+            steps: Number of simulation steps per item
+            decode: Whether to decode steps to natural language (adds "summary" field)
+            optimizer: Optimizer backend name ("cma" or "gradient"), None for default
+            fields: StepResult fields to serialize, None for all of them
+            vector_limit: Keep only the leading vector elements, None for full vectors
+            candidate_limit: Keep only the first candidates, None for all
+            timings: Add per-stage milliseconds of each lockstep step, shared
+                by all of its items ("timings" field)
+
+        Yields:
+            (item index, step dict) pairs in step order.
+        """
+        for group in self.batch_pending(
+            sentences,
+            steps,
+            optimizer=optimizer,
+            fields=fields,
+            vector_limit=vector_limit,
+            candidate_limit=candidate_limit,
+            timings=timings,
+        ):
+            if decode:
+                list(
+                    self.decode_pool.map(
+                        bind_context(self.decode_pending), [pending for _, pending in group]
+                    )
+                )
+            for item, pending in group:
+                yield item, self.complete(pending, decode=False)
+
+    @profiled
+    def batch_pending(
+        self,
+        sentences: Sequence[str],
+        steps: Sequence[int],
+        optimizer: str | None = None,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> Generator[list[tuple[int, PendingStep]], None, None]:
+        """
+        Engine part of simulate_batch(): yields each lockstep step before it is decoded.
+
+        Simulator.run_batch() embeds all sentences in one call and advances
+        every trajectory in lockstep with batched scoring. Every item is a
+        list of (item index, pending step) pairs, one per trajectory still
+        running; its pending steps share the lockstep step's timings, so
+        complete them only once all of them are decoded.
+        """
+        logger.info("Starting batch simulation: %d items", len(sentences))
+
+        try:
+            for step_results, step_timings in timed(
+                self.simulator.run_batch(sentences, steps=steps, optimizer=optimizer)
+            ):
+                yield [
+                    (
+                        item,
+                        PendingStep(
+                            result=step_result.to_dict(
+                                fields, vector_limit=vector_limit, candidate_limit=candidate_limit
+                            ),
+                            force_scores=step_result.force_scores,
+                            vector=step_result.best_vector,
+                            timings=step_timings,
+                            report_timings=timings,
+                            label=f"item {item} step {step_result.step}",
+                        ),
+                    )
+                    for item, step_result in step_results
+                ]
+
+        except Exception as e:
+            logger.error("Batch simulation failed: %s", e, exc_info=True)
+            raise
+
+    @profiled
+    def simulate_ensemble(
+        self,
+        sentence: str,
+        steps: int = 4,
+        members: int = 8,
+        decode: bool = True,
+        optimizer: str | None = None,
+    ) -> Generator[dict, None, None]:
+        """
+        Run an ensemble of trajectories as a generator yielding per-step aggregates.
+
+        All members share one embedding and are scored as a single batch by
+        Simulator.run_ensemble(); only the best member of each step is decoded,
+        so the decoding cost matches a single simulate() call.
+
+        Args:
+            sentence: Input sentence describing a social state
+            steps: Number of simulation steps
+            members: Number of independent trajectories
+            decode: Whether to decode the best member to natural language
+            optimizer: Optimizer backend name ("cma" or "gradient"), None for default
+
+        Yields:
+            Dictionary containing the EnsembleStepResult fields plus "summary".
+        """
+        for pending in self.ensemble_pending(
+            sentence, steps=steps, members=members, optimizer=optimizer
+        ):
+            yield self.complete(pending, decode=decode)
+
+    @profiled
+    def ensemble_pending(
+        self,
+        sentence: str,
+        steps: int = 4,
+        members: int = 8,
+        optimizer: str | None = None,
+    ) -> Generator[PendingStep, None, None]:
+        """Engine part of simulate_ensemble(): each step with its best member still undecoded."""
+        logger.info(
+            "Starting ensemble: sentence='%s', steps=%d, members=%d",
+            sentence,
+            steps,
+            members,
+        )
+
+        try:
+            for step_result in self.simulator.run_ensemble(
+                sentence, members=members, steps=steps, optimizer=optimizer
+            ):
+                yield PendingStep(
+                    result=step_result.to_dict(),
+                    force_scores=step_result.best_force_scores,
+                    vector=step_result.best_vector,
+                    label=f"ensemble step {step_result.step}",
+                )
+
+        except Exception as e:
+            logger.error("Ensemble simulation failed: %s", e, exc_info=True)
+            raise
+
+    @profiled
+    def simulate_beam(
+        self,
+        sentence: str,
+        steps: int = 4,
+        width: int = 4,
+        decode: bool = True,
+        optimizer: str | None = None,
+    ) -> list[dict]:
+        """
+        Run a beam search and return the best trajectories.
+
+        Simulator.run_beam() keeps the `width` lowest-height candidates per step
+        instead of only the single best one. The final state of every surviving
+        trajectory is decoded via FutureDecoder.decode().
+
+        Args:
+            sentence: Input sentence describing a social state
+            steps: Number of simulation steps
+            width: Beam width (number of trajectories kept per step)
+            decode: Whether to decode final states (adds "summary" field)
+            optimizer: Optimizer backend name ("cma" or "gradient"), None for default
+
+        Returns:
+            List of trajectory dicts ordered from best to worst.
+        """
+        return [
+            self.complete(pending, decode=decode)
+            for pending in self.beam_pending(
+                sentence, steps=steps, width=width, optimizer=optimizer
+            )
+        ]
+
+    @profiled
+    def beam_pending(
+        self,
+        sentence: str,
+        steps: int = 4,
+        width: int = 4,
+        optimizer: str | None = None,
+    ) -> list[PendingStep]:
+        """Engine part of simulate_beam(): the trajectories with their final states undecoded."""
+        logger.info(
+            "Starting beam search: sentence='%s', steps=%d, width=%d",
+            sentence,
+            steps,
+            width,
+        )
+
+        try:
+            return [
+                PendingStep(
+                    result=trajectory.to_dict(),
+                    force_scores=trajectory.force_scores,
+                    vector=trajectory.vectors[-1],
+                    label=f"beam trajectory {trajectory.rank}",
+                )
+                for trajectory in self.simulator.run_beam(
+                    sentence, width=width, steps=steps, optimizer=optimizer
+                )
+            ]
+
+        except Exception as e:
+            logger.error("Beam search failed: %s", e, exc_info=True)
+            raise
+
+    @profiled
+    def transition(
+        self,
+        sentence: str,
+        steps: int = 1,
+        decode: bool = True,
+        optimizer: str | None = None,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> dict:
         """
         Run a single-step CMA optimization returning a single dict.
         
@@ -123,6 +495,11 @@ class ForcePathService:
             sentence: Input sentence describing a social state
             steps: Number of transition steps (typically 1)
             decode: Whether to decode to natural language (adds "summary" field)
+            optimizer: Optimizer backend name ("cma" or "gradient"), None for default
+            fields: StepResult fields to serialize, None for all of them
+            vector_limit: Keep only the leading vector elements, None for full vectors
+            candidate_limit: Keep only the first candidates, None for all
+            timings: Add per-stage milliseconds of the step ("timings" field)
         
         Returns:
             Dictionary containing transition result with minimal but working JSON structure:
@@ -140,6 +517,34 @@ class ForcePathService:
             ValueError: If no transition result generated
             Exception: If transition fails (with logging)
         """
+        pending = self.transition_pending(
+            sentence,
+            steps=steps,
+            optimizer=optimizer,
+            fields=fields,
+            vector_limit=vector_limit,
+            candidate_limit=candidate_limit,
+            timings=timings,
+        )
+        return self.complete(pending, decode=decode)
+
+    @profiled
+    def transition_pending(
+        self,
+        sentence: str,
+        steps: int = 1,
+        optimizer: str | None = None,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> PendingStep:
+        """
+        Engine part of transition(): the first step, not yet decoded.
+
+        Raises:
+            ValueError: If no transition result generated
+        """
         logger.info("Starting transition: sentence='%s', steps=%d", sentence, steps)
 
         try:
@@ -147,25 +552,21 @@ class ForcePathService:
             # Simulator handles:
             # - Embedding via src/embeddings/embedder.py (internal _embed_sentence)
             # - CMA-ES via src/engine/cma_runner.py (runner.sample generates candidates)
-            step_result = next(self.simulator.run(sentence, steps=steps))
-            
-            # Convert StepResult to dict (minimal JSON structure)
-            result_dict = step_result.to_dict()
+            step_result, step_timings = next(
+                timed(self.simulator.run(sentence, steps=steps, optimizer=optimizer))
+            )
 
-            # Decode via src/decoder/future_decoder.py
-            # FutureDecoder.decode() converts vectors + force scores into natural language
-            if decode:
-                try:
-                    summary_data = self.decoder.decode(
-                        step_result.force_scores, step_result.best_vector
-                    )
-                    result_dict["summary"] = summary_data.get("summary")
-                    logger.debug("Decoded summary for transition")
-                except Exception as e:
-                    logger.warning("Failed to decode transition: %s", e)
-                    result_dict["summary"] = None
-
-            return result_dict
+            # Convert StepResult to dict, materializing only the requested fields
+            return PendingStep(
+                result=step_result.to_dict(
+                    fields, vector_limit=vector_limit, candidate_limit=candidate_limit
+                ),
+                force_scores=step_result.force_scores,
+                vector=step_result.best_vector,
+                timings=step_timings,
+                report_timings=timings,
+                label="transition",
+            )
 
         except StopIteration:
             error_msg = "No transition result generated"
@@ -174,3 +575,135 @@ class ForcePathService:
         except Exception as e:
             logger.error("Transition failed: %s", e, exc_info=True)
             raise
+
+    @profiled
+    def start_state(self, sentence: str, optimizer: str | None = None) -> SimulationState:
+        """Embed a sentence and return a simulation state for step-wise control."""
+        return self.simulator.start(sentence, optimizer=optimizer)
+
+    @profiled
+    def advance_state(
+        self,
+        state: SimulationState,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> tuple[StepResult, dict]:
+        """
+        Advance `state` by one step without decoding.
+
+        Returns:
+            (StepResult, step dict with the requested fields, plus "timings"
+            in milliseconds per stage when `timings` is set)
+        """
+        step_timings = Timings()
+        with step_timings.collect():
+            step_result = self.simulator.advance(state)
+        result_dict = step_result.to_dict(
+            fields, vector_limit=vector_limit, candidate_limit=candidate_limit
+        )
+        if timings:
+            result_dict["timings"] = step_timings.milliseconds()
+        return step_result, result_dict
+
+    @profiled
+    def create_session(self, sentence: str, optimizer: str | None = None) -> dict:
+        """
+        Embed a sentence once and store its simulation state for stepping.
+
+        Args:
+            sentence: Input sentence describing a social state
+            optimizer: Optimizer backend name ("cma" or "gradient"), None for default
+
+        Returns:
+            {"session_id": str, "step": 0, "ttl_seconds": float}
+        """
+        logger.info("Creating session: sentence='%s'", sentence)
+        state = self.start_state(sentence, optimizer=optimizer)
+        session = self.sessions.create(state)
+        return {
+            "session_id": session.session_id,
+            "step": state.step,
+            "ttl_seconds": self.sessions.ttl_seconds,
+        }
+
+    @profiled
+    def advance_session(
+        self,
+        session_id: str,
+        decode: bool = True,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> dict:
+        """
+        Advance a stored session by exactly one step.
+
+        Only the optimization step and the decode run; the sentence is not
+        re-embedded and the force snapshot stays the one the session started with.
+        Concurrent calls on one session are serialized.
+
+        Args:
+            session_id: Id returned by create_session()
+            decode: Whether to decode to natural language (adds "summary" field)
+            fields: StepResult fields to serialize, None for all of them
+            vector_limit: Keep only the leading vector elements, None for full vectors
+            candidate_limit: Keep only the first candidates, None for all
+            timings: Add per-stage milliseconds of the step ("timings" field)
+
+        Returns:
+            Step dict in the same shape as transition()
+
+        Raises:
+            KeyError: If the session does not exist or has expired
+        """
+        pending = self.advance_session_pending(
+            session_id,
+            fields=fields,
+            vector_limit=vector_limit,
+            candidate_limit=candidate_limit,
+            timings=timings,
+        )
+        return self.complete(pending, decode=decode)
+
+    @profiled
+    def advance_session_pending(
+        self,
+        session_id: str,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+        timings: bool = False,
+    ) -> PendingStep:
+        """
+        Engine part of advance_session(): the next step, not yet decoded.
+
+        Raises:
+            KeyError: If the session does not exist or has expired
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+
+        step_timings = Timings()
+        with step_timings.collect():
+            with session.lock:
+                step_result, result_dict = self.advance_state(
+                    session.value,
+                    fields=fields,
+                    vector_limit=vector_limit,
+                    candidate_limit=candidate_limit,
+                )
+        return PendingStep(
+            result=result_dict,
+            force_scores=step_result.force_scores,
+            vector=step_result.best_vector,
+            timings=step_timings,
+            report_timings=timings,
+            label=f"session {session_id} step {step_result.step}",
+        )
+
+    def close_session(self, session_id: str) -> bool:
+        return self.sessions.delete(session_id)
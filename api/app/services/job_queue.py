@@ -0,0 +1,371 @@
+"""Persistent job queue for long simulations.
+
+Jobs live in a local SQLite table and are executed by an in-process worker
+pool; no external broker is involved. Every job streams its steps into a
+JSONL run file (see RunWriter) and is ingested into a trajectory store when
+it finishes. Several processes may share one table: a running job is leased
+to the process that claimed it, which renews the lease by heartbeat.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from api.app.core.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    get_admission_controller,
+)
+from api.app.core.config import get_settings
+from api.app.core.executor import run_in_engine
+from api.app.core.logging import get_logger
+from src.config.settings import get_settings as get_engine_settings
+from src.utils.io_utils import RunWriter, ensure_directory
+from src.utils.math_utils import as_compute_array
+from src.utils.trajectory_store import ingest_runs
+
+logger = get_logger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+JOB_FIELDS = ("step", "current_height", "best_height", "best_vector", "force_scores")
+# Admission key job steps queue under, next to the HTTP and WebSocket clients
+JOB_CLIENT = "jobs"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at);
+"""
+
+# Columns added after the first release, for tables created before them
+_ADDED_COLUMNS = {"owner": "TEXT", "heartbeat_at": "REAL"}
+
+
+@dataclass
+class Job:
+    id: str
+    status: str
+    priority: int
+    params: dict
+    progress: int
+    total: int
+    created_at: float
+    started_at: float | None
+    finished_at: float | None
+    error: str | None
+    cancel_requested: bool
+    owner: str | None = None
+    heartbeat_at: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class JobStore:
+    """SQLite-backed job table. Every call opens its own connection, so it is thread-safe."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        ensure_directory(db_path.parent)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _job(row: sqlite3.Row | None) -> Job | None:
+        if row is None:
+            return None
+        data = dict(row)
+        data["params"] = json.loads(data["params"])
+        data["cancel_requested"] = bool(data["cancel_requested"])
+        return Job(**data)
+
+    def create(self, params: dict, total: int, priority: int) -> Job:
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, priority, params, total, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, priority, json.dumps(params), total, time.time()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def claim(self, owner: str = "") -> Job | None:
+        """Atomically move the highest-priority, oldest queued job to running under `owner`."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' "
+                "ORDER BY priority DESC, created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ? "
+                "WHERE id = ?",
+                (now, owner, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        return self.get(row["id"])
+
+    def set_progress(self, job_id: str, progress: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ?",
+                (progress, time.time(), job_id),
+            )
+
+    def heartbeat(self, owner: str) -> int:
+        """Renew the lease on every job `owner` is running."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ?",
+                (time.time(), owner),
+            )
+            return cursor.rowcount
+
+    def finish(self, job_id: str, status: str, error: str | None = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+
+    def request_cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued job now, or flag a running one to stop after its current step."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+        return self.get(job_id)
+
+    def requeue_stale(self, lease_seconds: float) -> int:
+        """
+        Put running jobs whose lease expired back in the queue.
+
+        A job's lease lapses when its owner has not sent a heartbeat for
+        `lease_seconds`, i.e. the process running it died. Jobs of live
+        processes, this one or others, are left alone.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL "
+                "WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (time.time() - lease_seconds,),
+            )
+            return cursor.rowcount
+
+
+class JobQueue:
+    """
+    In-process worker pool draining a JobStore.
+
+    Workers claim jobs by priority, then age. A job advances one step at a
+    time through ForcePathService.advance_state(), appends each step to
+    `<jobs_dir>/<id>.jsonl` and records its progress. Engine calls are
+    admitted like API requests (under the `JOB_CLIENT` key) and run on the
+    engine executor, both on the event loop passed to `start`.
+
+    Claimed jobs are leased to this process, whose heartbeat renews the lease
+    every `lease_seconds / 3`. Jobs whose lease expired, because the process
+    running them died, are requeued and resume from the last step in their
+    run file. A worker stops a job it no longer owns. Finished runs are
+    ingested into `<jobs_dir>/<id>.store`.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        service,
+        jobs_dir: Path,
+        workers: int = 2,
+        lease_seconds: float = 60.0,
+        admission: AdmissionController | None = None,
+    ) -> None:
+        self.store = store
+        self.service = service
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.admission = admission
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._wake = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        ensure_directory(jobs_dir)
+
+    def run_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.jsonl"
+
+    def store_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.store"
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self._requeue_stale()
+        targets = [(self._heartbeat, "job-heartbeat")]
+        targets += [(self._work, f"job-worker-{index}") for index in range(self.workers)]
+        for target, name in targets:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _requeue_stale(self) -> None:
+        requeued = self.store.requeue_stale(self.lease_seconds)
+        if requeued:
+            logger.info("Requeued %d jobs whose lease expired", requeued)
+            with self._wake:
+                self._wake.notify_all()
+
+    def _heartbeat(self) -> None:
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                self.store.heartbeat(self.owner)
+                self._requeue_stale()
+            except Exception as e:
+                logger.error("Job heartbeat failed: %s", e, exc_info=True)
+
+    def submit(self, params: dict, total: int, priority: int) -> Job:
+        job = self.store.create(params, total=total, priority=priority)
+        with self._wake:
+            self._wake.notify()
+        return job
+
+    def _work(self) -> None:
+        while True:
+            job = self.store.claim(self.owner)
+            if job is None:
+                with self._wake:
+                    # The timeout also picks up jobs submitted by other processes.
+                    self._wake.wait(timeout=1.0)
+                continue
+            self._execute(job)
+
+    async def _admitted(self, func, *args, **kwargs):
+        admission = self.admission or get_admission_controller()
+        while True:
+            try:
+                async with admission.slot(JOB_CLIENT):
+                    return await run_in_engine(func, *args, **kwargs)
+            except AdmissionRejected as e:
+                # Jobs are not latency-sensitive: back off instead of failing.
+                await asyncio.sleep(e.retry_after)
+
+    def _engine(self, func, *args, **kwargs):
+        """Run one engine call through admission control on the engine executor."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._admitted(func, *args, **kwargs), self.loop
+        )
+        return future.result()
+
+    def _execute(self, job: Job) -> None:
+        params = job.params
+        logger.info("Running job %s (%d steps)", job.id, job.total)
+        try:
+            with RunWriter(self.run_path(job.id), resume=True) as writer:
+                last = writer.last_record
+                if last is not None:
+                    state = self._engine(
+                        self.service.simulator.start_from_vector,
+                        as_compute_array(last["best_vector"]),
+                        optimizer=params.get("optimizer"),
+                    )
+                    state.step = last["step"] + 1
+                else:
+                    state = self._engine(
+                        self.service.start_state,
+                        params["sentence"],
+                        optimizer=params.get("optimizer"),
+                    )
+
+                while state.step < job.total:
+                    current = self.store.get(job.id)
+                    if current is None or current.owner != self.owner:
+                        logger.warning("Job %s is no longer leased to this process", job.id)
+                        return
+                    if current.cancel_requested:
+                        self.store.finish(job.id, "cancelled")
+                        return
+                    step_result, record = self._engine(
+                        self.service.advance_state, state, fields=JOB_FIELDS
+                    )
+                    if params.get("decode", True):
+                        record["summary"] = self.service.decode_step(step_result)
+                    writer.write(record)
+                    self.store.set_progress(job.id, state.step)
+
+            ingest_runs([self.run_path(job.id)], self.store_path(job.id), file_format="npy")
+            self.store.finish(job.id, "succeeded")
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, e, exc_info=True)
+            self.store.finish(job.id, "failed", error=str(e))
+
+
+@lru_cache()
+def get_job_queue(service) -> JobQueue:
+    """
+    Shared queue bound to `service`; its workers start on first use.
+
+    Must first be called from the event loop that serves the API.
+    """
+    settings = get_settings()
+    jobs_dir = (
+        Path(settings.jobs_dir)
+        if settings.jobs_dir
+        else get_engine_settings().paths.repo_root / "runs" / "jobs"
+    )
+    queue = JobQueue(
+        JobStore(jobs_dir / "jobs.sqlite3"),
+        service,
+        jobs_dir,
+        workers=settings.job_workers,
+        lease_seconds=settings.job_lease_seconds,
+    )
+    queue.start(asyncio.get_running_loop())
+    return queue
@@ -0,0 +1,76 @@
+"""Bounded in-memory store for interactive simulation sessions."""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Session(Generic[T]):
+    """One stored value plus the lock that serializes work on it."""
+
+    session_id: str
+    value: T
+    expires_at: float
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class SessionStore(Generic[T]):
+    """
+    Thread-safe session map with LRU and TTL eviction.
+
+    At most `max_sessions` sessions are kept; creating one more evicts the
+    least recently used. A session expires `ttl_seconds` after its last
+    access. Expired sessions are dropped lazily on every access.
+    """
+
+    def __init__(self, max_sessions: int = 256, ttl_seconds: float = 900.0) -> None:
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: OrderedDict[str, Session[T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        # Sessions are ordered by last access, so expired ones are at the front.
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+
+    def create(self, value: T) -> Session[T]:
+        now = time.monotonic()
+        session = Session(uuid.uuid4().hex, value, now + self.ttl_seconds)
+        with self._lock:
+            self._purge(now)
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Session[T] | None:
+        """Return the live session and refresh its TTL, or None."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.expires_at = now + self.ttl_seconds
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge(time.monotonic())
+            return len(self._sessions)
@@ -0,0 +1,344 @@
+"""
+Engine microbenchmarks with regression tracking against a stored baseline.
+
+Usage:
+    python -m benchmarks.bench_engine --output runs/bench.json
+    python -m benchmarks.bench_engine --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_engine --quick --filter cma_sample --save-baseline benchmarks/baseline.json
+
+Every case prints one JSON line with the median and minimum seconds per call.
+In the report each time is also divided by the median time of a fixed
+calibration workload (0.15-0.3 s per run), measured before and after every
+suite of the same run. With `--baseline`, best times are compared as
+measured when the baseline was recorded on this host (same fingerprint), and
+normalized otherwise. Cases more than `--tolerance` slower are measured once
+more; those still slower are listed on stderr and the exit status is 1.
+Record baselines with `--save-baseline`, preferably on the machine that runs
+the comparison.
+"""
+from __future__ import annotations
+
+import os
+
+# Full simulations embed through the offline backend, never the network.
+os.environ["EMBEDDING_BACKEND"] = "local"
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.landscape import synthetic_landscape
+from src.config.model_config import get_model_config
+from src.config.settings import get_settings
+from src.decoder.nearest_context import NearestContextRetriever
+from src.engine.cma_runner import CMARunner
+from src.engine.height_calculator import HeightCalculator
+from src.engine.simulator import Simulator
+from src.forces.force_builder import build_force_vectors
+from src.forces.force_interaction import ForceInteraction
+from src.forces.force_manager import ForceData, ForceManager
+from src.penalties.penalty_aggregator import PenaltyAggregator
+from src.utils.io_utils import load_force_weights
+from src.utils.math_utils import as_compute_array
+
+SENTENCES = [
+    "Cities introduce a universal basic income funded by automation taxes.",
+    "A severe drought forces villages to share water through local councils.",
+    "Remote work empties downtown offices and revives small towns.",
+]
+
+# Passes of the calibration loop: 40-80 us each on the baseline machine, so 0.15-0.3 s a run.
+CALIBRATION_LOOPS = 4_000
+
+
+@dataclass
+class Case:
+    name: str
+    params: Dict[str, int | str]
+    func: Callable[[], object]
+
+    @property
+    def case_id(self) -> str:
+        args = ",".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.name}[{args}]"
+
+
+def measure(func: Callable[[], object], rounds: int) -> Dict[str, float | int]:
+    """Seconds per call: calls are batched until a round takes >= 0.2 s."""
+    func()  # warm-up: caches, lazy imports, BLAS thread pools
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = np.array(timer.repeat(repeat=rounds, number=number)) / number
+    return {"median_s": float(np.median(times)), "min_s": float(times.min()), "calls": number * rounds}
+
+
+def calibration() -> None:
+    """Fixed mix of small BLAS calls and interpreter work, like the engine's hot paths."""
+    matrix = np.linspace(-1.0, 1.0, 8 * 1536, dtype=np.float32).reshape(8, 1536)
+    for _ in range(CALIBRATION_LOOPS):
+        for vector in matrix:
+            float(np.linalg.norm(matrix @ vector))
+
+
+def calibrate(rounds: int, workload: Callable[[], object] = calibration) -> float:
+    """
+    Median seconds of one `workload` run over at least five runs.
+
+    Each run is long enough (>= 0.1 s) that timer resolution and short
+    scheduling hiccups do not move it, and the median ignores the runs that
+    a longer stall does hit.
+    """
+    workload()
+    return float(np.median(timeit.repeat(workload, repeat=max(rounds, 5), number=1)))
+
+
+def host_fingerprint() -> Dict[str, str | int | None]:
+    """What must match for raw times of two runs to be comparable."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def force_cases(dims: List[int], populations: List[int]) -> Iterator[Case]:
+    for dim in dims:
+        calculator, current = synthetic_landscape(dim)
+        manager = calculator.force_interaction.manager
+        yield Case("weighted_dot", {"dim": dim}, lambda m=manager, v=current: m.weighted_dot(v))
+        for population in populations:
+            rng = np.random.default_rng(population)
+            candidates = as_compute_array(current + 0.1 * rng.normal(size=(population, dim)))
+            params = {"dim": dim, "population": population}
+            yield Case(
+                "height_loop",
+                params,
+                lambda c=calculator, xs=candidates, v=current: [c.height(x, v) for x in xs],
+            )
+            yield Case(
+                "heights_batched",
+                params,
+                lambda c=calculator, xs=candidates, v=current: c.heights(xs, v),
+            )
+
+
+def cma_cases(dims: List[int], populations: List[int]) -> Iterator[Case]:
+    for dim in dims:
+        current = as_compute_array(np.random.default_rng(dim).normal(size=dim))
+        for population in populations:
+            runner = CMARunner()
+            runner.population = population
+            yield Case(
+                "cma_sample",
+                {"dim": dim, "population": population},
+                lambda r=runner, v=current: r.sample(v),
+            )
+
+
+def retriever_cases(corpus_sizes: List[int], dim: int, workdir: Path) -> Iterator[Case]:
+    for size in corpus_sizes:
+        rng = np.random.default_rng(size)
+        corpus = rng.normal(size=(size, dim)).astype(np.float32)
+        query = as_compute_array(rng.normal(size=dim))
+        for storage in ("float", "int8"):
+            # Same stand-ins for the corpus loader and embedder as the decoder tests.
+            with mock.patch(
+                "src.decoder.nearest_context._collect_sentences",
+                lambda: [f"s{idx}" for idx in range(size)],
+            ), mock.patch(
+                "src.decoder.nearest_context.embed_texts", lambda texts: corpus
+            ):
+                retriever = NearestContextRetriever(
+                    storage=storage, cache_path=workdir / f"context_{size}.npy"
+                )
+            yield Case(
+                "context_find",
+                {"corpus": size, "dim": dim, "storage": storage},
+                lambda r=retriever, q=query: r.find(q, top_k=5),
+            )
+
+
+def local_simulator() -> Simulator:
+    """Simulator over the real force definitions, embedded by the local backend."""
+    settings = get_settings()
+    vectors, _ = build_force_vectors(settings.paths.force_yaml)
+    manager = ForceManager(
+        data=ForceData(
+            vectors={name: as_compute_array(v) for name, v in vectors.items()},
+            weights=load_force_weights(settings.paths.weights_file),
+        )
+    )
+    penalties = PenaltyAggregator(distance_alpha=get_model_config().height.distance_alpha)
+    calculator = HeightCalculator(
+        force_interaction=ForceInteraction(manager=manager), penalties=penalties
+    )
+    return Simulator(height_calculator=calculator)
+
+
+def simulator_cases(steps: int) -> Iterator[Case]:
+    simulator = local_simulator()
+    dim = get_settings().embedding.local_dim
+    for optimizer in ("cma", "gradient"):
+
+        def run(optimizer=optimizer) -> None:
+            for sentence in SENTENCES:
+                for _ in simulator.run(sentence, steps=steps, optimizer=optimizer):
+                    pass
+
+        yield Case(
+            "simulator_run",
+            {"dim": dim, "steps": steps, "sentences": len(SENTENCES), "optimizer": optimizer},
+            run,
+        )
+
+
+def compare(
+    results: List[dict], baseline: Dict[str, dict], tolerance: float, same_host: bool = False
+) -> List[dict]:
+    """
+    Cases whose best time exceeds the baseline's by more than `tolerance`.
+
+    Raw times are compared when the baseline was recorded on the same host;
+    otherwise both sides are normalized by their run's calibration time.
+    """
+    key = "min_s" if same_host else "normalized"
+    regressions = []
+    for result in results:
+        reference = baseline.get(result["id"])
+        if reference is None:
+            continue
+        ratio = result[key] / reference[key]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                {
+                    "id": result["id"],
+                    "min_s": result["min_s"],
+                    "baseline_min_s": reference["min_s"],
+                    "ratio": ratio,
+                    "basis": "raw" if same_host else "after calibration",
+                }
+            )
+    return regressions
+
+
+def confirm_regressions(
+    results: List[dict],
+    cases: Dict[str, Case],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    same_host: bool,
+    rounds: int,
+    calibration_s: float,
+    attempts: int = 3,
+) -> List[dict]:
+    """
+    Regressions that persist when their cases are measured again.
+
+    Flagged cases are re-measured up to `attempts` times and keep their best
+    measurement, so one noisy stretch of the run is not enough to fail.
+    """
+    regressions = compare(results, baseline, tolerance, same_host)
+    by_id = {result["id"]: result for result in results}
+    for _ in range(attempts):
+        if not regressions:
+            break
+        for regression in regressions:
+            result = by_id[regression["id"]]
+            retry = measure(cases[result["id"]].func, rounds)
+            if retry["min_s"] < result["min_s"]:
+                result.update(retry, normalized=retry["min_s"] / calibration_s)
+        regressions = compare(results, baseline, tolerance, same_host)
+    return regressions
+
+
+def load_baseline(path: Path) -> Tuple[Dict[str, object], Dict[str, dict]]:
+    """The baseline's host fingerprint and its results by case id."""
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return payload["machine"], {result["id"]: result for result in payload["results"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="small sizes only, for smoke runs")
+    parser.add_argument("--filter", default="", help="run only cases whose id contains this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--steps", type=int, default=5, help="steps per simulator run")
+    parser.add_argument("--output", type=Path, help="write all results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="fail on regressions against this file")
+    parser.add_argument("--save-baseline", type=Path, help="write the results as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # per-step simulator logs would dominate the timings
+    np.random.seed(0)  # CMARunner.sample draws through the global RNG
+    dims = [64, 256] if args.quick else [64, 256, 1536, 3072]
+    populations = [8] if args.quick else [8, 32]
+    corpus_sizes = [1_000] if args.quick else [1_000, 10_000, 50_000]
+
+    calibrations = [calibrate(args.rounds)]
+    machine = host_fingerprint()
+    results = []
+    regressions: List[dict] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        suites = (
+            force_cases(dims, populations),
+            cma_cases(dims, populations),
+            retriever_cases(corpus_sizes, 1536, Path(workdir)),
+            simulator_cases(args.steps),
+        )
+        cases = {}
+        for suite in suites:
+            for case in suite:
+                if args.filter not in case.case_id:
+                    continue
+                result = {"id": case.case_id, "benchmark": case.name, **case.params}
+                result.update(measure(case.func, args.rounds))
+                print(json.dumps(result), flush=True)
+                results.append(result)
+                cases[case.case_id] = case
+            # Calibrating between suites follows the host's speed through the run.
+            calibrations.append(calibrate(args.rounds))
+        reference = float(np.median(calibrations))
+        for result in results:
+            result["normalized"] = result["min_s"] / reference
+
+        if args.baseline is not None:
+            baseline_machine, baseline = load_baseline(args.baseline)
+            same_host = baseline_machine == machine
+            regressions = confirm_regressions(
+                results, cases, baseline, args.tolerance, same_host, args.rounds, reference
+            )
+
+    report = {"machine": machine, "calibration_s": reference, "results": results}
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline is not None:
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['id']}: {regression['min_s'] * 1e3:.3f} ms "
+                f"vs {regression['baseline_min_s'] * 1e3:.3f} ms baseline "
+                f"({regression['ratio']:.2f}x {regression['basis']})",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
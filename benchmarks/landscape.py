@@ -0,0 +1,56 @@
+"""Synthetic force landscapes so benchmarks run without embeddings or network."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.engine.height_calculator import HeightCalculator
+from src.engine.simulator import Simulator
+from src.forces.force_interaction import ForceInteraction
+from src.forces.force_manager import ForceData, ForceManager
+from src.penalties.penalty_aggregator import PenaltyAggregator
+
+FORCE_NAMES = [
+    "equality",
+    "hierarchy",
+    "identity",
+    "market",
+    "security",
+    "solidarity",
+    "sustainability",
+    "technology",
+]
+
+
+def synthetic_landscape(dim: int, seed: int = 0) -> tuple[HeightCalculator, np.ndarray]:
+    """
+    Build a HeightCalculator over random unit-norm forces sharing a common
+    direction (like real embeddings, which are positively correlated), plus a
+    unit-norm seed state near that direction.
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=dim)
+    base /= np.linalg.norm(base)
+
+    def near_base(spread: float) -> np.ndarray:
+        vector = base + spread * rng.normal(size=dim) / np.sqrt(dim)
+        return vector / np.linalg.norm(vector)
+
+    vectors = {name: near_base(1.0) for name in FORCE_NAMES}
+    weights = {name: float(w) for name, w in zip(FORCE_NAMES, rng.uniform(0.9, 1.2, len(FORCE_NAMES)))}
+    manager = ForceManager(data=ForceData(vectors=vectors, weights=weights))
+    penalties = PenaltyAggregator(distance_alpha=0.5, social_reference=near_base(1.0))
+    calculator = HeightCalculator(
+        force_interaction=ForceInteraction(manager=manager), penalties=penalties
+    )
+    return calculator, near_base(2.0)
+
+
+class SeededSimulator(Simulator):
+    """Simulator that starts from a fixed vector instead of embedding text."""
+
+    def __init__(self, seed_vector: np.ndarray, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.seed_vector = seed_vector
+
+    def _embed_sentence(self, sentence: str) -> np.ndarray:
+        return self.seed_vector.copy()
@@ -0,0 +1,386 @@
+"""
+Closed-loop load test of the engine endpoints, for sizing API workers.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1 4 8 16 --duration 30
+    python -m benchmarks.load_test --stub "--chat-latency lognormal:1.0:0.4 --error-rate 0.01"
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --mix simulate=1,simulate_stream=1
+
+Without `--url` the FastAPI app runs in this process, exactly like one
+uvicorn worker; `--url` drives a running server over its socket instead.
+`--stub` starts the local OpenAI stand-in (benchmarks/upstream_stub.py) with
+the given options and points the in-process app at it.
+
+Each concurrency level runs `--concurrency` virtual users for `--duration`
+seconds. Every user sends its next request as soon as the previous one
+finished, with its own `X-Client-Id`. The in-process app trusts that header
+from its loopback peer, so admission control sees distinct clients; with
+`--url`, add the load tester's address to the server's
+`ADMISSION_TRUSTED_PROXIES` for the same effect. Each level prints one JSON
+line with:
+- throughput;
+- p50/p95/p99 latency overall and per request kind;
+- time to the first step for streams;
+- error rates by status.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shlex
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# request kind -> (path, streams NDJSON)
+KINDS: Dict[str, Tuple[str, bool]] = {
+    "simulate": ("/api/simulate", False),
+    "simulate_stream": ("/api/simulate/simulate_stream", True),
+    "transition": ("/api/transition", False),
+}
+
+DEFAULT_MIX = "simulate=2,simulate_stream=1,transition=1"
+
+SENTENCES = [
+    "The pace of technological advancement is outstripping social institutions.",
+    "Cities introduce a universal basic income funded by automation taxes.",
+    "A severe drought forces villages to share water through local councils.",
+    "Remote work empties downtown offices and revives small towns.",
+    "Trust in national media collapses while local news cooperatives grow.",
+    "An aging population strains pension systems and reshapes family life.",
+]
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Sample:
+    kind: str
+    status: int
+    seconds: float
+    # seconds until the first body chunk (the first NDJSON step for streams)
+    first_chunk: Optional[float]
+    # None on success, else the HTTP status or "stream_error"/"transport_error"
+    error: Optional[str] = None
+
+
+class InProcessClient:
+    """Calls the ASGI app directly and timestamps every response body chunk."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def post(self, path: str, body: bytes, headers: Dict[str, str]):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("latin-1"),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"host", b"loadtest"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                *[(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        start = time.perf_counter()
+        delivered = False
+        finished = asyncio.Event()
+        status = 0
+        first_chunk: Optional[float] = None
+        chunks: List[bytes] = []
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message) -> None:
+            nonlocal status, first_chunk
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and message.get("body"):
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - start
+                chunks.append(message["body"])
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            finished.set()
+        return status, first_chunk, b"".join(chunks)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class SocketClient:
+    """Posts to a running server over HTTP."""
+
+    def __init__(self, url: str, timeout: float, connections: int) -> None:
+        import httpx
+
+        self.client = httpx.AsyncClient(
+            base_url=url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        )
+
+    async def post(self, path: str, body: bytes, headers: Dict[str, str]):
+        start = time.perf_counter()
+        first_chunk: Optional[float] = None
+        chunks: List[bytes] = []
+        headers = {"content-type": "application/json", **headers}
+        async with self.client.stream("POST", path, content=body, headers=headers) as response:
+            async for chunk in response.aiter_bytes():
+                if chunk and first_chunk is None:
+                    first_chunk = time.perf_counter() - start
+                chunks.append(chunk)
+        return response.status_code, first_chunk, b"".join(chunks)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """`simulate=2,transition=1` -> relative weights per request kind."""
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in KINDS:
+            raise ValueError(f"Unknown request kind {name!r}; expected one of {list(KINDS)}")
+        mix[name] = float(weight or 1)
+        if mix[name] < 0:
+            raise ValueError(f"Negative weight for {name!r}")
+    if not sum(mix.values()):
+        raise ValueError("The request mix needs at least one positive weight")
+    return mix
+
+
+def load_corpus(path: Path | None) -> List[str]:
+    """One sentence per line; blank lines and `#` comments are skipped."""
+    if path is None:
+        return list(SENTENCES)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    sentences = [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+    if not sentences:
+        raise ValueError(f"No sentences in {path}")
+    return sentences
+
+
+def _failure(kind: str, status: int, body: bytes) -> Optional[str]:
+    if status >= 400:
+        return str(status)
+    if KINDS[kind][1]:
+        # Streams report failures in-band as a final {"error": ...} line.
+        lines = body.strip().splitlines()
+        try:
+            last = json.loads(lines[-1]) if lines else {}
+        except ValueError:
+            return "stream_error"
+        if not lines or "error" in last:
+            return "stream_error"
+    return None
+
+
+async def send_one(client, kind: str, payload: dict, client_id: str) -> Sample:
+    path, _ = KINDS[kind]
+    start = time.perf_counter()
+    try:
+        status, first_chunk, body = await client.post(
+            path, json.dumps(payload).encode("utf-8"), {"x-client-id": client_id}
+        )
+    except Exception as e:
+        return Sample(kind, 0, time.perf_counter() - start, None, f"transport_error:{type(e).__name__}")
+    return Sample(kind, status, time.perf_counter() - start, first_chunk, _failure(kind, status, body))
+
+
+async def run_level(
+    client,
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, float],
+    corpus: Sequence[str],
+    steps: int,
+    optimizer: str | None,
+    seed: int,
+) -> Tuple[List[Sample], float]:
+    """Run `concurrency` virtual users for `duration` seconds; return (samples, elapsed)."""
+    kinds, weights = list(mix), list(mix.values())
+    samples: List[Sample] = []
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * 10_007 + index)
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            payload = {"sentence": rng.choice(corpus), "steps": steps}
+            if optimizer:
+                payload["optimizer"] = optimizer
+            samples.append(await send_one(client, kind, payload, f"loadtest-{index}"))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def _percentiles_ms(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    points = np.percentile(np.asarray(values) * 1e3, PERCENTILES)
+    summary = {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, points)}
+    summary["max"] = round(max(values) * 1e3, 2)
+    return summary
+
+
+def summarize(samples: List[Sample], elapsed: float) -> dict:
+    """Throughput, latency percentiles and errors of one group of samples."""
+    ok = [s for s in samples if s.error is None]
+    errors = Counter(s.error for s in samples if s.error is not None)
+    summary = {
+        "requests": len(samples),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 6) if samples else 0.0,
+        "errors": dict(errors),
+        "latency_ms": _percentiles_ms([s.seconds for s in ok]),
+    }
+    first_steps = [s.first_chunk for s in ok if KINDS[s.kind][1] and s.first_chunk is not None]
+    if first_steps:
+        summary["first_step_ms"] = _percentiles_ms(first_steps)
+    return summary
+
+
+def report(concurrency: int, samples: List[Sample], elapsed: float) -> dict:
+    result = {"concurrency": concurrency, "elapsed_s": round(elapsed, 3), **summarize(samples, elapsed)}
+    result["by_kind"] = {
+        kind: summarize([s for s in samples if s.kind == kind], elapsed)
+        for kind in sorted({s.kind for s in samples})
+    }
+    return result
+
+
+def _describe(result: dict) -> str:
+    latency = result["latency_ms"]
+    line = (
+        f"c={result['concurrency']:<3} {result['throughput_rps']:8.2f} req/s  "
+        f"p50 {latency.get('p50', float('nan')):8.1f} ms  p95 {latency.get('p95', float('nan')):8.1f} ms  "
+        f"p99 {latency.get('p99', float('nan')):8.1f} ms  errors {result['error_rate']:.1%}"
+    )
+    stream = result["by_kind"].get("simulate_stream", {}).get("first_step_ms")
+    if stream:
+        line += f"  first step p95 {stream['p95']:.1f} ms"
+    return line
+
+
+def start_stub(stub_args: str) -> object:
+    """Start the upstream stand-in and point this process's OpenAI clients at it."""
+    from benchmarks.upstream_stub import build_parser, config_from_args, start_in_thread
+
+    parser = build_parser()
+    args = parser.parse_args(shlex.split(stub_args))
+    server, base_url = start_in_thread(config_from_args(args), host=args.host)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    print(f"Upstream stand-in listening on {base_url}", file=sys.stderr)
+    return server
+
+
+async def run(args: argparse.Namespace, mix: Dict[str, float], corpus: List[str]) -> List[dict]:
+    if args.url:
+        client = SocketClient(args.url, timeout=args.timeout, connections=max(args.concurrency))
+    else:
+        # Every virtual user connects from 127.0.0.1; trust their X-Client-Id there.
+        os.environ.setdefault("ADMISSION_TRUSTED_PROXIES", '["127.0.0.1"]')
+        # Imported late so OPENAI_BASE_URL from --stub is seen by the settings.
+        from api.app.main import app
+
+        # The app logs to stdout, where the results go; engine loggers set
+        # their own levels, so records below --log-level are dropped globally.
+        logging.disable(logging.getLevelName(args.log_level) - 1)
+        client = InProcessClient(app)
+
+    results = []
+    try:
+        if args.warmup:
+            # Loads force caches, retrievers and lazy clients outside the measured window.
+            for kind in mix:
+                await send_one(client, kind, {"sentence": corpus[0], "steps": 1}, "loadtest-warmup")
+        for concurrency in args.concurrency:
+            samples, elapsed = await run_level(
+                client, concurrency, args.duration, mix, corpus, args.steps, args.optimizer, args.seed
+            )
+            result = report(concurrency, samples, elapsed)
+            print(json.dumps(result), flush=True)
+            print(_describe(result), file=sys.stderr, flush=True)
+            results.append(result)
+    finally:
+        await client.aclose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="relative weights per request kind")
+    parser.add_argument("--corpus", type=Path, help="sentences, one per line")
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--optimizer", choices=["cma", "gradient"])
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout with --url")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--stub", metavar="ARGS", help="start the upstream stand-in with these options")
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="least severe log records the in-process app still emits",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write all levels to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+        corpus = load_corpus(args.corpus)
+    except ValueError as e:
+        parser.error(str(e))
+    if not 1 <= args.steps <= 5:
+        parser.error("--steps must be between 1 and 5")
+    if args.stub is not None and args.url:
+        parser.error("--stub only applies to the in-process app; start the server with OPENAI_BASE_URL instead")
+
+    stub = start_stub(args.stub) if args.stub is not None else None
+    try:
+        results = asyncio.run(run(args, mix, corpus))
+    finally:
+        if stub is not None:
+            stub.should_exit = True
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"target": args.url or "in-process", "mix": mix, "steps": args.steps, "levels": results}
+        args.output.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Local OpenAI-compatible stand-in for end-to-end load tests.
+
+Implements the subset of the OpenAI API that EmbeddingClient, FutureDecoder
+and the /api/ai routes call, with controllable latency, rate limits and
+injected failures:
+  POST /v1/embeddings         deterministic hashed embeddings (float or base64)
+  POST /v1/chat/completions   canned completion built from the prompt's words
+  GET  /stats                 requests served per endpoint and outcome
+
+Usage:
+    python -m benchmarks.upstream_stub --port 8100 --chat-latency lognormal:1.2:0.4 --rate-limit 20 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub uvicorn api.app.main:app
+
+Latency specs are `none`, `fixed:<s>`, `uniform:<low>:<high>` or
+`lognormal:<median>:<sigma>`. Force and context caches built against the
+real API have a different dimension than `--dim`; move `cache/` aside so they
+are rebuilt through the stand-in.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import math
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from src.embeddings.hashing_backend import HashingEmbeddingClient
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Number of parameters each latency distribution takes
+LATENCY_KINDS = {"none": 0, "fixed": 1, "uniform": 2, "lognormal": 2}
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Distribution of the time the stand-in waits before answering."""
+
+    kind: str = "none"
+    params: tuple = ()
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, *raw = spec.split(":")
+        if kind not in LATENCY_KINDS or len(raw) != LATENCY_KINDS[kind]:
+            raise ValueError(
+                f"Invalid latency spec {spec!r}; expected none, fixed:<s>, "
+                "uniform:<low>:<high> or lognormal:<median>:<sigma>"
+            )
+        params = tuple(float(p) for p in raw)
+        if any(p < 0 for p in params):
+            raise ValueError(f"Latency parameters must be non-negative: {spec!r}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            low, high = self.params
+            return rng.uniform(low, high)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return 0.0
+
+
+@dataclass
+class StubConfig:
+    embed_latency: LatencyModel = field(default_factory=LatencyModel)
+    chat_latency: LatencyModel = field(default_factory=LatencyModel)
+    # requests per second across both endpoints; 0 disables rate limiting
+    rate_limit: float = 0.0
+    # requests that may arrive at once before the rate limit applies
+    burst: int = 10
+    # fraction of requests answered with one of `error_statuses`
+    error_rate: float = 0.0
+    error_statuses: tuple = (500,)
+    # embedding dimension unless a request asks for `dimensions`
+    dim: int = 1536
+    # words in a chat completion, before `max_tokens` is applied
+    reply_words: int = 120
+    seed: int = 0
+
+
+class TokenBucket:
+    """Requests-per-second limiter; the event loop serializes all calls."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class EmbeddingRequest(BaseModel):
+    model: str
+    input: Union[str, List[str]]
+    encoding_format: str = "float"
+    dimensions: Optional[int] = None
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: Any = None
+
+
+class ChatRequest(BaseModel):
+    model: str
+    messages: List[ChatMessage]
+    max_tokens: Optional[int] = None
+    max_completion_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stream: bool = False
+
+
+def _count_tokens(text: str) -> int:
+    # Roughly one token per word is enough for usage accounting.
+    return len(_WORD.findall(text))
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return ""
+
+
+def _error(status: int, message: str, error_type: str, headers: Dict[str, str] | None = None):
+    body = {"error": {"message": message, "type": error_type, "param": None, "code": error_type}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def create_app(config: StubConfig | None = None) -> FastAPI:
+    """Build the stand-in app; each app keeps its own RNG, rate limiter and counters."""
+    config = config or StubConfig()
+    rng = random.Random(config.seed)
+    bucket = TokenBucket(config.rate_limit, config.burst) if config.rate_limit > 0 else None
+    embedders: Dict[int, HashingEmbeddingClient] = {}
+    stats: Counter[tuple] = Counter()
+    in_flight = {"now": 0, "peak": 0}
+
+    app = FastAPI(title="OpenAI stand-in", docs_url=None, redoc_url=None)
+    app.state.config = config
+
+    async def admit(endpoint: str, latency: LatencyModel):
+        """Apply rate limit, latency and error injection; return an error response or None."""
+        if bucket is not None:
+            wait = bucket.take()
+            if wait:
+                stats[(endpoint, "rate_limited")] += 1
+                return _error(
+                    429,
+                    f"Rate limit of {config.rate_limit:g} requests per second reached",
+                    "rate_limit_exceeded",
+                    headers={"retry-after": f"{wait:.3f}"},
+                )
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            delay = latency.sample(rng)
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            in_flight["now"] -= 1
+        if config.error_rate and rng.random() < config.error_rate:
+            stats[(endpoint, "error")] += 1
+            status = rng.choice(config.error_statuses)
+            return _error(status, f"Injected failure ({status})", "server_error")
+        return None
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: EmbeddingRequest):
+        texts = [request.input] if isinstance(request.input, str) else request.input
+        if not texts or any(not t for t in texts):
+            stats[("embeddings", "bad_request")] += 1
+            return _error(400, "'input' must be a non-empty string or list of them", "invalid_request_error")
+        if request.encoding_format not in ("float", "base64"):
+            stats[("embeddings", "bad_request")] += 1
+            return _error(400, f"Unsupported encoding_format {request.encoding_format!r}", "invalid_request_error")
+
+        failure = await admit("embeddings", config.embed_latency)
+        if failure is not None:
+            return failure
+
+        dim = request.dimensions or config.dim
+        embedder = embedders.get(dim)
+        if embedder is None:
+            embedder = embedders[dim] = HashingEmbeddingClient(dim)
+        data = []
+        for index, text in enumerate(texts):
+            vector = embedder.embed_one(text).astype(np.float32)
+            if request.encoding_format == "base64":
+                embedding: Any = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        tokens = sum(_count_tokens(t) for t in texts)
+        stats[("embeddings", "ok")] += 1
+        return {
+            "object": "list",
+            "data": data,
+            "model": request.model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: ChatRequest):
+        if request.stream:
+            stats[("chat_completions", "bad_request")] += 1
+            return _error(400, "Streaming is not supported by the stand-in", "invalid_request_error")
+        if not request.messages:
+            stats[("chat_completions", "bad_request")] += 1
+            return _error(400, "'messages' must not be empty", "invalid_request_error")
+
+        failure = await admit("chat_completions", config.chat_latency)
+        if failure is not None:
+            return failure
+
+        prompt = "\n".join(_message_text(m.content) for m in request.messages)
+        last_user = next(
+            (_message_text(m.content) for m in reversed(request.messages) if m.role == "user"), prompt
+        )
+        # Reuse the prompt's vocabulary so replies vary with the input but stay deterministic.
+        vocabulary = _WORD.findall(last_user) or ["stand-in"]
+        limit = request.max_completion_tokens or request.max_tokens or config.reply_words
+        words = [vocabulary[i % len(vocabulary)] for i in range(min(limit, config.reply_words))]
+        content = " ".join(words).capitalize() + "."
+        finish_reason = "length" if limit < config.reply_words else "stop"
+
+        prompt_tokens = _count_tokens(prompt)
+        completion_tokens = len(words)
+        stats[("chat_completions", "ok")] += 1
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        counts: Dict[str, Dict[str, int]] = {}
+        for (endpoint, outcome), count in sorted(stats.items()):
+            counts.setdefault(endpoint, {})[outcome] = count
+        return {"requests": counts, "in_flight": in_flight["now"], "peak_in_flight": in_flight["peak"]}
+
+    return app
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    if not 0 <= args.error_rate <= 1:
+        raise ValueError("--error-rate must be between 0 and 1")
+    return StubConfig(
+        embed_latency=LatencyModel.parse(args.embed_latency),
+        chat_latency=LatencyModel.parse(args.chat_latency),
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_status),
+        dim=args.dim,
+        reply_words=args.reply_words,
+        seed=args.seed,
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--embed-latency", default="lognormal:0.08:0.3")
+    parser.add_argument("--chat-latency", default="lognormal:1.0:0.4")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second, 0 for unlimited")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, nargs="+", default=[500])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--reply-words", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def start_in_thread(config: StubConfig, host: str = "127.0.0.1", port: int = 0):
+    """
+    Serve the stand-in from a daemon thread; return (server, base_url).
+
+    Port 0 picks a free port. Set `server.should_exit = True` to stop it.
+    """
+    import uvicorn
+
+    if port == 0:
+        with socket.socket() as probe:
+            probe.bind((host, 0))
+            port = probe.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(config), host=host, port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, name="upstream-stub", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError(f"Upstream stand-in failed to start on {host}:{port}")
+        time.sleep(0.01)
+    return server, f"http://{host}:{port}/v1"
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = build_parser()
+    args = parser.parse_args()
+
+    try:
+        config = config_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
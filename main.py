@@ -4,16 +4,24 @@ import argparse
 from pathlib import Path
 
 from src.decoder.future_decoder import FutureDecoder
-from src.engine.simulator import Simulator
+from src.engine.simulator import STEP_FIELDS, Simulator
 from src.forces.force_builder import rebuild_force_cache
-from src.utils.io_utils import append_jsonl
+from src.forces.weight_sweep import (
+    evaluate_weights,
+    grid_weights,
+    sample_weights,
+    simulate_weights,
+)
+from src.utils.io_utils import RunWriter, save_columns
 from src.utils.logger import get_logger
+from src.utils.math_utils import as_compute_array
+from src.utils.trajectory_store import ingest_runs
 
 logger = get_logger("ForcePathCLI")
 
 
 def cmd_build_cache(args: argparse.Namespace) -> None:
-    cache_path = rebuild_force_cache()
+    cache_path = rebuild_force_cache(full=args.full)
     logger.info("Force cache saved to %s", cache_path)
 
 
@@ -23,46 +31,190 @@ def cmd_simulate(args: argparse.Namespace) -> None:
     
     # Default steps to 4 if not provided
     steps = args.steps if args.steps is not None else 4
+
+    writer = None
+    step_fields = None
+    first_step = 0
+    run = None
+    if args.output:
+        writer = RunWriter(Path(args.output), fields=args.fields, resume=args.resume)
+        if args.fields is not None:
+            step_fields = [name for name in args.fields if name in STEP_FIELDS]
+        if args.resume and writer.last_record is not None:
+            last = writer.last_record
+            if "step" not in last or "best_vector" not in last:
+                writer.close()
+                raise SystemExit("--resume needs 'step' and 'best_vector' in the persisted fields")
+            first_step = last["step"] + 1
+            if first_step >= steps:
+                writer.close()
+                logger.info("%s already holds %d steps", args.output, first_step)
+                return
+            logger.info("Resuming %s at step %d", args.output, first_step)
+            run = simulator.run_from_vector(
+                as_compute_array(last["best_vector"]), steps=steps - first_step
+            )
+    if run is None:
+        run = simulator.run(args.sentence, steps=steps)
     
     logger.info(f"Starting simulation for {steps} steps...")
     
-    payload = []
-    
-    # Iterate over the generator
-    for step_result in simulator.run(args.sentence, steps=steps):
+    # Iterate over the generator; each record is written as soon as it exists
+    for step_result in run:
+        step = first_step + step_result.step
         # Immediate decoding
         summary_data = decoder.decode(step_result.force_scores, step_result.best_vector)
         summary_text = summary_data["summary"]
         
         # Print to stdout immediately
-        print(f"\n--- Step {step_result.step + 1} Prediction ---")
+        print(f"\n--- Step {step + 1} Prediction ---")
         print(summary_text)
         print("-" * 30)
         
-        if args.output:
-            record = step_result.to_dict()
+        if writer is not None:
+            record = step_result.to_dict(step_fields)
+            record["step"] = step
             record["summary"] = summary_text
-            payload.append(record)
+            writer.write(record)
 
-    if args.output:
-        append_jsonl(Path(args.output), payload)
+    if writer is not None:
+        writer.close()
         logger.info("Simulation written to %s", args.output)
 
 
+def cmd_sweep(args: argparse.Namespace) -> None:
+    simulator = Simulator()
+    calculator = simulator.height_calculator
+    manager = calculator.force_interaction.manager
+
+    if args.grid:
+        weights = grid_weights(manager, args.grid, forces=args.forces)
+    else:
+        weights = sample_weights(
+            manager,
+            args.samples,
+            low=args.low,
+            high=args.high,
+            forces=args.forces,
+            seed=args.seed,
+        )
+    logger.info(f"Evaluating {len(weights)} weight scenarios...")
+
+    seed_vector = simulator._embed_sentence(args.sentence)
+    result = evaluate_weights(seed_vector, weights, calculator)
+    if args.simulate_steps:
+        result.final_heights = simulate_weights(
+            seed_vector,
+            weights,
+            steps=args.simulate_steps,
+            height_calculator=calculator,
+            workers=args.workers,
+        )
+
+    save_columns(Path(args.output), result.columns())
+    logger.info("Sweep written to %s", args.output)
+
+
+def cmd_export_runs(args: argparse.Namespace) -> None:
+    manifest = ingest_runs(
+        [Path(path) for path in args.inputs],
+        Path(args.output),
+        vector_field=args.vector_field,
+        vector_dtype=args.vector_dtype,
+        file_format=args.format,
+    )
+    print(
+        f"Stored {manifest['rows']} steps from {len(manifest['runs'])} runs "
+        f"in {args.output} ({manifest['format']})"
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="ForcePath CLI")
     sub = parser.add_subparsers(dest="command", required=True)
 
     cache_parser = sub.add_parser("build-cache", help="Rebuild force vector cache")
+    cache_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-embed every force instead of reusing unchanged cached vectors",
+    )
     cache_parser.set_defaults(func=cmd_build_cache)
 
     sim_parser = sub.add_parser("simulate", help="Simulate future path")
     sim_parser.add_argument("--sentence", required=True, help="Input sentence")
     sim_parser.add_argument("--steps", type=int, default=None, help="Simulation steps")
     sim_parser.add_argument(
-        "--output", type=str, default=None, help="Optional JSONL output path"
+        "--output",
+        type=str,
+        default=None,
+        help="Optional JSONL output path (.gz for per-line gzip compression)",
+    )
+    sim_parser.add_argument(
+        "--fields",
+        nargs="+",
+        default=None,
+        help="Record fields to persist (default: all, including candidates)",
+    )
+    sim_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the run stored in --output from its last complete step",
     )
     sim_parser.set_defaults(func=cmd_simulate)
+
+    sweep_parser = sub.add_parser("sweep", help="Force weight sensitivity sweep")
+    sweep_parser.add_argument("--sentence", required=True, help="Seed sentence")
+    sweep_group = sweep_parser.add_mutually_exclusive_group(required=True)
+    sweep_group.add_argument(
+        "--grid", type=float, nargs="+", help="Weight values forming a full grid"
+    )
+    sweep_group.add_argument(
+        "--samples", type=int, help="Number of uniformly sampled weight vectors"
+    )
+    sweep_parser.add_argument(
+        "--forces", nargs="+", default=None, help="Forces to vary (default: all)"
+    )
+    sweep_parser.add_argument("--low", type=float, default=0.5, help="Sample lower bound")
+    sweep_parser.add_argument("--high", type=float, default=1.5, help="Sample upper bound")
+    sweep_parser.add_argument("--seed", type=int, default=None, help="Sampling seed")
+    sweep_parser.add_argument(
+        "--simulate-steps",
+        type=int,
+        default=0,
+        help="Also run a short simulation per scenario (0 disables)",
+    )
+    sweep_parser.add_argument(
+        "--workers", type=int, default=None, help="Process pool size for simulations"
+    )
+    sweep_parser.add_argument(
+        "--output", type=str, default="runs/sweep.npz", help="Columnar .npz output path"
+    )
+    sweep_parser.set_defaults(func=cmd_sweep)
+
+    export_parser = sub.add_parser(
+        "export-runs", help="Convert JSONL runs into a columnar trajectory store"
+    )
+    export_parser.add_argument("--inputs", nargs="+", required=True, help="JSONL run files")
+    export_parser.add_argument(
+        "--output", type=str, default="runs/store", help="Trajectory store directory"
+    )
+    export_parser.add_argument(
+        "--format",
+        choices=["auto", "parquet", "npy"],
+        default="auto",
+        help="Column format (auto: Parquet when pyarrow is installed)",
+    )
+    export_parser.add_argument(
+        "--vector-field", default="best_vector", help="Record field stored as the vector matrix"
+    )
+    export_parser.add_argument(
+        "--vector-dtype",
+        choices=["float32", "float16"],
+        default="float32",
+        help="dtype of the stored vector matrix",
+    )
+    export_parser.set_defaults(func=cmd_export_runs)
     return parser
 
 
@@ -18,13 +18,30 @@ class HeightConfig:
     social_floor: float = 1e-4
 
 
+@dataclass(frozen=True)
+class GradientConfig:
+    # Upper bound on descent iterates per step; fewer are returned once the
+    # evaluation budget is spent or log-height stops improving by `tolerance`
+    iterations: int = 12
+    learning_rate: float = 0.5
+    max_backtracks: int = 8
+    # Line-search height evaluations per row and step, matching the CMA
+    # population so both backends spend a similar scoring budget
+    max_evaluations: int = 12
+    tolerance: float = 1e-3
+    # Trust radius around the current state; None uses the CMA sampling
+    # scale sigma_init * sqrt(dim) so both backends search the same region.
+    radius: float | None = None
+
+
 @dataclass(frozen=True)
 class ModelConfig:
     cma: CMAConfig
     height: HeightConfig
+    gradient: GradientConfig
 
 
 @lru_cache(maxsize=1)
 def get_model_config() -> ModelConfig:
-    return ModelConfig(cma=CMAConfig(), height=HeightConfig())
+    return ModelConfig(cma=CMAConfig(), height=HeightConfig(), gradient=GradientConfig())
 
@@ -17,6 +17,7 @@ class PathConfig:
     force_yaml: Path
     social_reference_yaml: Path
     force_cache: Path
+    context_cache: Path
     cache_dir: Path
     weights_file: Path
 
@@ -25,6 +26,10 @@ class PathConfig:
 class EmbeddingConfig:
     model_name: str
     batch_size: int
+    # "openai" or "local" (deterministic hashed n-grams, no network)
+    backend: str
+    # vector dimension of the local backend
+    local_dim: int
 
 
 @dataclass(frozen=True)
@@ -32,6 +37,23 @@ class SimulationConfig:
     steps: int
     population_size: int
     sigma_init: float
+    ensemble_members: int
+    beam_width: int
+    optimizer: str
+    force_reload_interval: float
+
+
+@dataclass(frozen=True)
+class NumericConfig:
+    # dtype for embeddings, force/context matrices, sampling and scoring
+    compute_dtype: str
+    # dtype for stored reference corpora (context embeddings)
+    storage_dtype: str
+    # "float" keeps the context matrix in storage_dtype; "int8" keeps int8
+    # codes with a per-row scale and re-ranks against the on-disk float32 cache
+    context_storage: str
+    # shortlist size, as a multiple of top_k, re-ranked in full precision
+    context_rerank_factor: int
 
 
 @dataclass(frozen=True)
@@ -39,7 +61,10 @@ class Settings:
     paths: PathConfig
     embedding: EmbeddingConfig
     simulation: SimulationConfig
+    numeric: NumericConfig
     openai_api_key: str | None
+    # alternative OpenAI-compatible endpoint, e.g. the local stand-in server
+    openai_base_url: str | None
 
 
 def _default_repo_root() -> Path:
@@ -55,6 +80,7 @@ def _build_paths(root: Path) -> PathConfig:
         force_yaml=data_dir / "forces" / "forces.yaml",
         social_reference_yaml=data_dir / "social_reference.yaml",
         force_cache=cache_dir / "force_vectors.npy",
+        context_cache=cache_dir / "context_vectors.npy",
         cache_dir=cache_dir,
         weights_file=root / "src" / "config" / "force_weights.json",
     )
@@ -64,6 +90,8 @@ def _build_embedding() -> EmbeddingConfig:
     return EmbeddingConfig(
         model_name=os.getenv("OPENAI_EMBED_MODEL", "text-embedding-4"),
         batch_size=int(os.getenv("EMBED_BATCH_SIZE", "32")),
+        backend=os.getenv("EMBEDDING_BACKEND", "openai"),
+        local_dim=int(os.getenv("LOCAL_EMBED_DIM", "1536")),
     )
 
 
@@ -72,6 +100,19 @@ def _build_simulation() -> SimulationConfig:
         steps=int(os.getenv("SIMULATION_STEPS", "10")),
         population_size=int(os.getenv("SIMULATION_POPULATION", "8")),
         sigma_init=float(os.getenv("SIMULATION_SIGMA", "0.1")),
+        ensemble_members=int(os.getenv("SIMULATION_ENSEMBLE_MEMBERS", "8")),
+        beam_width=int(os.getenv("SIMULATION_BEAM_WIDTH", "4")),
+        optimizer=os.getenv("SIMULATION_OPTIMIZER", "cma"),
+        force_reload_interval=float(os.getenv("FORCE_RELOAD_INTERVAL", "5")),
+    )
+
+
+def _build_numeric() -> NumericConfig:
+    return NumericConfig(
+        compute_dtype=os.getenv("FORCEPATH_DTYPE", "float32"),
+        storage_dtype=os.getenv("FORCEPATH_STORAGE_DTYPE", "float16"),
+        context_storage=os.getenv("CONTEXT_STORAGE", "float"),
+        context_rerank_factor=int(os.getenv("CONTEXT_RERANK_FACTOR", "4")),
     )
 
 
@@ -82,6 +123,8 @@ def get_settings() -> Settings:
         paths=_build_paths(repo_root),
         embedding=_build_embedding(),
         simulation=_build_simulation(),
+        numeric=_build_numeric(),
         openai_api_key=os.getenv("OPENAI_API_KEY"),
+        openai_base_url=os.getenv("OPENAI_BASE_URL") or None,
     )
 
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-import os
 from pathlib import Path
 from typing import Dict, List
 
-from openai import OpenAI
-
 from src.decoder.force_summary import explain_direction, summarize_forces
 from src.decoder.nearest_context import get_default_retriever
+from src.utils.metrics import record_upstream, span
+from src.utils.openai_client import create_openai_client
 
 DEFAULT_SYSTEM_PROMPT = """You are a social dynamics expert.
 Your task is to describe the future state of a society based on the provided "forces" and "context cues".
@@ -34,11 +33,12 @@ Based on these, describe the specific social structure and daily life in this fu
 class FutureDecoder:
     def __init__(self, template_path: Path | None = None) -> None:
         # Template path is kept for backward compatibility signature, but we use LLM now.
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = create_openai_client()
         self.retriever = get_default_retriever()
 
     def decode(self, force_scores: Dict[str, float], vector) -> Dict[str, List[str] | str]:
-        contexts = self.retriever.find(vector, top_k=5)
+        with span("retrieve"):
+            contexts = self.retriever.find(vector, top_k=5)
         context_lines = [f"- {sentence} (sim {score:.2f})" for sentence, score in contexts]
         
         forces_summary = summarize_forces(force_scores, top_k=3)
@@ -51,16 +51,19 @@ class FutureDecoder:
         )
 
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": DEFAULT_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_content},
-                ],
-                temperature=0.7,
-            )
+            with span("llm"):
+                response = self.client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": DEFAULT_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_content},
+                    ],
+                    temperature=0.7,
+                )
+            record_upstream("chat_completions", response)
             description = response.choices[0].message.content.strip()
         except Exception as e:
+            record_upstream("chat_completions", error=True)
             description = f"(Error generating description: {e})"
 
         return {"summary": description, "contexts": context_lines}
@@ -1,14 +1,30 @@
 from __future__ import annotations
 
+import hashlib
 from functools import lru_cache
+from pathlib import Path
 from typing import List, Tuple
 
 import numpy as np
 
 from src.config.settings import get_settings
-from src.embeddings.embedder import embed_texts
-from src.utils.io_utils import load_force_definitions, load_social_reference
-from src.utils.math_utils import cosine_similarity
+from src.embeddings.embedder import cache_model_name, embed_texts
+from src.utils.io_utils import (
+    load_force_definitions,
+    load_matrix_with_manifest,
+    load_social_reference,
+    save_matrix_with_manifest,
+)
+from src.utils.logger import get_logger
+from src.utils.metrics import CACHE_LOOKUPS
+from src.utils.math_utils import (
+    as_compute_array,
+    compute_dtype,
+    quantize_int8,
+    storage_dtype,
+)
+
+logger = get_logger(__name__)
 
 
 def _collect_sentences() -> List[str]:
@@ -22,19 +38,123 @@ def _collect_sentences() -> List[str]:
     return sentences
 
 
+def _corpus_hash(sentences: List[str]) -> str:
+    return hashlib.sha256("\n".join(sentences).encode("utf-8")).hexdigest()
+
+
+def load_context_matrix(sentences: List[str], cache_path: Path) -> np.ndarray:
+    """
+    Full-precision context embeddings, memory-mapped from `cache_path`.
+
+    The float32 matrix is (re)embedded and written with a JSON manifest when
+    the cache is missing or was built from other sentences or another model.
+    """
+    corpus_hash = _corpus_hash(sentences)
+    cached = load_matrix_with_manifest(cache_path)
+    if cached is not None:
+        matrix, manifest = cached
+        if (
+            manifest.get("corpus_hash") == corpus_hash
+            and manifest.get("model_name") == cache_model_name()
+            and matrix.shape[0] == len(sentences)
+        ):
+            CACHE_LOOKUPS.inc(cache="context", result="hit")
+            return matrix
+
+    CACHE_LOOKUPS.inc(cache="context", result="miss")
+    logger.info("Embedding %d context sentences into %s", len(sentences), cache_path)
+    matrix = np.ascontiguousarray(np.asarray(embed_texts(sentences), dtype=np.float32))
+    save_matrix_with_manifest(
+        cache_path,
+        matrix,
+        {
+            "rows": int(matrix.shape[0]),
+            "dim": int(matrix.shape[1]),
+            "dtype": str(matrix.dtype),
+            "model_name": cache_model_name(),
+            "corpus_hash": corpus_hash,
+        },
+    )
+    return np.load(cache_path, mmap_mode="r", allow_pickle=False)
+
+
 class NearestContextRetriever:
-    def __init__(self) -> None:
+    """
+    Cosine nearest-neighbour lookup over the force and reference sentences.
+
+    The corpus is kept as one (n, dim) matrix in the storage dtype (float16 by
+    default) with its row norms precomputed in the compute dtype, so a lookup
+    is one blockwise matrix-vector product.
+
+    With `storage="int8"` the resident matrix holds int8 codes and a per-row
+    scale instead. Lookups score the codes, then re-rank a shortlist of
+    `top_k * rerank_factor` rows against the float32 cache memory-mapped
+    from disk, so only the shortlisted rows are ever paged in.
+    """
+
+    def __init__(
+        self,
+        eps: float = 1e-8,
+        storage: str | None = None,
+        cache_path: Path | None = None,
+    ) -> None:
+        settings = get_settings()
         self.sentences = _collect_sentences()
-        embeddings = embed_texts(self.sentences)
-        self.embeddings = [np.array(vec) for vec in embeddings]
+        self.storage = storage or settings.numeric.context_storage
+        self.rerank_factor = settings.numeric.context_rerank_factor
+        self.eps = eps
+        self.scales: np.ndarray | None = None
+        self.full: np.ndarray | None = None
+        if self.storage == "int8":
+            self.full = load_context_matrix(
+                self.sentences, cache_path or settings.paths.context_cache
+            )
+            self.embeddings, self.scales = quantize_int8(self.full)
+        elif self.storage == "float":
+            embeddings = embed_texts(self.sentences)
+            self.embeddings = np.asarray(embeddings, dtype=storage_dtype())
+        else:
+            raise ValueError(f"Unknown context storage mode: {self.storage}")
+        self.norms = self._row_norms(self.full if self.full is not None else self.embeddings)
+
+    @staticmethod
+    def _row_norms(matrix: np.ndarray, block: int = 4096) -> np.ndarray:
+        norms = np.empty(len(matrix), dtype=compute_dtype())
+        for start in range(0, len(matrix), block):
+            rows = np.asarray(matrix[start : start + block], dtype=compute_dtype())
+            norms[start : start + block] = np.linalg.norm(rows, axis=1)
+        return norms
+
+    def _dots(self, vector: np.ndarray, block: int = 4096) -> np.ndarray:
+        # float16 and int8 have no BLAS path and accumulate poorly, so rows
+        # are upcast to the compute dtype one block at a time.
+        dots = np.empty(len(self.embeddings), dtype=vector.dtype)
+        for start in range(0, len(self.embeddings), block):
+            rows = self.embeddings[start : start + block].astype(vector.dtype)
+            dots[start : start + block] = rows @ vector
+        if self.scales is not None:
+            dots *= self.scales
+        return dots
 
     def find(self, vector: np.ndarray, top_k: int = 3) -> List[Tuple[str, float]]:
-        scores: List[Tuple[str, float]] = []
-        for sentence, emb in zip(self.sentences, self.embeddings):
-            sim = cosine_similarity(vector, emb)
-            scores.append((sentence, sim))
-        scores.sort(key=lambda item: item[1], reverse=True)
-        return scores[:top_k]
+        if not self.sentences:
+            return []
+        vector = as_compute_array(vector)
+        denom = np.maximum(self.norms * np.linalg.norm(vector), self.eps)
+        sims = self._dots(vector) / denom
+        top_k = min(top_k, len(self.sentences))
+        candidates = np.arange(len(self.sentences))
+        if self.full is not None:
+            # Quantized scores only pick the shortlist; reported similarities
+            # come from the full-precision rows. Sorted indices keep the
+            # memory-mapped reads sequential.
+            size = min(top_k * self.rerank_factor, len(self.sentences))
+            candidates = np.sort(np.argpartition(-sims, size - 1)[:size])
+            rows = np.asarray(self.full[candidates], dtype=vector.dtype)
+            sims = (rows @ vector) / denom[candidates]
+        top = np.argpartition(-sims, top_k - 1)[:top_k]
+        top = top[np.argsort(-sims[top])]
+        return [(self.sentences[candidates[idx]], float(sims[idx])) for idx in top]
 
 
 @lru_cache(maxsize=1)
@@ -1,7 +1,13 @@
 import os
-from typing import Iterable, List, Sequence
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Protocol, Sequence
 
-from openai import NotFoundError, OpenAI
+from openai import NotFoundError
+
+from src.config.settings import get_settings
+from src.embeddings.hashing_backend import HashingEmbeddingClient
+from src.utils.metrics import record_upstream, span
+from src.utils.openai_client import create_openai_client
 
 DEFAULT_EMBED_MODEL = "text-embedding-4"
 FALLBACK_MODELS = [
@@ -12,6 +18,21 @@ FALLBACK_MODELS = [
 ]
 
 
+class EmbeddingBackend(Protocol):
+    """
+    What the engine needs from an embedding provider.
+
+    `embed` returns one vector per non-blank input, in order. The first of
+    `model_candidates` identifies the vectors; caches built for another model
+    are rebuilt.
+    """
+
+    model_candidates: List[str]
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        ...
+
+
 class EmbeddingClient:
     """
     Simple embedding wrapper.
@@ -29,7 +50,7 @@ class EmbeddingClient:
             selected_model,
             *[m for m in FALLBACK_MODELS if m != selected_model],
         ]
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = create_openai_client()
 
     def embed(self, texts: Sequence[str]) -> List[List[float]]:
         if not isinstance(texts, Iterable):
@@ -42,22 +63,63 @@ class EmbeddingClient:
         last_error: Exception | None = None
         for model_name in self.model_candidates:
             try:
-                response = self.client.embeddings.create(
-                    model=model_name,
-                    input=text_list,
-                )
+                with span("embed"):
+                    response = self.client.embeddings.create(
+                        model=model_name,
+                        input=text_list,
+                    )
+                record_upstream("embeddings", response)
                 self.model_name = model_name
                 return [item.embedding for item in response.data]
             except NotFoundError as err:
+                record_upstream("embeddings", error=True)
                 last_error = err
                 continue
+            except Exception:
+                record_upstream("embeddings", error=True)
+                raise
 
         if last_error:
             raise last_error
         raise RuntimeError("Embedding failed without a specific error.")
 
 
-_default_client = EmbeddingClient()
+_BACKENDS: Dict[str, Callable[[], EmbeddingBackend]] = {
+    "openai": EmbeddingClient,
+    "local": lambda: HashingEmbeddingClient(dim=get_settings().embedding.local_dim),
+}
+
+
+def register_embedding_backend(name: str, factory: Callable[[], EmbeddingBackend]) -> None:
+    """Make `factory` selectable as EMBEDDING_BACKEND=`name`."""
+    _BACKENDS[name] = factory
+    get_embedding_client.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_client() -> EmbeddingBackend:
+    """
+    Default client for the configured backend, created on first use.
+
+    Nothing is constructed at import time, so modules importing the embedder
+    load without network access or an API key.
+    """
+    name = get_settings().embedding.backend
+    factory = _BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown embedding backend: {name} (expected one of {sorted(_BACKENDS)})")
+    return factory()
+
+
+def cache_model_name() -> str:
+    """
+    Model name that cache manifests are written with and checked against.
+
+    This is the requested model, not the one that served the last call: it is
+    known before any embedding request, and fallbacks are tried in a fixed
+    order, so a fresh process agrees with the one that built the cache.
+    """
+    return get_embedding_client().model_candidates[0]
 
 
 def embed_texts(texts: Sequence[str]) -> List[List[float]]:
@@ -65,5 +127,5 @@ def embed_texts(texts: Sequence[str]) -> List[List[float]]:
     Convenience function. Returns list using default client.
     """
 
-    return _default_client.embed(texts)
+    return get_embedding_client().embed(texts)
 
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.metrics import span
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+@lru_cache(maxsize=1 << 16)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, 1.0 if (value >> 63) & 1 else -1.0
+
+
+class HashingEmbeddingClient:
+    """
+    Deterministic, offline embeddings from hashed word and character n-grams.
+
+    Every word and every character n-gram of the lower-cased text is hashed
+    to one of `dim` coordinates with a random sign (the "hashing trick"),
+    and the result is L2-normalized. The same text always maps to the same
+    vector on every machine, and texts that share words or word fragments
+    have positive cosine similarity, so retrieval and force scoring behave
+    sensibly without network access or API keys.
+
+    Not a semantic model: use it for tests, benchmarks and offline runs.
+    """
+
+    def __init__(self, dim: int = 1536, ngram_range: Tuple[int, int] = (3, 5)) -> None:
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model_name = f"local-hashing-{dim}"
+        self.model_candidates = [self.model_name]
+
+    def _features(self, text: str) -> List[str]:
+        text = text.lower()
+        features = [f"w:{word}" for word in _WORD.findall(text)]
+        padded = f" {' '.join(_WORD.findall(text))} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            index, sign = _bucket(feature, self.dim)
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if not isinstance(texts, Iterable):
+            raise TypeError("texts must be an iterable of strings")
+        # Blank inputs are dropped, exactly like the OpenAI backend does.
+        with span("embed"):
+            return [self.embed_one(str(t)).tolist() for t in texts if str(t).strip()]
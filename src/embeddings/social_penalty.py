@@ -1,27 +1,65 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from pathlib import Path
 
 import numpy as np
 
 from src.config.settings import get_settings
 from src.embeddings.embedder import embed_texts
 from src.utils.io_utils import load_social_reference
-from src.utils.math_utils import cosine_similarity
+from src.utils.math_utils import as_compute_array, cosine_similarities, cosine_similarity
 
 
-@lru_cache(maxsize=1)
-def _reference_vector() -> np.ndarray:
-    settings = get_settings()
-    sentences = load_social_reference(settings.paths.social_reference_yaml)
+def embed_reference(path: Path) -> np.ndarray:
+    """Mean embedding of the social reference sentences in `path`."""
+    sentences = load_social_reference(path)
     embeddings = embed_texts(sentences)
     if not embeddings:
         raise ValueError("Unable to embed social reference sentences.")
-    return np.mean(np.array(embeddings), axis=0)
+    return as_compute_array(np.mean(np.array(embeddings), axis=0))
+
+
+@lru_cache(maxsize=1)
+def _reference_vector() -> np.ndarray:
+    return embed_reference(get_settings().paths.social_reference_yaml)
 
 
-def compute_social_penalty(vector: np.ndarray, eps: float = 1e-8) -> float:
-    reference = _reference_vector()
+def reference_vector() -> np.ndarray:
+    """Mean embedding of the social reference corpus (embedded once per process)."""
+    return _reference_vector()
+
+
+def compute_social_penalty(
+    vector: np.ndarray, eps: float = 1e-8, reference: np.ndarray | None = None
+) -> float:
+    reference = _reference_vector() if reference is None else reference
     similarity = max(cosine_similarity(vector, reference, eps), eps)
     return 1.0 / similarity
 
+
+def compute_social_penalties(
+    vectors: np.ndarray, eps: float = 1e-8, reference: np.ndarray | None = None
+) -> np.ndarray:
+    """Batched `compute_social_penalty`: (..., dim) -> (...)."""
+    reference = _reference_vector() if reference is None else reference
+    similarity = np.maximum(cosine_similarities(vectors, reference, eps), eps)
+    return 1.0 / similarity
+
+
+def social_penalty_log_gradients(
+    vectors: np.ndarray, eps: float = 1e-8, reference: np.ndarray | None = None
+) -> np.ndarray:
+    """Gradient of log(compute_social_penalty) for (n, dim) vectors."""
+    reference = _reference_vector() if reference is None else reference
+    norms = np.maximum(np.linalg.norm(vectors, axis=-1), eps)
+    reference_norm = max(float(np.linalg.norm(reference)), eps)
+    similarity = cosine_similarities(vectors, reference, eps)
+    # grad cos = r / (|v||r|) - cos * v / |v|^2 ; log penalty = -log cos.
+    grad_cos = reference / (norms[:, None] * reference_norm) - (
+        similarity / norms**2
+    )[:, None] * vectors
+    active = similarity > eps
+    return np.where(
+        active[:, None], -grad_cos / np.where(active, similarity, 1.0)[:, None], 0.0
+    )
@@ -6,6 +6,7 @@ import cma
 import numpy as np
 
 from src.config.model_config import get_model_config
+from src.utils.math_utils import as_compute_array, compute_dtype
 
 
 class CMARunner:
@@ -13,6 +14,7 @@ class CMARunner:
         config = get_model_config().cma
         self.population = config.population_size
         self.sigma = config.sigma_init
+        self.rng = np.random.default_rng()
 
     def sample(self, current_vector: np.ndarray) -> List[np.ndarray]:
         es = cma.CMAEvolutionStrategy(
@@ -21,5 +23,20 @@ class CMARunner:
             {"popsize": self.population, "verbose": -9},
         )
         samples = es.ask()
-        return [np.array(vec) for vec in samples]
+        return [as_compute_array(vec) for vec in samples]
 
+    def sample_deltas(self, current_vectors: np.ndarray) -> np.ndarray:
+        """
+        Sample one population of perturbations per row of `current_vectors`.
+
+        A freshly initialized CMA-ES asks from an isotropic N(mean, sigma^2 I),
+        which is exactly what `sample` does on every step, so the stacked
+        perturbations can be drawn directly without building M strategy
+        objects. Returns an array of shape (rows, population, dim); candidates
+        are `current_vectors[:, None, :] + deltas`.
+        """
+        rows, dim = current_vectors.shape
+        noise = self.rng.standard_normal(
+            (rows, self.population, dim), dtype=compute_dtype()
+        )
+        return self.sigma * noise
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+from src.config.model_config import get_model_config
+from src.engine.height_calculator import HeightCalculator
+
+
+class GradientRunner:
+    """
+    Projected gradient descent on log-height behind the CMARunner interface.
+
+    Instead of random samples, `sample` returns the descent iterates; the
+    simulator scores them like any population and keeps the lowest one.
+    Iterates are projected back into a trust ball around the current state.
+    Descent is deterministic, so every row started from the same state
+    follows the same path (`stochastic` is False).
+    """
+
+    stochastic = False
+
+    def __init__(self, height_calculator: HeightCalculator) -> None:
+        config = get_model_config()
+        self.height_calculator = height_calculator
+        self.population = config.gradient.iterations
+        self.learning_rate = config.gradient.learning_rate
+        self.max_backtracks = config.gradient.max_backtracks
+        self.max_evaluations = config.gradient.max_evaluations
+        self.tolerance = config.gradient.tolerance
+        self.radius = config.gradient.radius
+        self.sigma = config.cma.sigma_init
+        self.evaluations = 0
+
+    def _radius(self, dim: int) -> float:
+        if self.radius is not None:
+            return self.radius
+        return self.sigma * float(np.sqrt(dim))
+
+    def _project(self, vectors: np.ndarray, centers: np.ndarray, radius: float) -> np.ndarray:
+        delta = vectors - centers
+        norms = np.linalg.norm(delta, axis=-1, keepdims=True)
+        scale = np.minimum(1.0, radius / np.maximum(norms, 1e-12))
+        return centers + delta * scale
+
+    def _log_heights(self, vectors: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        self.evaluations += vectors.shape[0]
+        return np.log(self.height_calculator.heights(vectors, centers))
+
+    def descend(self, current_vectors: np.ndarray) -> np.ndarray:
+        """
+        Run up to `population` descent iterations for every row at once.
+
+        Each iteration takes a projected step along the analytic gradient and
+        halves the step size per row until the projected sufficient-decrease
+        condition holds. Descent stops early once `max_evaluations` line-search
+        evaluations are spent or no row improves its log-height by more than
+        `tolerance`. Returns iterates of shape (rows, iterations, dim).
+        """
+        rows, dim = current_vectors.shape
+        radius = self._radius(dim)
+        x = current_vectors.copy()
+        f = self._log_heights(x, current_vectors)
+        budget = self.max_evaluations - 1
+        step = np.full(rows, self.learning_rate, dtype=current_vectors.dtype)
+        iterates = np.empty((rows, self.population, dim), dtype=current_vectors.dtype)
+
+        count = 0
+        while count < self.population and budget > 0:
+            gradient = self.height_calculator.log_height_gradients(x, current_vectors)
+            next_x, next_f = x.copy(), f.copy()
+            pending = np.ones(rows, dtype=bool)
+            for _ in range(min(self.max_backtracks, budget)):
+                budget -= 1
+                trial = self._project(x - step[:, None] * gradient, current_vectors, radius)
+                trial_f = self._log_heights(trial, current_vectors)
+                delta = trial - x
+                bound = (
+                    f
+                    + np.sum(gradient * delta, axis=-1)
+                    + np.sum(delta * delta, axis=-1) / (2.0 * step)
+                )
+                accepted = pending & (trial_f <= bound)
+                next_x[accepted] = trial[accepted]
+                next_f[accepted] = trial_f[accepted]
+                pending &= ~accepted
+                if not pending.any():
+                    break
+                step[pending] *= 0.5
+
+            # Rows that never satisfied the condition keep their previous iterate.
+            step[~pending] *= 1.5
+            improvement = float(np.max(f - next_f))
+            x, f = next_x, next_f
+            iterates[:, count] = x
+            count += 1
+            if improvement <= self.tolerance:
+                break
+        return iterates[:, :count]
+
+    def sample(self, current_vector: np.ndarray) -> List[np.ndarray]:
+        return list(self.descend(current_vector[None, :])[0])
+
+    def sample_deltas(self, current_vectors: np.ndarray) -> np.ndarray:
+        return self.descend(current_vectors) - current_vectors[:, None, :]
@@ -3,6 +3,7 @@ from __future__ import annotations
 import numpy as np
 
 from src.config.model_config import get_model_config
+from src.engine.incremental_height import IncrementalHeight
 from src.forces.force_interaction import ForceInteraction
 from src.penalties.penalty_aggregator import PenaltyAggregator
 
@@ -20,8 +21,44 @@ class HeightCalculator:
         )
         self.epsilon = model_config.height.epsilon
 
+    def pinned(self) -> HeightCalculator:
+        """
+        Calculator frozen on the active force snapshot, for one simulation run.
+
+        Scoring uses the social reference loaded with that snapshot, so a hot
+        reload never pairs one snapshot's forces with another's reference.
+        """
+        force_interaction = self.force_interaction.pinned()
+        reference = force_interaction.manager.data.social_reference
+        return HeightCalculator(
+            force_interaction=force_interaction,
+            penalties=self.penalties.with_reference(reference),
+        )
+
     def height(self, candidate: np.ndarray, current: np.ndarray) -> float:
         force_product = self.force_interaction.multiplicative_score(candidate)
         penalties = self.penalties.total(candidate, current)
         return (1.0 / (force_product + self.epsilon)) * penalties
 
+    def heights(self, candidates: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """
+        Batched `height`.
+
+        `candidates` has shape (..., dim) and `current` must broadcast against it,
+        so a whole population (or a stack of populations) is scored in one pass.
+        """
+        force_products = self.force_interaction.multiplicative_scores(candidates)
+        penalties = self.penalties.totals(candidates, current)
+        return (1.0 / (force_products + self.epsilon)) * penalties
+
+    def incremental(self, current: np.ndarray) -> IncrementalHeight:
+        """Evaluator with the projections of `current` cached for one step."""
+        return IncrementalHeight(self, current)
+
+    def log_height_gradients(
+        self, candidates: np.ndarray, current: np.ndarray
+    ) -> np.ndarray:
+        """Analytic gradient of log(height) for (n, dim) candidates."""
+        force_gradients = self.force_interaction.log_score_gradients(candidates)
+        penalty_gradients = self.penalties.log_total_gradients(candidates, current)
+        return penalty_gradients - force_gradients
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class IncrementalHeight:
+    """
+    Height evaluator bound to the current state(s) of one simulation step.
+
+    For a candidate c = x + d every height term decomposes into projections of
+    the current state x, cached once per step, plus projections of the
+    perturbation d:
+
+        F.c   = F.x + F.d
+        r.c   = r.x + r.d
+        |c|^2 = |x|^2 + 2 x.d + |d|^2
+        |c-x| = |d|
+
+    Scoring a population is therefore one (k + 1)-wide projection of the
+    perturbations plus O(k) arithmetic per candidate, instead of separate
+    force, cosine, norm and distance passes over full vectors.
+
+    `current` may be a single (dim,) state or a stack (..., dim) of states;
+    candidates then carry one extra population axis: (..., population, dim).
+    """
+
+    def __init__(self, height_calculator, current: np.ndarray) -> None:
+        force_interaction = height_calculator.force_interaction
+        penalties = height_calculator.penalties
+        self.current = current
+        self.epsilon = height_calculator.epsilon
+        self.alpha = penalties.distance_penalty.alpha
+        forces = force_interaction.manager.data
+        self.weights = forces.weight_array
+
+        reference = penalties.reference()
+        self.reference_norm = float(np.linalg.norm(reference))
+        self.projection = np.vstack([forces.matrix, reference])
+
+        projected = current @ self.projection.T
+        self.force_dots = projected[..., :-1]
+        self.reference_dot = projected[..., -1]
+        self.current_sq = np.einsum("...i,...i->...", current, current)
+
+    def _heights(
+        self,
+        force_dots: np.ndarray,
+        reference_dot: np.ndarray,
+        norm_sq: np.ndarray,
+        distance: np.ndarray,
+    ) -> np.ndarray:
+        eps = self.epsilon
+        weighted = force_dots * self.weights
+        products = np.prod(np.maximum(weighted, eps) ** self.weights, axis=-1)
+        norms = np.sqrt(np.maximum(norm_sq, 0.0))
+        similarity = reference_dot / np.maximum(norms * self.reference_norm, eps)
+        social = 1.0 / np.maximum(similarity, eps)
+        return social * (1.0 + self.alpha * distance) / (products + eps)
+
+    def heights_from_deltas(self, deltas: np.ndarray) -> np.ndarray:
+        """Heights of `current + deltas` without forming the candidates."""
+        projected = deltas @ self.projection.T
+        cross = np.einsum("...pi,...i->...p", deltas, self.current)
+        delta_sq = np.einsum("...i,...i->...", deltas, deltas)
+        return self._heights(
+            self.force_dots[..., None, :] + projected[..., :-1],
+            self.reference_dot[..., None] + projected[..., -1],
+            self.current_sq[..., None] + 2.0 * cross + delta_sq,
+            np.sqrt(delta_sq),
+        )
+
+    def heights(self, candidates: np.ndarray) -> np.ndarray:
+        return self.heights_from_deltas(candidates - self.current[..., None, :])
+
+    def current_height(self) -> np.ndarray | float:
+        """Height of the current state(s) against themselves, from the cache alone."""
+        heights = self._heights(
+            self.force_dots,
+            self.reference_dot,
+            self.current_sq,
+            np.zeros_like(self.current_sq),
+        )
+        return float(heights) if np.ndim(heights) == 0 else heights
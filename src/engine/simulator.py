@@ -1,48 +1,185 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Sequence
 
 import numpy as np
 
 from src.config.settings import get_settings
 from src.embeddings.embedder import embed_texts
 from src.engine.cma_runner import CMARunner
+from src.engine.gradient_runner import GradientRunner
 from src.engine.height_calculator import HeightCalculator
 from src.utils.logger import get_logger
+from src.utils.math_utils import as_compute_array
+from src.utils.metrics import span
 
 logger = get_logger(__name__)
 
 
-@dataclass
+def _vector_list(vector: np.ndarray, limit: int | None = None) -> List[float]:
+    return (vector if limit is None else vector[:limit]).tolist()
+
+
+@dataclass(slots=True)
 class CandidateScore:
     vector: np.ndarray
     height: float
 
-    def to_dict(self) -> dict:
-        return {"vector": self.vector.tolist(), "height": self.height}
+    def to_dict(self, vector_limit: int | None = None) -> dict:
+        return {"vector": _vector_list(self.vector, vector_limit), "height": self.height}
 
 
-@dataclass
+STEP_FIELDS = (
+    "step",
+    "current_height",
+    "best_height",
+    "best_vector",
+    "force_scores",
+    "candidates",
+)
+
+
+@dataclass(slots=True)
 class StepResult:
+    """
+    One greedy simulation step.
+
+    Candidates are kept as the sampled (population, dim) matrix plus a
+    heights vector; nothing is converted to Python objects until `to_dict`
+    asks for it.
+    """
+
     step: int
     current_height: float
     best_vector: np.ndarray
     best_height: float
     force_scores: dict
-    candidate_scores: List[CandidateScore] = field(default_factory=list)
+    candidate_vectors: np.ndarray
+    candidate_heights: np.ndarray
+
+    @property
+    def candidate_scores(self) -> List[CandidateScore]:
+        return [
+            CandidateScore(vector=vector, height=float(height))
+            for vector, height in zip(self.candidate_vectors, self.candidate_heights)
+        ]
+
+    def to_dict(
+        self,
+        fields: Sequence[str] | None = None,
+        vector_limit: int | None = None,
+        candidate_limit: int | None = None,
+    ) -> dict:
+        """
+        Serialize the requested `fields` (default: all of STEP_FIELDS).
+
+        `vector_limit` keeps only the leading elements of every vector and
+        `candidate_limit` only the first candidates, so previews never
+        convert the full matrices.
+        """
+        fields = STEP_FIELDS if fields is None else fields
+        result: dict = {}
+        for name in fields:
+            if name == "best_vector":
+                result[name] = _vector_list(self.best_vector, vector_limit)
+            elif name == "candidates":
+                count = len(self.candidate_heights)
+                if candidate_limit is not None:
+                    count = min(count, candidate_limit)
+                vectors = self.candidate_vectors[:count]
+                if vector_limit is not None:
+                    vectors = vectors[:, :vector_limit]
+                result[name] = [
+                    {"vector": vector, "height": height}
+                    for vector, height in zip(
+                        vectors.tolist(), self.candidate_heights[:count].tolist()
+                    )
+                ]
+            elif name in STEP_FIELDS:
+                result[name] = getattr(self, name)
+            else:
+                raise ValueError(f"Unknown step field: {name}")
+        return result
+
+
+@dataclass
+class EnsembleStepResult:
+    step: int
+    mean_height: float
+    height_quantiles: Dict[str, float]
+    force_score_distributions: Dict[str, Dict[str, float]]
+    best_member: int
+    best_vector: np.ndarray
+    best_height: float
+    best_force_scores: dict
+    best_trajectory: List[float] = field(default_factory=list)
 
     def to_dict(self) -> dict:
         return {
             "step": self.step,
-            "current_height": self.current_height,
+            "mean_height": self.mean_height,
+            "height_quantiles": self.height_quantiles,
+            "force_score_distributions": self.force_score_distributions,
+            "best_member": self.best_member,
             "best_height": self.best_height,
             "best_vector": self.best_vector.tolist(),
+            "force_scores": self.best_force_scores,
+            "best_trajectory": self.best_trajectory,
+        }
+
+
+@dataclass
+class BeamTrajectory:
+    rank: int
+    heights: List[float]
+    vectors: np.ndarray
+    force_scores: dict
+
+    def to_dict(self) -> dict:
+        return {
+            "rank": self.rank,
+            "heights": self.heights,
+            "final_height": self.heights[-1],
+            "final_vector": self.vectors[-1].tolist(),
             "force_scores": self.force_scores,
-            "candidates": [c.to_dict() for c in self.candidate_scores],
         }
 
 
+@dataclass(slots=True)
+class SimulationState:
+    """
+    Resumable state of one greedy trajectory.
+
+    Holds the current vector, the next step index and the optimizer state:
+    the runner plus the height calculator pinned to the force snapshot the
+    trajectory started with.
+    """
+
+    current: np.ndarray
+    calculator: HeightCalculator
+    runner: object
+    step: int = 0
+    height: float | None = None
+
+
+def _quantile_key(q: float) -> str:
+    return f"p{round(q * 100):d}"
+
+
+def _quantiles(values: np.ndarray, quantiles: Sequence[float]) -> Dict[str, float]:
+    return {
+        _quantile_key(q): float(value)
+        for q, value in zip(quantiles, np.quantile(values, quantiles))
+    }
+
+
+def _summarize(values: np.ndarray, quantiles: Sequence[float]) -> Dict[str, float]:
+    summary = {"mean": float(values.mean()), "std": float(values.std())}
+    summary.update(_quantiles(values, quantiles))
+    return summary
+
+
 class Simulator:
     def __init__(
         self,
@@ -51,47 +188,338 @@ class Simulator:
     ) -> None:
         settings = get_settings()
         self.max_steps = settings.simulation.steps
+        self.ensemble_members = settings.simulation.ensemble_members
+        self.beam_width = settings.simulation.beam_width
+        self.default_optimizer = settings.simulation.optimizer
         self.height_calculator = height_calculator or HeightCalculator()
         self.runner = runner or CMARunner()
+        self._runners = {"cma": self.runner}
+
+    def register_runner(self, name: str, runner) -> None:
+        """Use `runner` whenever optimizer `name` is requested."""
+        self._runners[name] = runner
+
+    def get_runner(
+        self,
+        optimizer: str | None = None,
+        height_calculator: HeightCalculator | None = None,
+    ):
+        """
+        Return the optimizer backend by name ("cma" or "gradient").
+
+        An unregistered gradient backend is built per call around
+        `height_calculator`, so it descends on the same pinned snapshot the
+        run scores with.
+        """
+        name = optimizer or self.default_optimizer
+        if name in self._runners:
+            return self._runners[name]
+        if name == "gradient":
+            return GradientRunner(height_calculator or self.height_calculator)
+        raise ValueError(f"Unknown optimizer: {name}")
+
+    def _start(self, optimizer: str | None):
+        # Freeze the force snapshot for the whole run so a hot reload never
+        # mixes force definitions or weights within one trajectory.
+        calculator = self.height_calculator.pinned()
+        return calculator, self.get_runner(optimizer, calculator)
 
     def _embed_sentence(self, sentence: str) -> np.ndarray:
         embedding = embed_texts([sentence])
         if not embedding:
             raise ValueError("Unable to embed the provided sentence.")
-        return np.array(embedding[0])
+        return as_compute_array(embedding[0])
+
+    def _embed_sentences(self, sentences: Sequence[str]) -> np.ndarray:
+        """Embed all `sentences` with one embedding call: (len(sentences), dim)."""
+        embeddings = embed_texts(list(sentences))
+        if len(embeddings) != len(sentences):
+            raise ValueError("Unable to embed every provided sentence.")
+        return as_compute_array(embeddings)
 
-    def run(self, sentence: str, steps: int | None = None):
+    def run(
+        self, sentence: str, steps: int | None = None, optimizer: str | None = None
+    ):
         current = self._embed_sentence(sentence)
+        yield from self.run_from_vector(current, steps=steps, optimizer=optimizer)
+
+    def run_from_vector(
+        self,
+        current: np.ndarray,
+        steps: int | None = None,
+        optimizer: str | None = None,
+    ):
+        """Run the greedy simulation from an already embedded state."""
         steps = steps or self.max_steps
+        state = self.start_from_vector(current, optimizer=optimizer)
         
-        for step in range(steps):
-            candidates = self.runner.sample(current)
-            candidate_scores: List[CandidateScore] = []
-            for candidate in candidates:
-                height = self.height_calculator.height(candidate, current)
-                candidate_scores.append(CandidateScore(vector=candidate, height=height))
-
-            best = min(candidate_scores, key=lambda c: c.height)
-            best_force_scores = self.height_calculator.force_interaction.dot_products(
-                best.vector
+        for _ in range(steps):
+            yield self.advance(state)
+
+    def start(self, sentence: str, optimizer: str | None = None) -> SimulationState:
+        """Embed `sentence` and return a state that `advance` steps forward."""
+        return self.start_from_vector(self._embed_sentence(sentence), optimizer=optimizer)
+
+    def start_from_vector(
+        self, current: np.ndarray, optimizer: str | None = None
+    ) -> SimulationState:
+        calculator, runner = self._start(optimizer)
+        return SimulationState(current=current, calculator=calculator, runner=runner)
+
+    def advance(self, state: SimulationState) -> StepResult:
+        """Run exactly one greedy step from `state` and move it to the best candidate."""
+        calculator, runner = state.calculator, state.runner
+        current = state.current
+        with span("sample"):
+            candidates = np.asarray(runner.sample(current))
+        with span("score"):
+            evaluator = calculator.incremental(current)
+            heights = evaluator.heights(candidates)
+            best_index = int(np.argmin(heights))
+            best_vector = candidates[best_index]
+            best_height = float(heights[best_index])
+            best_force_scores = calculator.force_interaction.dot_products(best_vector)
+            current_height = evaluator.current_height()
+
+        result = StepResult(
+            step=state.step,
+            current_height=current_height,
+            best_vector=best_vector,
+            best_height=best_height,
+            force_scores=best_force_scores,
+            candidate_vectors=candidates,
+            candidate_heights=heights,
+        )
+        
+        logger.info(
+            "Step %d | best height %.4f | dominant force %s",
+            state.step,
+            best_height,
+            max(best_force_scores, key=best_force_scores.get),
+        )
+        state.current = best_vector
+        state.step += 1
+        state.height = best_height
+        return result
+
+    def run_batch(
+        self,
+        sentences: Sequence[str],
+        steps: Sequence[int | None] | None = None,
+        optimizer: str | None = None,
+    ):
+        """
+        Run one greedy trajectory per sentence in lockstep.
+
+        The sentences are embedded in a single call. Every step samples the
+        populations of all items that are still running as one
+        (items, population, dim) tensor and scores them with one batched
+        height evaluation, like `run_ensemble`. `steps` holds one step count
+        per sentence (None entries use the default).
+
+        Yields, per step, a list of (item index, StepResult) pairs for the
+        items still running at that step.
+        """
+        states = self._embed_sentences(sentences)
+        counts = np.array(
+            [
+                self.max_steps if count is None else count
+                for count in (steps or [None] * len(sentences))
+            ]
+        )
+        calculator, runner = self._start(optimizer)
+        force_interaction = calculator.force_interaction
+        force_names = force_interaction.names()
+
+        for step in range(int(counts.max(initial=0))):
+            active = np.flatnonzero(counts > step)
+            current = states[active]
+            rows = np.arange(len(active))
+
+            with span("sample"):
+                deltas = runner.sample_deltas(current)
+                populations = current[:, None, :] + deltas
+            with span("score"):
+                evaluator = calculator.incremental(current)
+                heights = evaluator.heights_from_deltas(deltas)
+                current_heights = evaluator.current_height()
+                choice = np.argmin(heights, axis=1)
+                best = populations[rows, choice]
+                force_matrix = force_interaction.dot_product_matrix(best)
+            states[active] = best
+
+            results = [
+                (
+                    int(item),
+                    StepResult(
+                        step=step,
+                        current_height=float(current_heights[row]),
+                        best_vector=best[row],
+                        best_height=float(heights[row, choice[row]]),
+                        force_scores={
+                            name: float(score)
+                            for name, score in zip(force_names, force_matrix[row])
+                        },
+                        candidate_vectors=populations[row],
+                        candidate_heights=heights[row],
+                    ),
+                )
+                for row, item in enumerate(active)
+            ]
+            logger.info(
+                "Batch step %d | %d items | best height %.4f",
+                step,
+                len(active),
+                float(heights[rows, choice].min()),
             )
-            current_height = self.height_calculator.height(current, current)
+            yield results
 
-            result = StepResult(
+    def run_ensemble(
+        self,
+        sentence: str,
+        members: int | None = None,
+        steps: int | None = None,
+        quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+        optimizer: str | None = None,
+    ):
+        """
+        Run `members` independent trajectories from one embedding in lockstep.
+
+        Every step samples all populations as one (members, population, dim)
+        tensor and scores it with a single batched height evaluation, so the
+        cost tracks one larger matrix operation rather than M simulations.
+        Yields an EnsembleStepResult of per-step aggregates. Deterministic
+        optimizers (`runner.stochastic` False) are rejected: every member
+        would follow the same trajectory.
+        """
+        calculator, runner = self._start(optimizer)
+        if not getattr(runner, "stochastic", True):
+            raise ValueError(
+                f"Ensembles need a stochastic optimizer; with "
+                f"'{optimizer or self.default_optimizer}' all members would be identical"
+            )
+        seed = self._embed_sentence(sentence)
+        members = members or self.ensemble_members
+        steps = steps or self.max_steps
+        force_interaction = calculator.force_interaction
+        force_names = force_interaction.names()
+        rows = np.arange(members)
+
+        states = np.repeat(seed[None, :], members, axis=0)
+        trajectories = np.empty((steps, members))
+        for step in range(steps):
+            with span("sample"):
+                deltas = runner.sample_deltas(states)
+                populations = states[:, None, :] + deltas
+            with span("score"):
+                heights = calculator.incremental(states).heights_from_deltas(deltas)
+            choice = np.argmin(heights, axis=1)
+            states = populations[rows, choice]
+            trajectories[step] = heights[rows, choice]
+
+            force_matrix = force_interaction.dot_product_matrix(states)
+            best_member = int(np.argmin(trajectories[step]))
+            best_force_scores = {
+                name: float(score)
+                for name, score in zip(force_names, force_matrix[best_member])
+            }
+            result = EnsembleStepResult(
                 step=step,
-                current_height=current_height,
-                best_vector=best.vector,
-                best_height=best.height,
-                force_scores=best_force_scores,
-                candidate_scores=candidate_scores,
+                mean_height=float(trajectories[step].mean()),
+                height_quantiles=_quantiles(trajectories[step], quantiles),
+                force_score_distributions={
+                    name: _summarize(force_matrix[:, idx], quantiles)
+                    for idx, name in enumerate(force_names)
+                },
+                best_member=best_member,
+                best_vector=states[best_member],
+                best_height=float(trajectories[step, best_member]),
+                best_force_scores=best_force_scores,
+                best_trajectory=trajectories[: step + 1, best_member].tolist(),
             )
-            
+
             logger.info(
-                "Step %d | best height %.4f | dominant force %s",
+                "Ensemble step %d | mean height %.4f | best height %.4f (member %d)",
                 step,
-                best.height,
-                max(best_force_scores, key=best_force_scores.get),
+                result.mean_height,
+                result.best_height,
+                best_member,
             )
-            current = best.vector
             yield result
 
+    def run_beam(
+        self,
+        sentence: str,
+        width: int | None = None,
+        steps: int | None = None,
+        optimizer: str | None = None,
+    ) -> List[BeamTrajectory]:
+        """
+        Beam search over CMA candidates instead of greedy selection.
+
+        The frontier holds up to `width` states. Each step expands every
+        frontier state with its own population, scores all
+        (frontier, population) candidates in one batched height evaluation and
+        prunes back to the `width` lowest heights. Only parent indices are kept
+        per step; paths are reconstructed once at the end.
+        Returns the surviving trajectories ordered from best to worst.
+        """
+        frontier = self._embed_sentence(sentence)[None, :]
+        width = width or self.beam_width
+        steps = steps or self.max_steps
+        calculator, runner = self._start(optimizer)
+
+        frontiers: List[np.ndarray] = []
+        frontier_heights: List[np.ndarray] = []
+        parents: List[np.ndarray] = []
+        for step in range(steps):
+            with span("sample"):
+                deltas = runner.sample_deltas(frontier)
+                populations = frontier[:, None, :] + deltas
+            population = populations.shape[1]
+            with span("score"):
+                heights = calculator.incremental(frontier).heights_from_deltas(
+                    deltas
+                ).ravel()
+
+            keep = min(width, heights.size)
+            top = np.argpartition(heights, keep - 1)[:keep]
+            top = top[np.argsort(heights[top])]
+            parent, child = np.divmod(top, population)
+
+            frontier = populations[parent, child]
+            frontiers.append(frontier)
+            frontier_heights.append(heights[top])
+            parents.append(parent)
+            logger.info(
+                "Beam step %d | frontier %d | best height %.4f",
+                step,
+                keep,
+                heights[top[0]],
+            )
+
+        force_interaction = calculator.force_interaction
+        force_names = force_interaction.names()
+        final_scores = force_interaction.dot_product_matrix(frontier)
+
+        trajectories: List[BeamTrajectory] = []
+        for rank in range(frontier.shape[0]):
+            index = rank
+            path_vectors: List[np.ndarray] = []
+            path_heights: List[float] = []
+            for step in reversed(range(steps)):
+                path_vectors.append(frontiers[step][index])
+                path_heights.append(float(frontier_heights[step][index]))
+                index = parents[step][index]
+            trajectories.append(
+                BeamTrajectory(
+                    rank=rank,
+                    heights=path_heights[::-1],
+                    vectors=np.stack(path_vectors[::-1]),
+                    force_scores={
+                        name: float(score)
+                        for name, score in zip(force_names, final_scores[rank])
+                    },
+                )
+            )
+        return trajectories
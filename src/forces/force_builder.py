@@ -1,22 +1,43 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from pathlib import Path
-from typing import Dict, Sequence
+from typing import Dict, List, Sequence, Tuple
 
 import numpy as np
 
 from src.config.settings import get_settings
-from src.embeddings.embedder import embed_texts
-from src.utils.io_utils import ensure_directory, load_force_definitions, save_force_vectors
+from src.embeddings.embedder import cache_model_name, embed_texts
+from src.utils.io_utils import (
+    chunk_iterable,
+    ensure_directory,
+    load_force_definitions,
+    load_force_matrix,
+    save_force_vectors,
+)
 from src.utils.logger import get_logger
+from src.utils.metrics import CACHE_LOOKUPS
 
 logger = get_logger(__name__)
 
+# name -> (sentence hash, vector) of forces that may be reused without re-embedding.
+ReusableForces = Dict[str, Tuple[str, np.ndarray]]
+
 
 def _flatten_sentences(payload: dict | Sequence[str]) -> Sequence[str]:
     if isinstance(payload, dict):
-        return payload.get("sentences", [])
-    return payload
+        sentences = payload.get("sentences", [])
+    else:
+        sentences = payload
+    # The embedder silently drops blank inputs, which would misalign batched
+    # results with their forces, so blanks are removed up front.
+    return [s for s in sentences if str(s).strip()]
+
+
+def sentence_hash(sentences: Sequence[str]) -> str:
+    payload = json.dumps(list(sentences), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 def compute_force_vector(sentences: Sequence[str]) -> np.ndarray:
@@ -26,30 +47,94 @@ def compute_force_vector(sentences: Sequence[str]) -> np.ndarray:
     return np.mean(np.array(embeddings), axis=0)
 
 
-def build_force_vectors(force_yaml: Path | None = None) -> Dict[str, np.ndarray]:
+def _embed_pending(pending: Dict[str, Sequence[str]], batch_size: int) -> Dict[str, np.ndarray]:
+    """Embed the sentences of several forces in shared, batch_size-sized calls."""
+    sentences = [s for force_sentences in pending.values() for s in force_sentences]
+    embeddings: List[List[float]] = []
+    for chunk in chunk_iterable(sentences, batch_size):
+        embeddings.extend(embed_texts(chunk))
+    if len(embeddings) != len(sentences):
+        raise ValueError("No embeddings were produced for the provided sentences.")
+
+    results: Dict[str, np.ndarray] = {}
+    offset = 0
+    for name, force_sentences in pending.items():
+        count = len(force_sentences)
+        results[name] = np.mean(np.array(embeddings[offset : offset + count]), axis=0)
+        offset += count
+    return results
+
+
+def build_force_vectors(
+    force_yaml: Path | None = None, reusable: ReusableForces | None = None
+) -> Tuple[Dict[str, np.ndarray], Dict[str, str]]:
+    """
+    Return (vectors, sentence hashes) for every force in `force_yaml`.
+
+    Forces whose sentence hash matches an entry in `reusable` keep their
+    cached vector; only changed or new forces are embedded.
+    """
     settings = get_settings()
     source = force_yaml or settings.paths.force_yaml
     force_defs = load_force_definitions(source)
-    results: Dict[str, np.ndarray] = {}
+    reusable = reusable or {}
+
+    hashes: Dict[str, str] = {}
+    reused: Dict[str, np.ndarray] = {}
+    pending: Dict[str, Sequence[str]] = {}
     for name, payload in force_defs.items():
         sentences = _flatten_sentences(payload)
         if not sentences:
             continue
-        logger.info("Embedding %s (%d sentences)", name, len(sentences))
-        vector = compute_force_vector(sentences)
-        results[name] = vector
-    return results
+        hashes[name] = sentence_hash(sentences)
+        cached = reusable.get(name)
+        if cached is not None and cached[0] == hashes[name]:
+            reused[name] = cached[1]
+        else:
+            logger.info("Embedding %s (%d sentences)", name, len(sentences))
+            pending[name] = sentences
+
+    embedded = _embed_pending(pending, settings.embedding.batch_size) if pending else {}
+    logger.info("Force vectors: %d reused, %d embedded", len(reused), len(embedded))
+    CACHE_LOOKUPS.inc(len(reused), cache="force", result="hit")
+    CACHE_LOOKUPS.inc(len(pending), cache="force", result="miss")
+    vectors = {name: reused.get(name, embedded.get(name)) for name in hashes}
+    return vectors, hashes
+
+
+def load_reusable_forces(cache_path: Path) -> ReusableForces:
+    """Cached vectors with their sentence hashes, if built with the active model."""
+    try:
+        names, matrix, manifest = load_force_matrix(cache_path)
+    except (FileNotFoundError, ValueError) as err:
+        logger.info("No reusable force cache (%s)", err)
+        return {}
+    if manifest.get("model_name") != cache_model_name():
+        logger.info("Force cache was built with %s; rebuilding all forces", manifest.get("model_name"))
+        return {}
+    hashes = manifest.get("force_hashes", {})
+    return {
+        name: (hashes[name], np.array(matrix[idx]))
+        for idx, name in enumerate(names)
+        if name in hashes
+    }
 
 
 def rebuild_force_cache(
-    force_yaml: Path | None = None, cache_path: Path | None = None
+    force_yaml: Path | None = None, cache_path: Path | None = None, full: bool = False
 ) -> Path:
     settings = get_settings()
+    source = force_yaml or settings.paths.force_yaml
     cache = cache_path or settings.paths.force_cache
-    vectors = build_force_vectors(force_yaml)
-    serializable = {k: v.tolist() for k, v in vectors.items()}
+    reusable = {} if full else load_reusable_forces(cache)
+    vectors, hashes = build_force_vectors(source, reusable=reusable)
     ensure_directory(cache.parent)
-    save_force_vectors(cache, serializable)
+    save_force_vectors(
+        cache,
+        vectors,
+        model_name=cache_model_name(),
+        source_hash=hashlib.sha256(source.read_bytes()).hexdigest(),
+        extra={"force_hashes": hashes},
+    )
     logger.info("Force vector cache saved to %s", cache)
     return cache
-
@@ -13,9 +13,18 @@ class ForceInteraction:
         self.manager = manager or ForceManager()
         self.height_config = get_model_config().height
 
+    def pinned(self) -> ForceInteraction:
+        return ForceInteraction(manager=self.manager.pinned())
+
+    def names(self) -> list[str]:
+        return self.manager.names()
+
     def dot_products(self, vector: np.ndarray) -> Dict[str, float]:
         return self.manager.weighted_dot(vector)
 
+    def dot_product_matrix(self, vectors: np.ndarray) -> np.ndarray:
+        return self.manager.weighted_dot_matrix(vectors)
+
     def multiplicative_score(self, vector: np.ndarray) -> float:
         eps = self.height_config.epsilon
         product = 1.0
@@ -25,3 +34,27 @@ class ForceInteraction:
             product *= clamped**weight
         return product
 
+    def multiplicative_scores(self, vectors: np.ndarray) -> np.ndarray:
+        """Batched `multiplicative_score`: (..., dim) -> (...)."""
+        eps = self.height_config.epsilon
+        data = self.manager.data
+        clamped = np.maximum((vectors @ data.matrix.T) * data.weight_array, eps)
+        return np.prod(clamped**data.weight_array, axis=-1)
+
+    def log_score_gradients(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Gradient of log(multiplicative_score + epsilon) for (n, dim) vectors.
+
+        Forces clamped at epsilon contribute nothing, matching the subgradient
+        of the max() in `multiplicative_score`.
+        """
+        eps = self.height_config.epsilon
+        data = self.manager.data
+        weights = data.weight_array
+        dots = (vectors @ data.matrix.T) * weights
+        active = dots > eps
+        # d/dv log prod = sum_i w_i * (w_i f_i) / (w_i v.f_i) over active forces.
+        coefficients = np.where(active, weights**2 / np.where(active, dots, 1.0), 0.0)
+        products = np.prod(np.maximum(dots, eps) ** weights, axis=-1)
+        scale = products / (products + eps)
+        return (coefficients @ data.matrix) * scale[:, None]
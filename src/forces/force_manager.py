@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict
 
 import numpy as np
 
-from src.config.settings import get_settings
-from src.utils.io_utils import load_force_vectors, load_force_weights
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,19 +14,58 @@ logger = get_logger(__name__)
 class ForceData:
     vectors: Dict[str, np.ndarray]
     weights: Dict[str, float]
+    # Stacked (n_forces, dim) matrix backing `vectors`, when loaded from the cache.
+    matrix: np.ndarray | None = None
+    manifest: dict = field(default_factory=dict)
+    version: str = ""
+    # Mean embedding of the social reference corpus loaded with this snapshot;
+    # None scores against the process-wide reference.
+    social_reference: np.ndarray | None = None
+    weight_array: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Stacked views used by the batched scoring paths; row order follows `vectors`.
+        names = list(self.vectors.keys())
+        if self.matrix is None:
+            self.matrix = np.stack([self.vectors[name] for name in names])
+        # Weights follow the matrix dtype so float32 scoring is not upcast.
+        self.weight_array = np.array(
+            [float(self.weights.get(name, 1.0)) for name in names],
+            dtype=self.matrix.dtype,
+        )
 
 
 class ForceManager:
-    def __init__(self) -> None:
-        settings = get_settings()
-        self._cache_path = settings.paths.force_cache
-        self._weights_path = settings.paths.weights_file
-        self.data = self._load_data()
+    """
+    Force vectors and weights used for scoring.
+
+    Without explicit `data` the manager reads through the shared, watched
+    ForceStore, so cache or weight edits are picked up without a restart.
+    Call `pinned()` to freeze the current snapshot for a whole simulation.
+    """
+
+    def __init__(self, data: ForceData | None = None, store=None) -> None:
+        self._data = data
+        if data is None:
+            # Imported lazily: the store module builds on ForceData above.
+            from src.forces.force_store import get_force_store
+
+            self._store = store or get_force_store()
+
+    @property
+    def data(self) -> ForceData:
+        if self._data is not None:
+            return self._data
+        return self._store.current()
 
-    def _load_data(self) -> ForceData:
-        vectors = load_force_vectors(self._cache_path)
-        weights = load_force_weights(self._weights_path)
-        return ForceData(vectors=vectors, weights=weights)
+    def pinned(self) -> ForceManager:
+        """Manager bound to the snapshot that is active right now."""
+        if self._data is not None:
+            return self
+        return ForceManager(data=self.data)
+
+    def version(self) -> str:
+        return self.data.version
 
     def names(self) -> list[str]:
         return list(self.data.vectors.keys())
@@ -39,10 +76,34 @@ class ForceManager:
     def weight(self, name: str) -> float:
         return float(self.data.weights.get(name, 1.0))
 
+    def with_weights(self, weights: Dict[str, float]) -> ForceManager:
+        """Copy sharing the loaded force vectors but using different weights."""
+        data = self.data
+        return ForceManager(
+            data=ForceData(
+                vectors=data.vectors,
+                weights=dict(weights),
+                matrix=data.matrix,
+                manifest=data.manifest,
+                social_reference=data.social_reference,
+            )
+        )
+
+    def matrix(self) -> np.ndarray:
+        return self.data.matrix
+
+    def weight_array(self) -> np.ndarray:
+        return self.data.weight_array
+
     def weighted_dot(self, vector: np.ndarray) -> Dict[str, float]:
+        data = self.data
         results: Dict[str, float] = {}
-        for name, force_vector in self.data.vectors.items():
-            score = float(np.dot(vector, force_vector)) * self.weight(name)
+        for name, force_vector in data.vectors.items():
+            score = float(np.dot(vector, force_vector)) * float(data.weights.get(name, 1.0))
             results[name] = score
         return results
 
+    def weighted_dot_matrix(self, vectors: np.ndarray) -> np.ndarray:
+        """Batched `weighted_dot`: (..., dim) -> (..., n_forces)."""
+        data = self.data
+        return (vectors @ data.matrix.T) * data.weight_array
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from src.config.settings import get_settings
+from src.embeddings.social_penalty import embed_reference
+from src.forces.force_manager import ForceData
+from src.utils.io_utils import force_manifest_path, load_force_matrix, load_force_weights
+from src.utils.logger import get_logger
+from src.utils.math_utils import compute_dtype
+
+logger = get_logger(__name__)
+
+
+class ForceStore:
+    """
+    Versioned, watched holder of the active force snapshot.
+
+    The cache matrix, its manifest, the weights file and the social
+    reference corpus are polled (at most once per `check_interval` seconds,
+    on access). When any of them changes a new ForceData is loaded and
+    swapped in atomically; readers that already hold the previous snapshot
+    keep using it, and its memory map stays valid because the cache files
+    are replaced, never rewritten in place. A negative interval disables
+    watching.
+
+    The first snapshot scores against the process-wide social reference.
+    Once the corpus at `reference_path` changes, it is re-embedded into the
+    snapshot that swaps in; later reloads carry that reference over.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        weights_path: Path,
+        check_interval: float = 5.0,
+        reference_path: Path | None = None,
+    ) -> None:
+        self.cache_path = cache_path
+        self.weights_path = weights_path
+        self.reference_path = reference_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = self._file_signature()
+        self._snapshot = self._load()
+        self._last_check = time.monotonic()
+        self.loaded_at = time.time()
+
+    def _watched_paths(self) -> list[Path]:
+        paths = [self.cache_path, force_manifest_path(self.cache_path), self.weights_path]
+        if self.reference_path is not None:
+            paths.append(self.reference_path)
+        return paths
+
+    def _file_signature(self) -> tuple:
+        signature = []
+        for path in self._watched_paths():
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load(
+        self, previous: ForceData | None = None, reference_changed: bool = False
+    ) -> ForceData:
+        names, matrix, manifest = load_force_matrix(self.cache_path, mmap_mode="r")
+        if matrix.dtype != compute_dtype():
+            # Only a non-float32 compute policy pays for a private copy.
+            matrix = matrix.astype(compute_dtype())
+        weights = load_force_weights(self.weights_path)
+        digest = hashlib.sha256()
+        digest.update(json.dumps(manifest, sort_keys=True).encode("utf-8"))
+        digest.update(json.dumps(weights, sort_keys=True).encode("utf-8"))
+        social_reference = previous.social_reference if previous is not None else None
+        if reference_changed:
+            social_reference = embed_reference(self.reference_path)
+        if social_reference is not None:
+            digest.update(social_reference.tobytes())
+        return ForceData(
+            vectors={name: matrix[idx] for idx, name in enumerate(names)},
+            weights=weights,
+            matrix=matrix,
+            manifest=manifest,
+            version=digest.hexdigest()[:12],
+            social_reference=social_reference,
+        )
+
+    def current(self) -> ForceData:
+        if self.check_interval >= 0:
+            now = time.monotonic()
+            if now - self._last_check >= self.check_interval:
+                self.refresh()
+        return self._snapshot
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if the watched files changed (or unconditionally). Returns True on swap."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            signature = self._file_signature()
+            if signature == self._signature and not force:
+                return False
+            reference_changed = (
+                self.reference_path is not None and signature[-1] != self._signature[-1]
+            )
+            try:
+                snapshot = self._load(self._snapshot, reference_changed)
+            except Exception as err:
+                # Half-written edits are common while files are being replaced;
+                # keep serving the last good snapshot and retry on the next check.
+                logger.warning("Force reload failed, keeping %s: %s", self._snapshot.version, err)
+                return False
+            previous = self._snapshot.version
+            self._snapshot = snapshot
+            self._signature = signature
+            self.loaded_at = time.time()
+        logger.info("Force store reloaded: %s -> %s", previous, snapshot.version)
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_force_store() -> ForceStore:
+    settings = get_settings()
+    return ForceStore(
+        settings.paths.force_cache,
+        settings.paths.weights_file,
+        check_interval=settings.simulation.force_reload_interval,
+        reference_path=settings.paths.social_reference_yaml,
+    )
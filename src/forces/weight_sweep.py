@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from src.engine.height_calculator import HeightCalculator
+from src.engine.simulator import Simulator
+from src.forces.force_interaction import ForceInteraction
+from src.forces.force_manager import ForceData, ForceManager
+from src.penalties.penalty_aggregator import PenaltyAggregator
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SweepResult:
+    force_names: List[str]
+    weights: np.ndarray
+    force_scores: np.ndarray
+    heights: np.ndarray
+    final_heights: np.ndarray | None = None
+
+    def dominant_forces(self) -> np.ndarray:
+        names = np.array(self.force_names)
+        return names[np.argmax(self.force_scores, axis=1)]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        columns: Dict[str, np.ndarray] = {
+            "scenario": np.arange(len(self.heights)),
+            "height": self.heights,
+            "dominant_force": self.dominant_forces(),
+        }
+        for idx, name in enumerate(self.force_names):
+            columns[f"weight_{name}"] = self.weights[:, idx]
+            columns[f"score_{name}"] = self.force_scores[:, idx]
+        if self.final_heights is not None:
+            columns["final_height"] = self.final_heights
+        return columns
+
+
+def _columns_for(manager: ForceManager, forces: Sequence[str] | None) -> List[int]:
+    names = manager.names()
+    if not forces:
+        return list(range(len(names)))
+    unknown = set(forces) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown forces: {', '.join(sorted(unknown))}")
+    return [names.index(name) for name in forces]
+
+
+def grid_weights(
+    manager: ForceManager, values: Sequence[float], forces: Sequence[str] | None = None
+) -> np.ndarray:
+    """Full grid over `values` for the selected forces; others keep their weight."""
+    columns = _columns_for(manager, forces)
+    grid = np.array(list(itertools.product(values, repeat=len(columns))))
+    weights = np.tile(manager.weight_array(), (len(grid), 1))
+    weights[:, columns] = grid
+    return weights
+
+
+def sample_weights(
+    manager: ForceManager,
+    samples: int,
+    low: float = 0.5,
+    high: float = 1.5,
+    forces: Sequence[str] | None = None,
+    seed: int | None = None,
+) -> np.ndarray:
+    """Uniform random weights in [low, high] for the selected forces."""
+    columns = _columns_for(manager, forces)
+    rng = np.random.default_rng(seed)
+    weights = np.tile(manager.weight_array(), (samples, 1))
+    weights[:, columns] = rng.uniform(low, high, size=(samples, len(columns)))
+    return weights
+
+
+def evaluate_weights(
+    seed_vector: np.ndarray,
+    weights: np.ndarray,
+    height_calculator: HeightCalculator | None = None,
+) -> SweepResult:
+    """
+    Score every weight vector (rows of `weights`) against one seed state.
+
+    The unweighted force dot products and the weight-independent penalty are
+    computed once; each scenario only rescales the shared dot products, so
+    the whole sweep is a handful of (scenarios, forces) array operations.
+    """
+    calculator = (height_calculator or HeightCalculator()).pinned()
+    manager = calculator.force_interaction.manager
+    eps = calculator.epsilon
+
+    raw_dots = manager.matrix() @ seed_vector
+    scores = weights * raw_dots
+    products = np.prod(np.maximum(scores, eps) ** weights, axis=1)
+    penalty = calculator.penalties.total(seed_vector, seed_vector)
+    heights = penalty / (products + eps)
+    return SweepResult(
+        force_names=manager.names(),
+        weights=weights,
+        force_scores=scores,
+        heights=heights,
+    )
+
+
+_WORKER_STATE: dict = {}
+
+
+def _init_worker(
+    names: List[str], matrix: np.ndarray, reference: np.ndarray, alpha: float
+) -> None:
+    _WORKER_STATE.update(names=names, matrix=matrix, reference=reference, alpha=alpha)
+    # Forked workers inherit the parent's global RNG state, which the cma
+    # package samples from; reseed so scenarios do not share noise.
+    np.random.seed()
+
+
+def _simulate_scenario(args: tuple) -> float:
+    seed_vector, weight_row, steps = args
+    names = _WORKER_STATE["names"]
+    vectors = dict(zip(names, _WORKER_STATE["matrix"]))
+    manager = ForceManager(
+        data=ForceData(vectors=vectors, weights=dict(zip(names, weight_row.tolist())))
+    )
+    calculator = HeightCalculator(
+        force_interaction=ForceInteraction(manager=manager),
+        penalties=PenaltyAggregator(
+            distance_alpha=_WORKER_STATE["alpha"],
+            social_reference=_WORKER_STATE["reference"],
+        ),
+    )
+    simulator = Simulator(height_calculator=calculator)
+    best_height = float("nan")
+    for result in simulator.run_from_vector(seed_vector, steps=steps):
+        best_height = result.best_height
+    return best_height
+
+
+def simulate_weights(
+    seed_vector: np.ndarray,
+    weights: np.ndarray,
+    steps: int,
+    height_calculator: HeightCalculator | None = None,
+    workers: int | None = None,
+) -> np.ndarray:
+    """
+    Run a short simulation per weight vector across a process pool.
+
+    Workers receive the force matrix and social reference once at start-up,
+    so no process embeds anything or reloads the cache.
+    Returns the final best height of every scenario.
+    """
+    calculator = (height_calculator or HeightCalculator()).pinned()
+    manager = calculator.force_interaction.manager
+    initargs = (
+        manager.names(),
+        np.asarray(manager.matrix()),
+        calculator.penalties.reference(),
+        calculator.penalties.distance_penalty.alpha,
+    )
+    tasks = [(seed_vector, row, steps) for row in weights]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=initargs
+    ) as pool:
+        final_heights = list(pool.map(_simulate_scenario, tasks, chunksize=16))
+    logger.info("Simulated %d weight scenarios for %d steps", len(tasks), steps)
+    return np.array(final_heights)
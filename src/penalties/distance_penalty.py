@@ -11,3 +11,17 @@ class DistancePenalty:
         distance = float(np.linalg.norm(candidate - current))
         return 1.0 + self.alpha * distance
 
+    def batch(self, candidates: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """(..., dim) candidates against a broadcastable current -> (...)."""
+        distances = np.linalg.norm(candidates - current, axis=-1)
+        return 1.0 + self.alpha * distances
+
+    def log_gradient(self, candidates: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """Gradient of log(penalty) w.r.t. (n, dim) candidates; zero at `current`."""
+        delta = candidates - current
+        distances = np.linalg.norm(delta, axis=-1)
+        safe = np.where(distances > 0, distances, 1.0)
+        scale = np.where(
+            distances > 0, self.alpha / (safe * (1.0 + self.alpha * distances)), 0.0
+        )
+        return delta * scale[:, None]
@@ -2,16 +2,48 @@ from __future__ import annotations
 
 import numpy as np
 
-from src.embeddings.social_penalty import compute_social_penalty
+from src.embeddings.social_penalty import (
+    compute_social_penalties,
+    compute_social_penalty,
+    reference_vector,
+    social_penalty_log_gradients,
+)
 from src.penalties.distance_penalty import DistancePenalty
 
 
 class PenaltyAggregator:
-    def __init__(self, distance_alpha: float = 0.5) -> None:
+    def __init__(
+        self, distance_alpha: float = 0.5, social_reference: np.ndarray | None = None
+    ) -> None:
         self.distance_penalty = DistancePenalty(alpha=distance_alpha)
+        self.social_reference = social_reference
+
+    def with_reference(self, social_reference: np.ndarray | None) -> PenaltyAggregator:
+        """Aggregator scoring against `social_reference` (this one when None)."""
+        if social_reference is None or social_reference is self.social_reference:
+            return self
+        return PenaltyAggregator(
+            distance_alpha=self.distance_penalty.alpha, social_reference=social_reference
+        )
+
+    def reference(self) -> np.ndarray:
+        if self.social_reference is not None:
+            return self.social_reference
+        return reference_vector()
 
     def total(self, candidate: np.ndarray, current: np.ndarray) -> float:
-        social = compute_social_penalty(candidate)
+        social = compute_social_penalty(candidate, reference=self.social_reference)
         distance = self.distance_penalty(candidate, current)
         return social * distance
 
+    def totals(self, candidates: np.ndarray, current: np.ndarray) -> np.ndarray:
+        social = compute_social_penalties(candidates, reference=self.social_reference)
+        distance = self.distance_penalty.batch(candidates, current)
+        return social * distance
+
+    def log_total_gradients(
+        self, candidates: np.ndarray, current: np.ndarray
+    ) -> np.ndarray:
+        social = social_penalty_log_gradients(candidates, reference=self.social_reference)
+        distance = self.distance_penalty.log_gradient(candidates, current)
+        return social + distance
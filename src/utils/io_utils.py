@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import gzip
 import json
+import os
+import zlib
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
 
 import numpy as np
 import yaml
 
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def ensure_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
@@ -29,16 +36,119 @@ def load_force_weights(path: Path) -> Dict[str, float]:
         return json.load(f)
 
 
-def save_force_vectors(path: Path, vectors: Dict[str, List[float]]) -> None:
+FORCE_CACHE_VERSION = 1
+
+
+def force_manifest_path(path: Path) -> Path:
+    return path.with_suffix(".json")
+
+
+def _atomic_write_bytes(path: Path, write) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def save_force_vectors(
+    path: Path,
+    vectors: Dict[str, Sequence[float]],
+    model_name: str | None = None,
+    source_hash: str | None = None,
+    extra: dict | None = None,
+) -> None:
+    """
+    Write the force cache as a contiguous float32 matrix plus a JSON manifest.
+
+    Row i of `<path>` (.npy) is the vector of `names[i]` in the manifest
+    (`<path>` with a .json suffix). Both files are replaced atomically; the
+    matrix goes first so a manifest never points at a stale matrix shape.
+    """
+    ensure_directory(path.parent)
+    names = list(vectors.keys())
+    matrix = np.ascontiguousarray(
+        np.stack([np.asarray(vectors[name], dtype=np.float32) for name in names])
+    )
+    manifest = {
+        "version": FORCE_CACHE_VERSION,
+        "names": names,
+        "dim": int(matrix.shape[1]),
+        "dtype": str(matrix.dtype),
+        "model_name": model_name,
+        "source_hash": source_hash,
+        **(extra or {}),
+    }
+    save_matrix_with_manifest(path, matrix, manifest)
+
+
+def save_matrix_with_manifest(path: Path, matrix: np.ndarray, manifest: dict) -> None:
+    """Atomically write `matrix` to `<path>` (.npy) and `manifest` next to it (.json)."""
     ensure_directory(path.parent)
-    np.save(path, vectors)
+    _atomic_write_bytes(path, lambda f: np.save(f, matrix))
+    _atomic_write_bytes(
+        force_manifest_path(path),
+        lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")),
+    )
+
+
+def load_matrix_with_manifest(
+    path: Path, mmap_mode: str | None = "r"
+) -> Tuple[np.ndarray, dict] | None:
+    """(matrix, manifest) written by `save_matrix_with_manifest`, or None if either is missing."""
+    if not path.exists() or not force_manifest_path(path).exists():
+        return None
+    with force_manifest_path(path).open("r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return np.load(path, mmap_mode=mmap_mode, allow_pickle=False), manifest
+
+
+def _migrate_legacy_force_cache(path: Path) -> None:
+    # Legacy caches are a pickled {name: list} dict saved through np.save.
+    # This is the only place that still unpickles; the file is rewritten in
+    # the current format so later loads are pickle-free.
+    data = np.load(path, allow_pickle=True).item()
+    save_force_vectors(path, data)
+    logger.info("Migrated legacy force cache %s to format v%d", path, FORCE_CACHE_VERSION)
 
 
-def load_force_vectors(path: Path) -> Dict[str, np.ndarray]:
+def load_force_manifest(path: Path) -> dict:
+    with force_manifest_path(path).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_force_matrix(
+    path: Path, mmap_mode: str | None = "r"
+) -> Tuple[List[str], np.ndarray, dict]:
+    """
+    Load (names, matrix, manifest) from the force cache.
+
+    With the default `mmap_mode="r"` the matrix is memory-mapped read-only, so
+    every worker process maps the same page-cache pages instead of holding
+    its own copy.
+    """
     if not path.exists():
         raise FileNotFoundError(f"Force vector cache missing: {path}")
-    data = np.load(path, allow_pickle=True).item()
-    return {k: np.array(v) for k, v in data.items()}
+    if not force_manifest_path(path).exists():
+        _migrate_legacy_force_cache(path)
+
+    manifest = load_force_manifest(path)
+    if manifest.get("version") != FORCE_CACHE_VERSION:
+        raise ValueError(
+            f"Unsupported force cache version {manifest.get('version')} in {path}"
+        )
+    matrix = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+    names = manifest["names"]
+    if matrix.shape != (len(names), manifest["dim"]):
+        raise ValueError(
+            f"Force cache {path} has shape {matrix.shape}, manifest expects "
+            f"({len(names)}, {manifest['dim']})"
+        )
+    return names, matrix, manifest
+
+
+def load_force_vectors(path: Path, mmap_mode: str | None = "r") -> Dict[str, np.ndarray]:
+    names, matrix, _ = load_force_matrix(path, mmap_mode=mmap_mode)
+    return {name: matrix[idx] for idx, name in enumerate(names)}
 
 
 def load_social_reference(path: Path) -> List[str]:
@@ -64,3 +174,111 @@ def append_jsonl(path: Path, records: Iterable[dict]) -> None:
             f.write(json.dumps(record, ensure_ascii=False))
             f.write("\n")
 
+
+def _iter_run_lines(path: Path, compressed: bool) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (end offset, line) for every complete record of a run file.
+
+    A trailing partial line or truncated gzip member, left behind by a run
+    that died mid-write, is skipped. The file is read in fixed-size chunks.
+    """
+    with path.open("rb") as f:
+        offset = 0
+        if not compressed:
+            for line in f:
+                offset += len(line)
+                if line.endswith(b"\n"):
+                    yield offset, line
+            return
+
+        decompressor = zlib.decompressobj(wbits=31)
+        pending = b""
+        while chunk := f.read(1 << 20):
+            data = chunk
+            while data:
+                try:
+                    pending += decompressor.decompress(data)
+                except zlib.error:
+                    return
+                if not decompressor.eof:
+                    offset += len(data)
+                    break
+                offset += len(data) - len(decompressor.unused_data)
+                yield offset, pending
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=31)
+                pending = b""
+
+
+def read_run(path: Path) -> Iterator[dict]:
+    """Records of a JSONL run file written by RunWriter (plain or .gz)."""
+    for _, line in _iter_run_lines(path, path.suffix == ".gz"):
+        yield json.loads(line)
+
+
+class RunWriter:
+    """
+    Incremental JSONL writer for simulation runs.
+
+    Every `write` serializes one record and flushes it, so memory stays
+    constant and a crashed run keeps every finished step. With `fields`, only
+    those keys are persisted. A ".gz" path (or `compress=True`) writes each
+    line as its own gzip member, so the file stays readable after any
+    complete line. With `resume=True` a partial trailing record is cut off
+    and `completed` / `last_record` describe what is already on disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fields: Sequence[str] | None = None,
+        compress: bool | None = None,
+        resume: bool = False,
+    ) -> None:
+        self.path = path
+        self.fields = tuple(fields) if fields is not None else None
+        self.compress = path.suffix == ".gz" if compress is None else compress
+        self.completed = 0
+        self.last_record: dict | None = None
+        ensure_directory(path.parent)
+
+        if resume and path.exists():
+            end = 0
+            last_line = None
+            for end, last_line in _iter_run_lines(path, self.compress):
+                self.completed += 1
+            if last_line is not None:
+                self.last_record = json.loads(last_line)
+            if end != path.stat().st_size:
+                logger.warning("Dropping partial record at the end of %s", path)
+                os.truncate(path, end)
+        self._file = path.open("ab")
+
+    def write(self, record: dict) -> None:
+        if self.fields is not None:
+            record = {key: record[key] for key in self.fields if key in record}
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.write(gzip.compress(line) if self.compress else line)
+        self._file.flush()
+        self.completed += 1
+        self.last_record = record
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> RunWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def save_columns(path: Path, columns: Dict[str, np.ndarray]) -> None:
+    """Write equally long 1-D columns as a compressed, pickle-free .npz file."""
+    ensure_directory(path.parent)
+    np.savez_compressed(path, **columns)
+
+
+def load_columns(path: Path) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
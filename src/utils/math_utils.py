@@ -1,7 +1,26 @@
 from __future__ import annotations
 
+from typing import Any
+
 import numpy as np
 
+from src.config.settings import get_settings
+
+
+def compute_dtype() -> np.dtype:
+    """dtype used for embeddings, force matrices, sampling and scoring."""
+    return np.dtype(get_settings().numeric.compute_dtype)
+
+
+def storage_dtype() -> np.dtype:
+    """dtype used for stored reference corpora."""
+    return np.dtype(get_settings().numeric.storage_dtype)
+
+
+def as_compute_array(values: Any) -> np.ndarray:
+    """Convert embeddings (lists or arrays) to the compute dtype without copying if possible."""
+    return np.asarray(values, dtype=compute_dtype())
+
 
 def normalize(vector: np.ndarray) -> np.ndarray:
     norm = np.linalg.norm(vector)
@@ -14,3 +33,28 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray, eps: float = 1e-8) -> float:
     denom = max(np.linalg.norm(a) * np.linalg.norm(b), eps)
     return float(np.dot(a, b) / denom)
 
+
+def cosine_similarities(
+    vectors: np.ndarray, b: np.ndarray, eps: float = 1e-8
+) -> np.ndarray:
+    """Row-wise `cosine_similarity` of (..., dim) vectors against one vector."""
+    denom = np.maximum(np.linalg.norm(vectors, axis=-1) * np.linalg.norm(b), eps)
+    return (vectors @ b) / denom
+
+
+def quantize_int8(matrix: np.ndarray, block: int = 4096) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization: row ~= codes * scale.
+
+    Rows are read `block` at a time, so a memory-mapped matrix is never fully
+    materialized in float. Returns (int8 codes, compute-dtype scales).
+    """
+    codes = np.empty(matrix.shape, dtype=np.int8)
+    scales = np.empty(matrix.shape[0], dtype=compute_dtype())
+    for start in range(0, matrix.shape[0], block):
+        rows = np.asarray(matrix[start : start + block], dtype=compute_dtype())
+        scale = np.max(np.abs(rows), axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        codes[start : start + block] = np.rint(rows / scale[:, None])
+        scales[start : start + block] = scale
+    return codes, scales
@@ -0,0 +1,374 @@
+"""Stage timings, counters and histograms with Prometheus text export.
+
+`span(stage)` times one engine stage. Every span is observed by the
+`forcepath_stage_seconds` histogram and added to each `Timings` collector
+active in the current context, which is how per-request and per-step
+breakdowns are gathered without threading timer objects through the engine.
+
+Collectors live in a context variable, so work handed to another thread only
+reports to them when it runs in a copy of the caller's context (see
+`bind_context`).
+"""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Seconds; spans range from sub-millisecond scoring to multi-second LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _samples(self) -> Iterable[Tuple[str, LabelValues, float, Sequence[str]]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, value, extra_names in self._samples():
+            labels = _format_labels(self.label_names + tuple(extra_names), values)
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", key, value, ()
+
+
+class Gauge(_Metric):
+    """Current value, either set explicitly or read from `function` at export time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        function: Callable[[], float] | None = None,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.function = function
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self):
+        if self.function is not None:
+            yield "", (), float(self.function()), ()
+            return
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", key, value, ()
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """
+    Bucketed distribution per label set.
+
+    Quantiles are interpolated within buckets, the same estimate
+    Prometheus' `histogram_quantile` computes from the exported buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    def quantile(self, q: float, **labels: str) -> float | None:
+        """Estimated q-quantile (0..1), or None before the first observation."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None or series.count == 0:
+                return None
+            counts = list(series.counts)
+            count = series.count
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def summary(self, quantiles: Sequence[float] = (0.5, 0.95, 0.99)) -> Dict[str, dict]:
+        """Count, sum and quantiles per label set, keyed by the joined label values."""
+        with self._lock:
+            keys = {key: (series.count, series.total) for key, series in self._series.items()}
+        result = {}
+        for key, (count, total) in sorted(keys.items()):
+            labels = dict(zip(self.label_names, key))
+            entry = {"count": count, "sum": total}
+            for q in quantiles:
+                entry[f"p{round(q * 100):d}"] = self.quantile(q, **labels)
+            result[",".join(key)] = entry
+        return result
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(
+                (key, list(series.counts), series.total, series.count)
+                for key, series in self._series.items()
+            )
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield "_bucket", key + (_format_value(bound),), cumulative, ("le",)
+            yield "_sum", key, total, ()
+            yield "_count", key, count, ()
+
+
+class MetricsRegistry:
+    """Named metrics, created on first use and rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        function: Callable[[], float] | None = None,
+    ) -> Gauge:
+        gauge = self._get_or_create(Gauge, name, help, labels)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labels, buckets)
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "forcepath_stage_seconds", "Time spent per engine stage", labels=("stage",)
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "forcepath_upstream_requests_total",
+    "Calls to the upstream model API",
+    labels=("endpoint", "outcome"),
+)
+UPSTREAM_TOKENS = REGISTRY.counter(
+    "forcepath_upstream_tokens_total",
+    "Tokens reported by the upstream model API",
+    labels=("endpoint",),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "forcepath_cache_lookups_total",
+    "Embedding cache lookups",
+    labels=("cache", "result"),
+)
+
+
+def record_upstream(endpoint: str, response: object | None = None, error: bool = False) -> None:
+    """Count one upstream API call and the total tokens its `usage` reports."""
+    UPSTREAM_REQUESTS.inc(endpoint=endpoint, outcome="error" if error else "ok")
+    usage = getattr(response, "usage", None)
+    tokens = getattr(usage, "total_tokens", None)
+    if isinstance(tokens, (int, float)):
+        UPSTREAM_TOKENS.inc(tokens, endpoint=endpoint)
+
+
+class Timings:
+    """Thread-safe per-stage totals (seconds) for one request or one step."""
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._totals[stage] = self._totals.get(stage, 0.0) + seconds
+
+    def seconds(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._totals)
+
+    def milliseconds(self, digits: int = 3) -> Dict[str, float]:
+        return {stage: round(value * 1000.0, digits) for stage, value in self.seconds().items()}
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value, e.g. `embed;dur=12.5, llm;dur=830.2`."""
+        return ", ".join(f"{stage};dur={value}" for stage, value in self.milliseconds().items())
+
+    @contextmanager
+    def collect(self) -> Iterator["Timings"]:
+        """Add every span finished inside this block (and its bound threads) to these totals."""
+        token = _COLLECTORS.set(_COLLECTORS.get() + (self,))
+        try:
+            yield self
+        finally:
+            _COLLECTORS.reset(token)
+
+
+_COLLECTORS: contextvars.ContextVar[Tuple[Timings, ...]] = contextvars.ContextVar(
+    "forcepath_timings", default=()
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        for timings in _COLLECTORS.get():
+            timings.add(stage, elapsed)
+
+
+def timed(iterator: Iterable[T]) -> Iterator[Tuple[T, Timings]]:
+    """
+    Pair every item of `iterator` with the stage timings spent producing it.
+
+    Each item is produced inside its own collector, which is left before the
+    item is yielded, so the caller may keep adding to it (e.g. decoding).
+    """
+    iterator = iter(iterator)
+    while True:
+        timings = Timings()
+        with timings.collect():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item, timings
+
+
+def bind_context(func: Callable[..., T]) -> Callable[..., T]:
+    """Wrap `func` to run in a copy of the current context, e.g. on a thread pool."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs) -> T:
+        return context.copy().run(partial(func, *args, **kwargs))
+
+    return run
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import os
+
+from openai import OpenAI
+
+from src.config.settings import get_settings
+
+
+def create_openai_client(api_key: str | None = None) -> OpenAI:
+    """
+    OpenAI client for every upstream call (embeddings, decoder, AI routes).
+
+    `api_key` defaults to OPENAI_API_KEY, read at call time. Requests go to
+    OPENAI_BASE_URL when it is set, e.g. the local stand-in server in
+    `benchmarks/upstream_stub.py`, and to the OpenAI API otherwise.
+    """
+    return OpenAI(
+        api_key=api_key or os.getenv("OPENAI_API_KEY"),
+        base_url=get_settings().openai_base_url,
+    )
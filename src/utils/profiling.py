@@ -0,0 +1,207 @@
+"""Opt-in profiling of individual requests.
+
+A `ProfileSession` is activated for one request (see `ProfileSession.activate`);
+functions decorated with `@profiled` then run under it. Plain functions are
+profiled per call and generator functions per produced item, so time spent
+by the consumer between items is never attributed to the engine.
+
+Two modes:
+  - "cprofile": deterministic cProfile, saved as `<id>.pstats`
+  - "sample":   wall-clock stack sampling, saved as `<id>.collapsed`
+                (flamegraph collapsed-stack format, one `a;b;c count` per line)
+"""
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import inspect
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Iterator, List, TypeVar
+
+from src.utils.io_utils import ensure_directory
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+PROFILE_MODES = ("cprofile", "sample")
+
+_ACTIVE: contextvars.ContextVar["ProfileSession | None"] = contextvars.ContextVar(
+    "forcepath_profile", default=None
+)
+# Threads already inside a profiled block (cProfile allows one profiler per thread)
+_local = threading.local()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stacks of tracked threads every `interval` seconds."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._threads: Counter[int] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for ident in self._threads:
+                    frame = frames.get(ident)
+                    names = []
+                    while frame is not None:
+                        names.append(_frame_name(frame))
+                        frame = frame.f_back
+                    if names:
+                        self.stacks[";".join(reversed(names))] += 1
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Sample the current thread while inside this block."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="profile-sampler", daemon=True
+                )
+                self._thread.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+                if self._threads[ident] <= 0:
+                    del self._threads[ident]
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    """Profile data of one request, gathered from every thread that worked on it."""
+
+    def __init__(self, profile_id: str, mode: str = "cprofile", interval: float = 0.005) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.profile_id = profile_id
+        self.mode = mode
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._sampler = StackSampler(interval) if mode == "sample" else None
+
+    @contextmanager
+    def activate(self) -> Iterator["ProfileSession"]:
+        """Make this the session `@profiled` functions report to in this context."""
+        token = _ACTIVE.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.reset(token)
+
+    @contextmanager
+    def record(self) -> Iterator[None]:
+        """Profile the current thread while inside this block."""
+        if getattr(_local, "busy", False):
+            yield
+            return
+        _local.busy = True
+        try:
+            if self._sampler is not None:
+                with self._sampler.track():
+                    yield
+                return
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                with self._lock:
+                    self._profiles.append(profile)
+        finally:
+            _local.busy = False
+
+    def save(self, directory: Path) -> Path | None:
+        """
+        Write the profile to `directory` and return its path.
+
+        Returns None when no profiled code ran during the request.
+        """
+        ensure_directory(directory)
+        if self._sampler is not None:
+            self._sampler.stop()
+            collapsed = self._sampler.collapsed()
+            if not collapsed:
+                return None
+            path = directory / f"{self.profile_id}.collapsed"
+            path.write_text(collapsed, encoding="utf-8")
+        else:
+            with self._lock:
+                profiles = list(self._profiles)
+            if not profiles:
+                return None
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            path = directory / f"{self.profile_id}.pstats"
+            stats.dump_stats(path)
+        logger.info("Profile %s written to %s", self.profile_id, path)
+        return path
+
+
+def active_session() -> ProfileSession | None:
+    return _ACTIVE.get()
+
+
+def profiled(func: Callable[..., T]) -> Callable[..., T]:
+    """Run `func` under the active ProfileSession, if there is one."""
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            session = _ACTIVE.get()
+            if session is None:
+                yield from func(*args, **kwargs)
+                return
+            iterator = func(*args, **kwargs)
+            while True:
+                with session.record():
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                yield item
+
+        return generator_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _ACTIVE.get()
+        if session is None:
+            return func(*args, **kwargs)
+        with session.record():
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from src.utils.io_utils import ensure_directory, read_run
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRAJECTORY_STORE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+VECTORS_NAME = "vectors.npy"
+PARQUET_NAME = "trajectories.parquet"
+FORCE_PREFIX = "force."
+
+try:  # optional dependency
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+    pq = None
+
+
+def _column_path(store_dir: Path, name: str) -> Path:
+    return store_dir / f"{name}.npy"
+
+
+class _VectorSpool:
+    """Appends vector rows to a raw file so ingest memory does not grow with the archive."""
+
+    def __init__(self, path: Path, dtype: np.dtype) -> None:
+        self.path = path
+        self.dtype = dtype
+        self.dim: int | None = None
+        self.rows = 0
+        self._file = path.open("wb")
+
+    def append(self, vector: Sequence[float] | None) -> None:
+        if vector is not None and self.dim is None:
+            self.dim = len(vector)
+            # Rows seen before the first vector are back-filled with NaN.
+            np.full((self.rows, self.dim), np.nan, dtype=self.dtype).tofile(self._file)
+        if self.dim is not None:
+            row = (
+                np.full(self.dim, np.nan, dtype=self.dtype)
+                if vector is None
+                else np.asarray(vector, dtype=self.dtype)
+            )
+            if row.shape != (self.dim,):
+                raise ValueError(f"Vector of length {row.shape[0]} in a store of dim {self.dim}")
+            row.tofile(self._file)
+        self.rows += 1
+
+    def finish(self, target: Path, block: int = 65536) -> int | None:
+        self._file.close()
+        if self.dim is not None:
+            raw = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self.rows, self.dim))
+            matrix = np.lib.format.open_memmap(
+                target, mode="w+", dtype=self.dtype, shape=(self.rows, self.dim)
+            )
+            for start in range(0, self.rows, block):
+                matrix[start : start + block] = raw[start : start + block]
+            matrix.flush()
+            del raw, matrix
+        self.path.unlink()
+        return self.dim
+
+
+def ingest_runs(
+    run_paths: Iterable[Path],
+    store_dir: Path,
+    vector_field: str = "best_vector",
+    vector_dtype: str = "float32",
+    file_format: str = "auto",
+) -> dict:
+    """
+    Convert JSONL run files (see RunWriter) into a columnar trajectory store.
+
+    Scalars become one column per field: `run` (index into the manifest's
+    `runs` list), `step`, `current_height`, `best_height` and one
+    `force.<name>` column per force. `vector_field` goes to a separate
+    (rows, dim) `vectors.npy` matrix aligned with the columns. Columns are
+    written as Parquet when `file_format` is "parquet" (or "auto" with
+    pyarrow installed), else as one .npy file per column. Text fields such
+    as summaries stay in the source JSONL. Returns the manifest.
+    """
+    if file_format == "auto":
+        file_format = "parquet" if pq is not None else "npy"
+    if file_format == "parquet" and pq is None:
+        raise RuntimeError("Parquet output requires pyarrow")
+    if file_format not in ("parquet", "npy"):
+        raise ValueError(f"Unknown trajectory store format: {file_format}")
+
+    ensure_directory(store_dir)
+    runs: List[str] = []
+    run_ids: List[int] = []
+    steps: List[int] = []
+    current_heights: List[float] = []
+    best_heights: List[float] = []
+    forces: Dict[str, List[float]] = {}
+    spool = _VectorSpool(store_dir / (VECTORS_NAME + ".tmp"), np.dtype(vector_dtype))
+
+    for run_id, run_path in enumerate(run_paths):
+        runs.append(str(run_path))
+        for record in read_run(Path(run_path)):
+            row = len(steps)
+            run_ids.append(run_id)
+            steps.append(int(record.get("step", -1)))
+            current_heights.append(float(record.get("current_height", np.nan)))
+            best_heights.append(float(record.get("best_height", np.nan)))
+            scores = record.get("force_scores") or {}
+            for name in scores.keys() - forces.keys():
+                forces[name] = [np.nan] * row
+            for name, column in forces.items():
+                column.append(float(scores.get(name, np.nan)))
+            spool.append(record.get(vector_field))
+
+    columns: Dict[str, np.ndarray] = {
+        "run": np.asarray(run_ids, dtype=np.int32),
+        "step": np.asarray(steps, dtype=np.int32),
+        "current_height": np.asarray(current_heights, dtype=np.float64),
+        "best_height": np.asarray(best_heights, dtype=np.float64),
+    }
+    for name in sorted(forces):
+        columns[FORCE_PREFIX + name] = np.asarray(forces[name], dtype=np.float32)
+
+    if file_format == "parquet":
+        table = pyarrow.table({name: values for name, values in columns.items()})
+        pq.write_table(table, store_dir / PARQUET_NAME)
+    else:
+        for name, values in columns.items():
+            np.save(_column_path(store_dir, name), values)
+    dim = spool.finish(store_dir / VECTORS_NAME)
+    if dim is None:
+        (store_dir / VECTORS_NAME).unlink(missing_ok=True)
+
+    manifest = {
+        "version": TRAJECTORY_STORE_VERSION,
+        "format": file_format,
+        "rows": len(steps),
+        "columns": list(columns),
+        "force_names": sorted(forces),
+        "runs": runs,
+        "vector_field": vector_field if dim is not None else None,
+        "dim": dim,
+        "vector_dtype": vector_dtype,
+    }
+    with (store_dir / MANIFEST_NAME).open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(
+        "Stored %d steps from %d runs in %s (%s)", len(steps), len(runs), store_dir, file_format
+    )
+    return manifest
+
+
+class TrajectoryStore:
+    """
+    Read side of a store written by `ingest_runs`.
+
+    .npy columns and the vector matrix are memory-mapped, so opening a store
+    is cheap and aggregations only touch the columns they use.
+    """
+
+    def __init__(self, store_dir: Path) -> None:
+        self.store_dir = store_dir
+        manifest_path = store_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Trajectory store manifest missing: {manifest_path}")
+        with manifest_path.open("r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != TRAJECTORY_STORE_VERSION:
+            raise ValueError(
+                f"Unsupported trajectory store version {self.manifest.get('version')}"
+            )
+
+    @property
+    def runs(self) -> List[str]:
+        return self.manifest["runs"]
+
+    @property
+    def force_names(self) -> List[str]:
+        return self.manifest["force_names"]
+
+    def columns(self, names: Sequence[str] | None = None) -> Dict[str, np.ndarray]:
+        names = list(names) if names is not None else self.manifest["columns"]
+        if self.manifest["format"] == "parquet":
+            if pq is None:
+                raise RuntimeError("Reading a Parquet trajectory store requires pyarrow")
+            table = pq.read_table(self.store_dir / PARQUET_NAME, columns=names)
+            return {name: table.column(name).to_numpy() for name in names}
+        return {
+            name: np.load(_column_path(self.store_dir, name), mmap_mode="r", allow_pickle=False)
+            for name in names
+        }
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns([name])[name]
+
+    def vectors(self) -> np.ndarray | None:
+        """(rows, dim) memory-mapped vector matrix aligned with the columns."""
+        if self.manifest.get("dim") is None:
+            return None
+        return np.load(self.store_dir / VECTORS_NAME, mmap_mode="r", allow_pickle=False)
+
+    def to_frame(self, names: Sequence[str] | None = None):
+        """Columns as a pandas DataFrame (pandas is imported on demand)."""
+        import pandas as pd
+
+        return pd.DataFrame(self.columns(names))
@@ -1,7 +1,60 @@
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
+# The suite runs offline: embeddings come from the deterministic local backend.
+os.environ.setdefault("EMBEDDING_BACKEND", "local")
+# The API settings require a key; the canned decoder below never uses it.
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+
+class CannedDecoder:
+    """Stands in for the LLM decoder of the API services."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def decode(self, force_scores, vector):
+        self.calls += 1
+        return {"summary": f"summary {self.calls}", "contexts": []}
+
+
+@pytest.fixture(scope="session")
+def api_app(tmp_path_factory):
+    """
+    The FastAPI app over a temporary force cache, with a canned decoder.
+
+    The cache is built from the real force definitions by the local embedding
+    backend; jobs are kept in a temporary directory.
+    """
+    workdir = tmp_path_factory.mktemp("api")
+    os.environ["JOBS_DIR"] = str(workdir / "jobs")
+
+    import src.forces.force_store as force_store
+    from api.app.core.config import get_settings as get_api_settings
+    from src.config.settings import get_settings
+    from src.forces.force_builder import build_force_vectors
+    from src.utils.io_utils import save_force_vectors
+
+    get_api_settings.cache_clear()
+    paths = get_settings().paths
+    vectors, _ = build_force_vectors(paths.force_yaml)
+    save_force_vectors(workdir / "force_vectors.npy", vectors, model_name="local")
+    store = force_store.ForceStore(
+        workdir / "force_vectors.npy", paths.weights_file, check_interval=-1
+    )
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(force_store, "get_force_store", lambda: store)
+
+        from api.app.main import app
+        from api.app.routes import simulate, transition
+
+        for module in (simulate, transition):
+            module.service.decoder = CannedDecoder()
+        yield app
@@ -0,0 +1,140 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from api.app.core.admission import AdmissionController, AdmissionMiddleware
+
+
+def _gated_app(controller, trusted_proxies=("127.0.0.1",)):
+    """App whose engine route blocks until `release` is set, recording who ran."""
+    app = FastAPI()
+    app.state.release = asyncio.Event()
+    app.state.started = []
+
+    @app.post("/api/simulate")
+    async def simulate(payload: dict):
+        app.state.started.append(payload["tag"])
+        await app.state.release.wait()
+        return {"tag": payload["tag"]}
+
+    app.add_middleware(
+        AdmissionMiddleware, controller=controller, trusted_proxies=list(trusted_proxies)
+    )
+    return app
+
+
+def _client(app, peer="127.0.0.1"):
+    transport = httpx.ASGITransport(app=app, client=(peer, 1234))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def _post(client, tag, client_id=None):
+    headers = {"X-Client-Id": client_id} if client_id else {}
+    return await client.post("/api/simulate", json={"tag": tag}, headers=headers)
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_admission_queues_requests_beyond_the_limit():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=4, client_queue=4)
+        app = _gated_app(controller)
+        async with _client(app) as client:
+            first = asyncio.create_task(_post(client, "a"))
+            second = asyncio.create_task(_post(client, "b"))
+            await _settle()
+            assert app.state.started == ["a"]
+            assert controller.snapshot()["queued"] == 1
+            app.state.release.set()
+            responses = await asyncio.gather(first, second)
+        assert [r.status_code for r in responses] == [200, 200]
+        assert app.state.started == ["a", "b"]
+        assert controller.active == 0 and controller.queued == 0
+        assert controller.stats.waited == 1
+
+    asyncio.run(scenario())
+
+
+def test_admission_rejects_client_over_its_share_with_429():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=4, client_queue=1)
+        app = _gated_app(controller)
+        async with _client(app) as client:
+            running = asyncio.create_task(_post(client, "a", "alice"))
+            queued = asyncio.create_task(_post(client, "b", "alice"))
+            await _settle()
+            rejected = await _post(client, "c", "alice")
+            other = asyncio.create_task(_post(client, "d", "bob"))
+            await _settle()
+            app.state.release.set()
+            await asyncio.gather(running, queued, other)
+        assert rejected.status_code == 429
+        assert int(rejected.headers["Retry-After"]) >= 1
+        assert other.result().status_code == 200
+        assert controller.stats.rejected_client_limit == 1
+
+    asyncio.run(scenario())
+
+
+def test_admission_rejects_with_503_when_queue_is_full_or_wait_times_out():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrency=1, max_queue=1, client_queue=4, queue_timeout=0.2
+        )
+        app = _gated_app(controller)
+        async with _client(app) as client:
+            running = asyncio.create_task(_post(client, "a", "alice"))
+            queued = asyncio.create_task(_post(client, "b", "bob"))
+            await _settle()
+            full = await _post(client, "c", "carol")
+            timed_out = await queued
+            app.state.release.set()
+            await running
+        assert full.status_code == 503
+        assert "Retry-After" in full.headers
+        assert timed_out.status_code == 503
+        assert timed_out.json()["detail"] == "Timed out waiting for engine capacity"
+        assert controller.stats.rejected_queue_full == 1
+        assert controller.stats.timed_out == 1
+        assert controller.active == 0 and controller.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_admission_serves_waiting_clients_round_robin():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=8, client_queue=8)
+        app = _gated_app(controller)
+        async with _client(app) as client:
+            tasks = [asyncio.create_task(_post(client, "busy-0", "busy"))]
+            await _settle()
+            for idx in range(1, 4):
+                tasks.append(asyncio.create_task(_post(client, f"busy-{idx}", "busy")))
+                await _settle()
+            tasks.append(asyncio.create_task(_post(client, "quiet-0", "quiet")))
+            await _settle()
+            app.state.release.set()
+            await asyncio.gather(*tasks)
+        assert app.state.started == ["busy-0", "busy-1", "quiet-0", "busy-2", "busy-3"]
+
+    asyncio.run(scenario())
+
+
+def test_admission_ignores_client_id_from_untrusted_peers():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=8, client_queue=1)
+        app = _gated_app(controller, trusted_proxies=())
+        async with _client(app, peer="203.0.113.7") as client:
+            running = asyncio.create_task(_post(client, "a", "id-1"))
+            queued = asyncio.create_task(_post(client, "b", "id-2"))
+            await _settle()
+            spoofed = await _post(client, "c", "id-3")
+            app.state.release.set()
+            await asyncio.gather(running, queued)
+        assert spoofed.status_code == 429
+
+    asyncio.run(scenario())
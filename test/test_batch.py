@@ -0,0 +1,104 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+ITEMS = [
+    {"id": "a", "sentence": "Cities introduce a universal basic income.", "steps": 1},
+    {"id": "b", "sentence": "A drought forces villages to share water.", "steps": 3},
+    {"sentence": "Remote work revives small towns.", "steps": 2},
+]
+
+
+class FailingCallDecoder:
+    """Decoder whose `fail_on`-th call (1-based) raises."""
+
+    def __init__(self, fail_on: int) -> None:
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def decode(self, force_scores, vector):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("upstream unavailable")
+        return {"summary": f"summary {self.calls}", "contexts": []}
+
+
+class SubmitRecordingPool(ThreadPoolExecutor):
+    """Decode pool that notes which thread submitted each decode."""
+
+    def __init__(self) -> None:
+        super().__init__(max_workers=4, thread_name_prefix="decode")
+        self.submitters = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitters.append(threading.current_thread().name)
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.fixture
+def client(api_app):
+    with TestClient(api_app) as client:
+        yield client
+
+
+@pytest.fixture
+def service(api_app):
+    from api.app.routes.simulate import service
+
+    return service
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_batch_streams_items_interleaved_step_by_step(client):
+    response = client.post("/api/simulate/batch", json={"items": ITEMS})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(response)
+    assert [(line["id"], line["step"]) for line in lines] == [
+        ("a", 0), ("b", 0), ("2", 0), ("b", 1), ("2", 1), ("b", 2)
+    ]
+    assert all(line["summary"] for line in lines)
+
+
+def test_batch_decodes_on_the_decode_pool_and_shares_step_timings(client, service, monkeypatch):
+    pool = SubmitRecordingPool()
+    monkeypatch.setattr(service, "decode_pool", pool)
+    lines = _lines(client.post("/api/simulate/batch", json={"items": ITEMS, "verbose": True}))
+    pool.shutdown()
+    # Decodes are submitted by the streaming layer, not from an engine thread
+    # that would then wait on the LLM round trips.
+    assert len(pool.submitters) == 6
+    assert not any(name.startswith("engine") for name in pool.submitters)
+    first_step = [line["timings"] for line in lines if line["step"] == 0]
+    assert len(first_step) == 3 and all(timings == first_step[0] for timings in first_step)
+
+
+def test_batch_reports_a_failed_decode_on_its_item_only(client, service, monkeypatch):
+    # Steps run in lockstep, so the 6th decode is the only one of step 2: item b.
+    monkeypatch.setattr(service, "decoder", FailingCallDecoder(fail_on=6))
+    lines = _lines(client.post("/api/simulate/batch", json={"items": ITEMS}))
+    failed = [(line["id"], line["step"]) for line in lines if line["summary"] is None]
+    assert failed == [("b", 2)]
+    assert len(lines) == 6
+
+
+def test_batch_ends_the_stream_with_an_error_line_when_the_engine_fails(
+    client, service, monkeypatch
+):
+    run_batch = service.simulator.run_batch
+
+    def failing_run_batch(*args, **kwargs):
+        steps = run_batch(*args, **kwargs)
+        yield next(steps)
+        raise RuntimeError("engine exploded")
+
+    monkeypatch.setattr(service.simulator, "run_batch", failing_run_batch)
+    lines = _lines(client.post("/api/simulate/batch", json={"items": ITEMS}))
+    assert [line["id"] for line in lines[:-1]] == ["a", "b", "2"]
+    assert lines[-1] == {"error": "engine exploded", "success": False}
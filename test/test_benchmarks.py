@@ -0,0 +1,83 @@
+import time
+
+from benchmarks.bench_engine import Case, calibrate, compare, confirm_regressions
+from benchmarks.load_test import Sample, _failure, parse_mix, summarize
+
+
+def test_benchmark_compare_flags_only_slower_cases():
+    baseline = {
+        "a": {"id": "a", "min_s": 0.4, "normalized": 1.0},
+        "b": {"id": "b", "min_s": 0.1, "normalized": 2.0},
+    }
+    results = [
+        {"id": "a", "min_s": 0.5, "normalized": 1.2},
+        {"id": "b", "min_s": 0.1, "normalized": 2.6},
+        {"id": "new", "min_s": 0.1, "normalized": 9.0},
+    ]
+    regressions = compare(results, baseline, tolerance=0.25)
+    assert [r["id"] for r in regressions] == ["b"]
+    assert round(regressions[0]["ratio"], 6) == 1.3
+
+
+def test_benchmark_compare_uses_raw_times_on_the_baseline_host():
+    # Faster than the baseline, but a slow calibration run inflated the ratio.
+    baseline = {"sim": {"id": "sim", "min_s": 0.502, "normalized": 7400.0}}
+    results = [{"id": "sim", "min_s": 0.454, "normalized": 9300.0}]
+    assert [r["id"] for r in compare(results, baseline, tolerance=0.25)] == ["sim"]
+    assert compare(results, baseline, tolerance=0.25, same_host=True) == []
+
+    results = [{"id": "sim", "min_s": 0.7, "normalized": 7400.0}]
+    (regression,) = compare(results, baseline, tolerance=0.25, same_host=True)
+    assert regression["basis"] == "raw" and round(regression["ratio"], 3) == 1.394
+
+
+def test_calibration_median_keeps_normalized_times_stable_under_noise():
+    def noisy(durations):
+        durations = iter(durations)
+        return lambda: time.sleep(next(durations))
+
+    # Warm-up, then five runs of which one is stalled five-fold.
+    quiet = calibrate(5, noisy([0.02] * 6))
+    stalled = calibrate(5, noisy([0.02, 0.02, 0.1, 0.02, 0.02, 0.02]))
+    assert stalled / quiet < 1.1
+
+    case_s = 0.05
+    baseline = {"case": {"id": "case", "min_s": case_s, "normalized": case_s / quiet}}
+    results = [{"id": "case", "min_s": case_s, "normalized": case_s / stalled}]
+    assert compare(results, baseline, tolerance=0.25) == []
+
+
+def test_benchmark_regressions_are_confirmed_by_a_second_measurement():
+    baseline = {
+        "noisy": {"id": "noisy", "min_s": 1e-3, "normalized": 1.0},
+        "slow": {"id": "slow", "min_s": 1e-6, "normalized": 1e-3},
+    }
+    # The first measurement of "noisy" hit a stall; measured again it is fast.
+    results = [
+        {"id": "noisy", "min_s": 1.0, "normalized": 1000.0},
+        {"id": "slow", "min_s": 1e-3, "normalized": 1.0},
+    ]
+    cases = {
+        "noisy": Case("noisy", {}, lambda: None),
+        "slow": Case("slow", {}, lambda: time.sleep(1e-3)),
+    }
+    regressions = confirm_regressions(
+        results, cases, baseline, 0.25, same_host=True, rounds=1, calibration_s=1e-3
+    )
+    assert [r["id"] for r in regressions] == ["slow"]
+    assert results[0]["min_s"] < 1e-3
+
+
+def test_load_test_summary_separates_errors_and_stream_latency():
+    assert parse_mix("simulate=2,transition") == {"simulate": 2.0, "transition": 1.0}
+    assert _failure("simulate_stream", 200, b'{"step": 0}\n{"error": "boom", "success": false}\n') == "stream_error"
+    assert _failure("simulate", 503, b"") == "503"
+
+    samples = [Sample("simulate_stream", 200, 0.1 * (i + 1), 0.01 * (i + 1)) for i in range(10)]
+    samples.append(Sample("simulate", 429, 0.001, None, "429"))
+    summary = summarize(samples, elapsed=2.0)
+    assert summary["requests"] == 11
+    assert summary["throughput_rps"] == 5.0
+    assert summary["errors"] == {"429": 1}
+    assert summary["latency_ms"]["max"] == 1000.0
+    assert summary["first_step_ms"]["p50"] == 55.0
@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app.core.admission import get_admission_controller
+
+SENTENCE = "Cities introduce a universal basic income funded by automation taxes."
+
+
+@pytest.fixture
+def client(api_app):
+    with TestClient(api_app) as client:
+        yield client
+
+
+def _receive_until(websocket, kind, limit=20):
+    """Events up to and including the first one of type `kind`."""
+    events = []
+    for _ in range(limit):
+        events.append(websocket.receive_json())
+        if events[-1]["type"] == kind:
+            return events
+    raise AssertionError(f"no {kind!r} event in {events}")
+
+
+def test_channel_start_and_step_stream_steps_then_summaries(client):
+    with client.websocket_connect("/api/ws/simulate") as websocket:
+        websocket.send_json({"type": "start", "sentence": SENTENCE})
+        assert websocket.receive_json() == {"type": "started", "step": 0, "budget": 0}
+
+        websocket.send_json({"type": "step", "count": 2})
+        events = _receive_until(websocket, "idle")
+        steps = [event for event in events if event["type"] == "step"]
+        assert [event["step"] for event in steps] == [0, 1]
+        assert [event["budget"] for event in steps] == [1, 0]
+        assert "summary" not in steps[0]
+        assert events[-1] == {"type": "idle", "step": 2}
+
+        decoded = [event for event in events if event["type"] == "decoded"]
+        while len(decoded) < 2:
+            decoded.append(websocket.receive_json())
+        assert sorted(event["step"] for event in decoded) == [0, 1]
+        assert all(event["summary"] for event in decoded)
+
+
+def test_channel_reports_bad_commands_as_error_events(client):
+    with client.websocket_connect("/api/ws/simulate") as websocket:
+        websocket.send_json({"type": "step"})
+        error = websocket.receive_json()
+        assert error["type"] == "error"
+        assert "start" in error["detail"]
+
+        websocket.send_json({"type": "start", "sentence": SENTENCE, "vector_encoding": "bogus"})
+        error = websocket.receive_json()
+        assert error == {"type": "error", "detail": "Unknown vector encoding: bogus"}
+
+        # The connection survives and a valid start still works.
+        websocket.send_json(
+            {"type": "start", "sentence": SENTENCE, "verbose": True, "vector_encoding": "base64_f16"}
+        )
+        assert websocket.receive_json()["type"] == "started"
+        websocket.send_json({"type": "step"})
+        step = _receive_until(websocket, "step")[-1]
+        assert step["best_vector_preview"]["encoding"] == "base64_f16"
+
+        websocket.send_json({"type": "jump"})
+        assert _receive_until(websocket, "error")[-1]["detail"] == "Unknown command type: jump"
+
+
+def test_channel_cancel_and_close_release_the_session(client):
+    with client.websocket_connect("/api/ws/simulate") as websocket:
+        websocket.send_json({"type": "start", "sentence": SENTENCE, "budget": 1})
+        assert websocket.receive_json()["type"] == "started"
+        _receive_until(websocket, "idle")
+
+        websocket.send_json({"type": "cancel"})
+        assert _receive_until(websocket, "cancelled")[-1] == {"type": "cancelled"}
+        websocket.send_json({"type": "step"})
+        assert _receive_until(websocket, "error")[-1]["type"] == "error"
+
+        websocket.send_json({"type": "start", "sentence": SENTENCE, "budget": 3})
+        assert _receive_until(websocket, "started")[-1]["budget"] == 3
+
+    # Disconnecting mid-budget cancels the remaining steps and frees every slot.
+    controller = get_admission_controller()
+    assert controller.active == 0 and controller.queued == 0
@@ -3,6 +3,7 @@ import pytest
 
 from src.decoder.force_summary import summarize_forces
 from src.decoder.future_decoder import FutureDecoder
+from src.decoder.nearest_context import NearestContextRetriever
 
 
 def test_summarize_forces_orders_scores():
@@ -24,3 +25,73 @@ def test_future_decoder_uses_template(monkeypatch):
     assert "Dominant forces" in result["summary"]
     assert "- context sentence" in result["summary"]
 
+
+
+def test_nearest_context_ranks_float16_corpus(monkeypatch):
+    monkeypatch.setattr(
+        "src.decoder.nearest_context._collect_sentences", lambda: ["east", "north", "west"]
+    )
+    monkeypatch.setattr(
+        "src.decoder.nearest_context.embed_texts",
+        lambda texts: [[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]],
+    )
+    retriever = NearestContextRetriever()
+    assert retriever.embeddings.dtype == np.float16
+    results = retriever.find(np.array([0.9, 0.1]), top_k=2)
+    assert [sentence for sentence, _ in results] == ["east", "north"]
+    assert results[0][1] > results[1][1]
+
+
+def test_int8_context_reranks_to_exact_top5(monkeypatch, tmp_path):
+    rng = np.random.default_rng(3)
+    corpus = rng.normal(size=(500, 64)).astype(np.float32)
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(len(texts))
+        return corpus.tolist()
+
+    monkeypatch.setattr(
+        "src.decoder.nearest_context._collect_sentences",
+        lambda: [f"s{idx}" for idx in range(len(corpus))],
+    )
+    monkeypatch.setattr("src.decoder.nearest_context.embed_texts", fake_embed)
+    cache_path = tmp_path / "context_vectors.npy"
+    retriever = NearestContextRetriever(storage="int8", cache_path=cache_path)
+    assert retriever.embeddings.dtype == np.int8
+    assert isinstance(retriever.full, np.memmap)
+
+    unit = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    for query in rng.normal(size=(10, 64)).astype(np.float32):
+        expected = np.argsort(-(unit @ query))[:5]
+        results = retriever.find(query, top_k=5)
+        assert [sentence for sentence, _ in results] == [f"s{idx}" for idx in expected]
+
+    # A second retriever reuses the on-disk float32 cache.
+    NearestContextRetriever(storage="int8", cache_path=cache_path)
+    assert calls == [len(corpus)]
+
+
+def test_context_cache_survives_a_cold_start_under_model_fallback(monkeypatch, tmp_path):
+    from src.decoder.nearest_context import load_context_matrix
+    from src.embeddings import embedder
+
+    class FallbackClient:
+        model_candidates = ["text-embedding-4", "text-embedding-3-large"]
+
+        def __init__(self):
+            self.calls = 0
+
+        def embed(self, texts):
+            self.calls += 1
+            self.model_name = self.model_candidates[1]
+            return [[float(idx), 1.0] for idx, _ in enumerate(texts)]
+
+    sentences = ["east", "north", "west"]
+    cache_path = tmp_path / "context_vectors.npy"
+    for expected_calls in (1, 0):
+        client = FallbackClient()  # a fresh process each time
+        monkeypatch.setattr(embedder, "get_embedding_client", lambda: client)
+        matrix = load_context_matrix(sentences, cache_path)
+        assert client.calls == expected_calls
+        assert matrix.shape == (3, 2)
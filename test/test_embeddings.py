@@ -1,7 +1,47 @@
 import numpy as np
+import pytest
 
-from src.utils.io_utils import chunk_iterable
+from src.embeddings import embedder
+from src.embeddings.hashing_backend import HashingEmbeddingClient
+from src.forces import force_builder
+from src.utils.io_utils import (
+    chunk_iterable,
+    force_manifest_path,
+    load_force_matrix,
+    load_force_vectors,
+    read_run,
+    RunWriter,
+    save_force_vectors,
+)
 from src.utils.math_utils import cosine_similarity
+from src.utils.trajectory_store import TrajectoryStore, ingest_runs
+
+
+class FallbackEmbeddingClient:
+    """OpenAI-like client whose requested model is unavailable, so every call falls back."""
+
+    def __init__(self) -> None:
+        self.model_candidates = ["text-embedding-4", "text-embedding-3-large"]
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        self.model_name = self.model_candidates[1]
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+@pytest.fixture
+def fallback_client(monkeypatch):
+    """A fresh fallback client per use, like a new process serving `build-cache`."""
+    clients = []
+
+    def new_client():
+        clients.append(FallbackEmbeddingClient())
+        return clients[-1]
+
+    monkeypatch.setattr(embedder, "get_embedding_client", lambda: clients[-1])
+    new_client()
+    return new_client
 
 
 def test_chunk_iterable_balances_chunks():
@@ -15,3 +55,167 @@ def test_cosine_similarity_between_identical_vectors():
     b = np.array([1.0, 0.0])
     assert np.isclose(cosine_similarity(a, b), 1.0)
 
+
+
+def test_force_cache_round_trip_is_memory_mapped(tmp_path):
+    path = tmp_path / "force_vectors.npy"
+    save_force_vectors(path, {"a": [1.0, 0.0], "b": [0.0, 2.0]}, model_name="m")
+    names, matrix, manifest = load_force_matrix(path)
+    assert names == ["a", "b"]
+    assert isinstance(matrix, np.memmap)
+    assert matrix.dtype == np.float32
+    assert manifest["model_name"] == "m" and manifest["dim"] == 2
+
+
+def test_legacy_pickled_force_cache_is_migrated(tmp_path):
+    path = tmp_path / "force_vectors.npy"
+    np.save(path, {"a": [1.0, 0.0], "b": [0.0, 2.0]})
+    vectors = load_force_vectors(path)
+    assert np.allclose(vectors["b"], [0.0, 2.0])
+    assert force_manifest_path(path).exists()
+    assert np.load(path, allow_pickle=False).shape == (2, 2)
+
+
+def test_force_cache_rebuild_only_embeds_changed_forces(tmp_path, fallback_client):
+    client = fallback_client()
+    calls = client.calls
+    force_yaml = tmp_path / "forces.yaml"
+    cache = tmp_path / "force_vectors.npy"
+    force_yaml.write_text(
+        "forces:\n  a:\n    sentences: [alpha, beta]\n  b:\n    sentences: [gamma]\n",
+        encoding="utf-8",
+    )
+    force_builder.rebuild_force_cache(force_yaml, cache)
+    assert calls == [["alpha", "beta", "gamma"]]
+
+    calls.clear()
+    force_yaml.write_text(
+        "forces:\n  a:\n    sentences: [alpha, beta]\n  b:\n    sentences: [delta!]\n",
+        encoding="utf-8",
+    )
+    force_builder.rebuild_force_cache(force_yaml, cache)
+    assert calls == [["delta!"]]
+    vectors = load_force_vectors(cache)
+    assert np.allclose(vectors["a"], [4.5, 1.0])
+    assert np.allclose(vectors["b"], [6.0, 1.0])
+
+
+def test_force_cache_rebuild_under_model_fallback_reuses_every_force(tmp_path, fallback_client):
+    force_yaml = tmp_path / "forces.yaml"
+    cache = tmp_path / "force_vectors.npy"
+    force_yaml.write_text(
+        "forces:\n  a:\n    sentences: [alpha, beta]\n  b:\n    sentences: [gamma]\n",
+        encoding="utf-8",
+    )
+    first = fallback_client()
+    force_builder.rebuild_force_cache(force_yaml, cache)
+    assert first.calls == [["alpha", "beta", "gamma"]]
+
+    # A new process has not embedded anything yet when it checks the cache.
+    second = fallback_client()
+    force_builder.rebuild_force_cache(force_yaml, cache)
+    assert second.calls == []
+    _, _, manifest = load_force_matrix(cache)
+    assert manifest["model_name"] == "text-embedding-4"
+
+
+def test_hashing_backend_is_deterministic_and_similarity_preserving():
+    client = HashingEmbeddingClient(dim=256)
+    texts = ["Technology is advancing rapidly", "technology advances quickly", "The harvest failed"]
+    first = np.array(client.embed(texts))
+    again = np.array(HashingEmbeddingClient(dim=256).embed(texts))
+    assert first.shape == (3, 256)
+    assert np.array_equal(first, again)
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert first[0] @ first[1] > first[0] @ first[2]
+    assert len(client.embed(["a", "  ", "b"])) == 2
+
+
+def test_force_cache_builds_offline_with_local_backend(tmp_path, monkeypatch):
+    client = HashingEmbeddingClient(dim=64)
+    monkeypatch.setattr(embedder, "get_embedding_client", lambda: client)
+    force_yaml = tmp_path / "forces.yaml"
+    cache = tmp_path / "force_vectors.npy"
+    force_yaml.write_text(
+        "forces:\n  a:\n    sentences: [markets expand, trade grows]\n"
+        "  b:\n    sentences: [communities share]\n",
+        encoding="utf-8",
+    )
+    force_builder.rebuild_force_cache(force_yaml, cache)
+    names, matrix, manifest = load_force_matrix(cache)
+    assert names == ["a", "b"] and matrix.shape == (2, 64)
+    assert manifest["model_name"] == "local-hashing-64"
+
+
+def test_run_writer_resumes_after_partial_record(tmp_path):
+    for name in ("run.jsonl", "run.jsonl.gz"):
+        path = tmp_path / name
+        with RunWriter(path, fields=("step", "height")) as writer:
+            for step in range(3):
+                writer.write({"step": step, "height": float(step), "vectors": [0.0] * 64})
+        with path.open("ab") as f:
+            f.write(b'{"step": 3, "hei')
+
+        resumed = RunWriter(path, resume=True)
+        assert resumed.completed == 3
+        assert resumed.last_record == {"step": 2, "height": 2.0}
+        resumed.write({"step": 3, "height": 3.0})
+        resumed.close()
+        assert [record["step"] for record in read_run(path)] == [0, 1, 2, 3]
+
+
+def test_trajectory_store_ingests_runs_into_columns(tmp_path):
+    paths = []
+    for run in range(2):
+        path = tmp_path / f"run{run}.jsonl.gz"
+        with RunWriter(path) as writer:
+            for step in range(3):
+                writer.write(
+                    {
+                        "step": step,
+                        "current_height": 10.0 - step,
+                        "best_height": 9.0 - step,
+                        "best_vector": [float(run), float(step)],
+                        "force_scores": {"a": float(step), "b": float(run)},
+                        "summary": "text",
+                    }
+                )
+        paths.append(path)
+
+    manifest = ingest_runs(paths, tmp_path / "store", file_format="npy")
+    assert manifest["rows"] == 6
+
+    store = TrajectoryStore(tmp_path / "store")
+    columns = store.columns(["run", "step", "force.b"])
+    assert columns["run"].tolist() == [0, 0, 0, 1, 1, 1]
+    assert columns["step"].tolist() == [0, 1, 2, 0, 1, 2]
+    assert columns["force.b"].tolist() == [0.0, 0.0, 0.0, 1.0, 1.0, 1.0]
+    vectors = store.vectors()
+    assert isinstance(vectors, np.memmap)
+    assert vectors[4].tolist() == [1.0, 1.0]
+    assert store.to_frame().groupby("step")["best_height"].mean().tolist() == [9.0, 8.0, 7.0]
+
+
+def test_embedding_client_round_trips_through_upstream_stub(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from benchmarks.upstream_stub import StubConfig, create_app
+    from src.config.settings import get_settings
+    from src.embeddings.embedder import EmbeddingClient
+
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://testserver/v1")
+    get_settings.cache_clear()
+    try:
+        client = EmbeddingClient()
+    finally:
+        get_settings.cache_clear()
+    assert str(client.client.base_url) == "http://testserver/v1/"
+
+    # The SDK requests base64 embeddings by default; route it into the stub app.
+    client.client = client.client.with_options(
+        http_client=TestClient(create_app(StubConfig(dim=16)))
+    )
+    vectors = client.embed(["market forces", " ", "solidarity"])
+    assert len(vectors) == 2
+    assert np.allclose(vectors[1], HashingEmbeddingClient(16).embed_one("solidarity"), atol=1e-6)
@@ -1,8 +1,18 @@
 import numpy as np
+import pytest
 
+from src.engine.cma_runner import CMARunner
+from src.engine.gradient_runner import GradientRunner
 from src.engine.height_calculator import HeightCalculator
 from src.engine.simulator import Simulator
+from src.forces.force_interaction import ForceInteraction
+from src.forces.force_manager import ForceData, ForceManager
+from src.forces import force_store
+from src.forces.force_store import ForceStore
+from src.forces.weight_sweep import evaluate_weights, grid_weights
 from src.penalties.distance_penalty import DistancePenalty
+from src.penalties.penalty_aggregator import PenaltyAggregator
+from src.utils.io_utils import load_social_reference, save_force_vectors
 
 
 class StubForceInteraction:
@@ -58,6 +68,24 @@ class DummyHeightCalculator:
     def height(self, candidate: np.ndarray, current: np.ndarray) -> float:
         return float(np.sum(candidate**2))
 
+    def pinned(self) -> "DummyHeightCalculator":
+        return self
+
+    def incremental(self, current: np.ndarray):
+        return DummyEvaluator(self, current)
+
+
+class DummyEvaluator:
+    def __init__(self, calculator: DummyHeightCalculator, current: np.ndarray) -> None:
+        self.calculator = calculator
+        self.current = current
+
+    def heights(self, candidates: np.ndarray) -> np.ndarray:
+        return np.array([self.calculator.height(c, self.current) for c in candidates])
+
+    def current_height(self) -> float:
+        return self.calculator.height(self.current, self.current)
+
 
 class DummyRunner:
     def sample(self, current: np.ndarray):
@@ -78,3 +106,270 @@ def test_simulator_returns_step_results():
     assert len(results) == 2
     assert all(result.best_height >= 0 for result in results)
 
+
+def test_simulator_advances_a_stored_state_one_step_at_a_time():
+    simulator = SimulatorHarness()
+    state = simulator.start("seed")
+    first = simulator.advance(state)
+    second = simulator.advance(state)
+    assert (first.step, second.step, state.step) == (0, 1, 2)
+    assert np.array_equal(state.current, second.best_vector)
+    assert state.height == second.best_height
+
+
+def test_step_result_serializes_selected_fields_only():
+    simulator = SimulatorHarness()
+    result = next(simulator.run("seed", steps=1))
+    assert not hasattr(result, "__dict__")
+    assert result.candidate_vectors.shape == (2, 2)
+
+    light = result.to_dict(fields=("step", "best_height"))
+    assert light == {"step": 0, "best_height": result.best_height}
+
+    preview = result.to_dict(vector_limit=1, candidate_limit=1)
+    assert preview["best_vector"] == result.best_vector[:1].tolist()
+    assert len(preview["candidates"]) == 1
+    assert len(preview["candidates"][0]["vector"]) == 1
+    assert [c.to_dict() for c in result.candidate_scores] == result.to_dict()["candidates"]
+
+
+def _synthetic_calculator(
+    dim: int = 6, seed: int = 0, dtype=np.float64
+) -> HeightCalculator:
+    rng = np.random.default_rng(seed)
+    vectors = {f"force_{i}": rng.normal(size=dim).astype(dtype) for i in range(3)}
+    weights = {"force_0": 1.2, "force_1": 0.9, "force_2": 1.0}
+    manager = ForceManager(data=ForceData(vectors=vectors, weights=weights))
+    penalties = PenaltyAggregator(
+        distance_alpha=0.5, social_reference=rng.normal(size=dim).astype(dtype)
+    )
+    return HeightCalculator(
+        force_interaction=ForceInteraction(manager=manager), penalties=penalties
+    )
+
+
+def test_batched_heights_match_scalar_height():
+    calculator = _synthetic_calculator()
+    rng = np.random.default_rng(1)
+    current = rng.normal(size=6)
+    candidates = current + 0.3 * rng.normal(size=(5, 6))
+    batched = calculator.heights(candidates, current)
+    expected = [calculator.height(candidate, current) for candidate in candidates]
+    assert np.allclose(batched, expected)
+
+
+class EnsembleHarness(Simulator):
+    def __init__(self) -> None:
+        super().__init__(height_calculator=_synthetic_calculator(), runner=CMARunner())
+
+    def _embed_sentence(self, sentence: str) -> np.ndarray:
+        return np.full(6, 0.5)
+
+
+def test_simulator_ensemble_reports_aggregates():
+    simulator = EnsembleHarness()
+    results = list(simulator.run_ensemble("seed", members=4, steps=3))
+    assert [result.step for result in results] == [0, 1, 2]
+    last = results[-1]
+    assert set(last.height_quantiles) == {"p10", "p50", "p90"}
+    assert set(last.force_score_distributions) == {"force_0", "force_1", "force_2"}
+    assert 0 <= last.best_member < 4
+    assert len(last.best_trajectory) == 3
+    assert last.best_height <= last.height_quantiles["p10"] + 1e-12
+
+
+def test_simulator_batch_runs_items_in_lockstep():
+    class BatchHarness(EnsembleHarness):
+        embed_calls = 0
+
+        def _embed_sentences(self, sentences):
+            self.embed_calls += 1
+            return np.stack([np.full(6, 0.5 + idx) for idx in range(len(sentences))])
+
+    simulator = BatchHarness()
+    steps = list(simulator.run_batch(["a", "b", "c"], steps=[1, 3, 2]))
+    assert simulator.embed_calls == 1
+    assert [[item for item, _ in results] for results in steps] == [[0, 1, 2], [1, 2], [1]]
+    for results in steps:
+        for _, result in results:
+            assert result.best_height == result.candidate_heights.min()
+            assert set(result.force_scores) == {"force_0", "force_1", "force_2"}
+
+    # A zero step count means no steps for that item, not the default.
+    steps = list(simulator.run_batch(["a", "b"], steps=[0, 1]))
+    assert [[item for item, _ in results] for results in steps] == [[1]]
+
+
+def test_simulator_beam_returns_sorted_trajectories():
+    simulator = EnsembleHarness()
+    trajectories = simulator.run_beam("seed", width=3, steps=4)
+    assert [t.rank for t in trajectories] == [0, 1, 2]
+    finals = [t.heights[-1] for t in trajectories]
+    assert finals == sorted(finals)
+    for trajectory in trajectories:
+        assert trajectory.vectors.shape == (4, 6)
+        heights = simulator.height_calculator.heights(
+            trajectory.vectors[1:], trajectory.vectors[:-1]
+        )
+        assert np.allclose(heights, trajectory.heights[1:])
+
+
+def test_log_height_gradients_match_finite_differences():
+    calculator = _synthetic_calculator()
+    rng = np.random.default_rng(2)
+    current = np.full(6, 0.5)
+    candidate = current + 0.2 * rng.normal(size=6)
+    gradient = calculator.log_height_gradients(candidate[None, :], current)[0]
+    step = 1e-6
+    numeric = np.array(
+        [
+            (
+                np.log(calculator.height(candidate + step * e, current))
+                - np.log(calculator.height(candidate - step * e, current))
+            )
+            / (2 * step)
+            for e in np.eye(6)
+        ]
+    )
+    assert np.allclose(gradient, numeric, rtol=1e-4, atol=1e-6)
+
+
+def test_gradient_runner_descends_within_trust_radius():
+    calculator = _synthetic_calculator()
+    runner = GradientRunner(calculator)
+    current = np.full(6, 0.5)
+    iterates = np.array(runner.sample(current))
+    heights = calculator.heights(iterates, current)
+    assert heights.min() <= calculator.height(current, current)
+    assert np.all(np.diff(heights) <= 1e-12)
+    radius = runner.sigma * np.sqrt(6)
+    assert np.all(np.linalg.norm(iterates - current, axis=1) <= radius + 1e-9)
+
+
+def test_gradient_runner_respects_its_evaluation_budget():
+    calculator = _synthetic_calculator()
+    runner = GradientRunner(calculator)
+    runner.tolerance = 0.0
+    iterates = runner.descend(np.full((3, 6), 0.5))
+    assert runner.evaluations == 3 * runner.max_evaluations
+    assert 1 <= iterates.shape[1] <= runner.population
+
+    runner.tolerance = np.inf
+    assert runner.descend(np.full((1, 6), 0.5)).shape == (1, 1, 6)
+
+
+def test_simulator_rejects_ensembles_of_deterministic_optimizers():
+    simulator = EnsembleHarness()
+    with pytest.raises(ValueError, match="stochastic"):
+        next(simulator.run_ensemble("seed", members=4, steps=1, optimizer="gradient"))
+
+
+def test_weight_sweep_matches_per_scenario_heights():
+    calculator = _synthetic_calculator()
+    manager = calculator.force_interaction.manager
+    seed = np.full(6, 0.5)
+    weights = grid_weights(manager, [0.8, 1.2], forces=["force_0", "force_2"])
+    assert weights.shape == (4, 3)
+    assert np.all(weights[:, 1] == manager.weight("force_1"))
+
+    result = evaluate_weights(seed, weights, calculator)
+    for row, height in zip(weights, result.heights):
+        scenario = HeightCalculator(
+            force_interaction=ForceInteraction(
+                manager=manager.with_weights(dict(zip(manager.names(), row)))
+            ),
+            penalties=calculator.penalties,
+        )
+        assert np.isclose(height, scenario.height(seed, seed))
+    assert set(result.columns()) >= {"height", "dominant_force", "weight_force_0"}
+
+
+def test_incremental_height_matches_batched_heights():
+    calculator = _synthetic_calculator()
+    rng = np.random.default_rng(3)
+    currents = rng.normal(size=(2, 6))
+    populations = currents[:, None, :] + 0.4 * rng.normal(size=(2, 5, 6))
+    evaluator = calculator.incremental(currents)
+    expected = calculator.heights(populations, currents[:, None, :])
+    assert np.allclose(evaluator.heights(populations), expected)
+    assert np.allclose(evaluator.current_height(), calculator.heights(currents, currents))
+
+    single = calculator.incremental(currents[0])
+    assert np.isclose(single.current_height(), calculator.height(currents[0], currents[0]))
+    assert np.allclose(single.heights(populations[0]), expected[0])
+
+
+def test_force_store_swaps_snapshot_without_touching_pinned_managers(tmp_path):
+    cache = tmp_path / "force_vectors.npy"
+    weights = tmp_path / "force_weights.json"
+    save_force_vectors(cache, {"a": [1.0, 0.0], "b": [0.0, 1.0]})
+    weights.write_text('{"a": 1.0, "b": 1.0}', encoding="utf-8")
+    store = ForceStore(cache, weights, check_interval=0)
+    manager = ForceManager(store=store)
+    pinned = manager.pinned()
+    version = manager.version()
+
+    weights.write_text('{"a": 2.0, "b": 0.5, "c": 9.0}', encoding="utf-8")
+    assert manager.version() != version
+    assert manager.weight("a") == 2.0
+    assert pinned.version() == version
+    assert pinned.weight("a") == 1.0
+    assert np.allclose(pinned.weighted_dot_matrix(np.array([1.0, 1.0])), [1.0, 1.0])
+
+
+def test_force_store_reloads_the_social_reference_with_the_snapshot(tmp_path, monkeypatch):
+    cache = tmp_path / "force_vectors.npy"
+    weights = tmp_path / "force_weights.json"
+    reference = tmp_path / "social_reference.yaml"
+    save_force_vectors(cache, {"a": [1.0, 0.0], "b": [0.0, 1.0]})
+    weights.write_text('{"a": 1.0, "b": 1.0}', encoding="utf-8")
+    reference.write_text('sentences: ["one"]\n', encoding="utf-8")
+    embedded = []
+
+    def fake_embed_reference(path):
+        sentences = load_social_reference(path)
+        embedded.append(sentences)
+        return np.array([float(len(sentences)), 1.0])
+
+    monkeypatch.setattr(force_store, "embed_reference", fake_embed_reference)
+    store = ForceStore(cache, weights, check_interval=0, reference_path=reference)
+    calculator = HeightCalculator(
+        force_interaction=ForceInteraction(manager=ForceManager(store=store)),
+        penalties=PenaltyAggregator(),
+    )
+    assert store.current().social_reference is None
+    first = calculator.pinned()
+
+    reference.write_text('sentences: ["one", "two", "three"]\n', encoding="utf-8")
+    second = calculator.pinned()
+    assert embedded == [["one", "two", "three"]]
+    assert np.array_equal(second.penalties.reference(), [3.0, 1.0])
+    assert first.penalties.social_reference is None
+
+    weights.write_text('{"a": 2.0, "b": 1.0}', encoding="utf-8")
+    third = calculator.pinned()
+    assert len(embedded) == 1
+    assert third.force_interaction.manager.weight("a") == 2.0
+    assert np.array_equal(third.penalties.reference(), [3.0, 1.0])
+
+
+def test_float32_scoring_drift_is_bounded():
+    dim = 1536
+    calc64 = _synthetic_calculator(dim=dim)
+    calc32 = _synthetic_calculator(dim=dim, dtype=np.float32)
+    # Start where every force and the social reference score positively, so no
+    # term sits on its epsilon clamp and the comparison exercises real values.
+    current = (
+        calc64.force_interaction.manager.matrix().sum(axis=0)
+        + calc64.penalties.reference()
+    ) / 40
+    rng = np.random.default_rng(4)
+    candidates = current + 0.01 * rng.normal(size=(12, dim))
+
+    expected = calc64.incremental(current).heights(candidates)
+    heights = calc32.incremental(current.astype(np.float32)).heights(
+        candidates.astype(np.float32)
+    )
+    assert heights.dtype == np.float32
+    assert np.allclose(heights, expected, rtol=1e-5)
+    assert np.argmin(heights) == np.argmin(expected)
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.app.services.job_queue as job_queue
+from api.app.core.admission import AdmissionController
+from api.app.services.job_queue import JOB_CLIENT, JobQueue, JobStore
+
+SENTENCE = "Remote work empties downtown offices and revives small towns."
+
+
+class Interrupted(BaseException):
+    """Escapes JobQueue._execute like a killed process would, leaving the job running."""
+
+
+class InterruptingService:
+    """Service wrapper that dies before step `interrupt_at`."""
+
+    def __init__(self, service, interrupt_at: int) -> None:
+        self.service = service
+        self.simulator = service.simulator
+        self.interrupt_at = interrupt_at
+        self.starts = 0
+
+    def start_state(self, sentence, optimizer=None):
+        self.starts += 1
+        return self.service.start_state(sentence, optimizer=optimizer)
+
+    def advance_state(self, state, **kwargs):
+        if state.step == self.interrupt_at:
+            raise Interrupted()
+        return self.service.advance_state(state, **kwargs)
+
+    def decode_step(self, step_result):
+        return self.service.decode_step(step_result)
+
+
+class Clock:
+    """Stand-in for time.time that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return JobStore(tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def loop():
+    """An event loop on its own thread, standing in for the API's."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def _queue(store, service, tmp_path, loop, admission=None) -> JobQueue:
+    queue = JobQueue(
+        store, service, tmp_path / "runs", workers=0, admission=admission or AdmissionController()
+    )
+    queue.loop = loop
+    return queue
+
+
+@pytest.fixture
+def service(api_app):
+    from api.app.routes.simulate import service
+
+    return service
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_job_store_claims_by_priority_then_age(store):
+    low = store.create({"sentence": "a"}, total=1, priority=0)
+    high = store.create({"sentence": "b"}, total=1, priority=5)
+    later_low = store.create({"sentence": "c"}, total=1, priority=0)
+    assert low.status == "queued" and low.params == {"sentence": "a"}
+
+    claimed = [store.claim("worker") for _ in range(3)]
+    assert [job.id for job in claimed] == [high.id, low.id, later_low.id]
+    assert all(job.status == "running" and job.started_at for job in claimed)
+    assert all(job.owner == "worker" and job.heartbeat_at for job in claimed)
+    assert store.claim("worker") is None
+
+
+def test_job_store_cancels_queued_jobs_now_and_flags_running_ones(store):
+    queued = store.create({}, total=1, priority=0)
+    running = store.create({}, total=1, priority=1)
+    store.claim()
+
+    cancelled = store.request_cancel(queued.id)
+    assert cancelled.status == "cancelled" and cancelled.finished_at
+    flagged = store.request_cancel(running.id)
+    assert flagged.status == "running" and flagged.cancel_requested
+
+    assert store.request_cancel("missing") is None
+
+
+def test_job_store_requeues_only_jobs_whose_lease_expired(store, clock):
+    live = store.create({}, total=1, priority=1)
+    dead = store.create({}, total=1, priority=0)
+    store.claim("live-process")
+    store.claim("dead-process")
+
+    clock.now += 45
+    assert store.heartbeat("live-process") == 1
+    # A process starting now must not take over jobs another live process runs.
+    assert store.requeue_stale(lease_seconds=60) == 0
+
+    clock.now += 30  # the dead process last renewed its lease 75 s ago
+    assert store.requeue_stale(lease_seconds=60) == 1
+    assert store.get(live.id).status == "running"
+    requeued = store.get(dead.id)
+    assert (requeued.status, requeued.owner) == ("queued", None)
+    assert store.claim("new-process").id == dead.id
+
+
+def test_job_queue_resumes_from_the_last_recorded_step(store, service, tmp_path, loop, clock):
+    queue = _queue(store, service, tmp_path, loop)
+    job = store.create({"sentence": SENTENCE, "decode": True}, total=4, priority=0)
+
+    interrupting = InterruptingService(service, interrupt_at=2)
+    queue.service = interrupting
+    with pytest.raises(Interrupted):
+        queue._execute(store.claim(queue.owner))
+    first_run = _records(queue.run_path(job.id))
+    assert [record["step"] for record in first_run] == [0, 1]
+    assert store.get(job.id).progress == 2
+
+    # Once the dead process's lease expires, another one picks up after step 1.
+    clock.now += queue.lease_seconds + 1
+    assert store.requeue_stale(queue.lease_seconds) == 1
+    queue = _queue(store, service, tmp_path, loop)
+    resumed = InterruptingService(service, interrupt_at=None)
+    queue.service = resumed
+    queue._execute(store.claim(queue.owner))
+    records = _records(queue.run_path(job.id))
+    assert [record["step"] for record in records] == [0, 1, 2, 3]
+    assert records[:2] == first_run
+    assert resumed.starts == 0  # resumed from the stored vector, no re-embedding
+    assert all(record["summary"] for record in records)
+
+    finished = store.get(job.id)
+    assert (finished.status, finished.progress) == ("succeeded", 4)
+    assert queue.store_path(job.id).exists()
+
+
+def test_job_queue_stops_a_job_flagged_for_cancellation(store, service, tmp_path, loop):
+    queue = _queue(store, service, tmp_path, loop)
+    job = store.create({"sentence": SENTENCE}, total=3, priority=0)
+    claimed = store.claim(queue.owner)
+    store.request_cancel(job.id)
+    queue._execute(claimed)
+    assert store.get(job.id).status == "cancelled"
+    assert _records(queue.run_path(job.id)) == []
+
+
+def test_job_queue_stops_a_job_it_no_longer_owns(store, service, tmp_path, loop):
+    queue = _queue(store, service, tmp_path, loop)
+    job = store.create({"sentence": SENTENCE, "decode": False}, total=3, priority=0)
+    claimed = store.claim(queue.owner)
+    # Its lease lapsed and another process took the job over.
+    store.requeue_stale(lease_seconds=-1)
+    store.claim("other-process")
+    queue._execute(claimed)
+    assert _records(queue.run_path(job.id)) == []
+    assert store.get(job.id).status == "running"
+
+
+def test_job_queue_admits_every_engine_call(store, service, tmp_path, loop):
+    class RecordingController(AdmissionController):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.clients = []
+
+        async def acquire(self, client):
+            self.clients.append((client, self.active))
+            return await super().acquire(client)
+
+    admission = RecordingController(max_concurrency=1)
+    queue = _queue(store, service, tmp_path, loop, admission=admission)
+    job = store.create({"sentence": SENTENCE, "decode": False}, total=3, priority=0)
+    queue._execute(store.claim(queue.owner))
+
+    assert store.get(job.id).status == "succeeded"
+    # The start and three steps, each admitted once the previous slot was freed.
+    assert admission.clients == [(JOB_CLIENT, 0)] * 4
+    assert admission.active == 0
+
+
+@pytest.fixture
+def client(api_app):
+    with TestClient(api_app) as client:
+        yield client
+
+
+def test_job_routes_submit_and_stream_results(client):
+    response = client.post("/api/jobs", json={"sentence": SENTENCE, "steps": 3})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued" and job["total"] == 3
+
+    stream = client.get(f"/api/jobs/{job['id']}/stream")
+    lines = [json.loads(line) for line in stream.text.splitlines()]
+    assert [line["step"] for line in lines[:-1]] == [0, 1, 2]
+    assert all(line["summary"] for line in lines[:-1])
+    status = lines[-1]
+    assert status["type"] == "status"
+    assert (status["id"], status["status"], status["progress"]) == (job["id"], "succeeded", 3)
+
+    assert client.get(f"/api/jobs/{job['id']}").json()["status"] == "succeeded"
+
+
+def test_job_routes_reject_unknown_ids_and_oversized_jobs(client):
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.delete("/api/jobs/missing").status_code == 404
+    assert client.get("/api/jobs/missing/stream").status_code == 404
+    response = client.post("/api/jobs", json={"sentence": SENTENCE, "steps": 10_000})
+    assert response.status_code == 422
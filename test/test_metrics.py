@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.utils.metrics import MetricsRegistry, span, timed
+
+SENTENCE = "Cities introduce a universal basic income funded by automation taxes."
+
+
+def _steps(count: int):
+    for step in range(count):
+        with span("sample"):
+            pass
+        with span("score"):
+            pass
+        yield step
+
+
+def test_timed_steps_collect_their_own_stage_timings():
+    steps = list(timed(_steps(2)))
+    assert [step for step, _ in steps] == [0, 1]
+    for _, timings in steps:
+        assert set(timings.seconds()) == {"sample", "score"}
+        assert "sample;dur=" in timings.server_timing()
+
+
+def test_histogram_quantiles_and_prometheus_export():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency", labels=("stage",), buckets=(0.1, 1.0)
+    )
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value, stage="llm")
+    registry.counter("calls_total", "Calls", labels=("endpoint",)).inc(endpoint="chat")
+
+    assert histogram.quantile(0.5, stage="llm") == 0.1
+    assert histogram.quantile(0.99, stage="llm") == 1.0
+    text = registry.render_prometheus()
+    assert 'latency_seconds_bucket{stage="llm",le="0.1"} 2.0' in text
+    assert 'latency_seconds_bucket{stage="llm",le="+Inf"} 4.0' in text
+    assert 'latency_seconds_count{stage="llm"} 4.0' in text
+    assert 'calls_total{endpoint="chat"} 1.0' in text
+
+
+@pytest.fixture
+def client(api_app):
+    with TestClient(api_app) as client:
+        yield client
+
+
+def test_server_timing_reports_engine_stages_and_total(client):
+    response = client.post("/api/simulate", json={"sentence": SENTENCE})
+    assert response.status_code == 200
+    entries = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    # Spans computed on the engine executor reach the request's collector.
+    assert {"embed", "sample", "score"} <= set(entries)
+    assert entries[-1] == "total"
+
+    assert client.get("/api/health").headers["server-timing"].startswith("total;dur=")
+
+
+def test_metrics_endpoint_exports_http_and_stage_latency(client):
+    client.post("/api/simulate", json={"sentence": SENTENCE})
+    response = client.get("/api/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'forcepath_http_request_seconds_count{method="POST",handler="simulate"' in text
+    assert 'forcepath_stage_seconds_count{stage="score"}' in text
@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api.app.core.profiling as profiling_middleware
+from src.utils.profiling import ProfileSession, profiled
+
+SENTENCE = "Remote work empties downtown offices and revives small towns."
+TOKEN = "profile-secret"
+
+
+def _steps(count: int):
+    for step in range(count):
+        sum(range(1000))
+        yield step
+
+
+def test_profiled_steps_are_saved_only_for_an_active_session(tmp_path):
+    run = profiled(_steps)
+    assert list(run(2)) == [0, 1]
+
+    session = ProfileSession("req-1")
+    assert session.save(tmp_path) is None
+    with session.activate():
+        steps = run(2)
+    # Work happens when items are produced, not when the generator is created.
+    with session.activate():
+        assert list(steps) == [0, 1]
+    path = session.save(tmp_path)
+    assert path == tmp_path / "req-1.pstats"
+    assert path.stat().st_size > 0
+
+
+def test_sampled_profiles_are_written_as_collapsed_stacks(tmp_path):
+    session = ProfileSession("req-2", mode="sample", interval=0.001)
+    with session.activate():
+        with session.record():
+            sum(i * i for i in range(300_000))
+    path = session.save(tmp_path)
+    assert path == tmp_path / "req-2.collapsed"
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in path.read_text().splitlines())
+
+
+@pytest.fixture
+def client(api_app, tmp_path, monkeypatch):
+    settings = profiling_middleware.get_settings().model_copy(
+        update={"profile_token": TOKEN, "profiles_dir": str(tmp_path)}
+    )
+    monkeypatch.setattr(profiling_middleware, "get_settings", lambda: settings)
+    with TestClient(api_app) as client:
+        yield client
+
+
+def test_profiling_middleware_profiles_requests_with_the_token(client, tmp_path):
+    response = client.post(
+        "/api/simulate",
+        json={"sentence": SENTENCE},
+        headers={"X-Profile": TOKEN, "X-Request-Id": "slow-request"},
+    )
+    assert response.status_code == 200
+    assert response.headers["x-profile-id"] == "slow-request"
+    assert (tmp_path / "slow-request.pstats").stat().st_size > 0
+
+
+def test_profiling_middleware_ignores_wrong_tokens_and_rejects_unknown_modes(client, tmp_path):
+    response = client.post(
+        "/api/simulate", json={"sentence": SENTENCE}, headers={"X-Profile": "guess"}
+    )
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+    response = client.post(
+        "/api/simulate",
+        json={"sentence": SENTENCE},
+        headers={"X-Profile": TOKEN, "X-Profile-Mode": "perf"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unknown profile mode: perf")
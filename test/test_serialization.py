@@ -0,0 +1,122 @@
+import gzip
+import json
+import math
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.app.core import serialization
+from api.app.core.serialization import (
+    NDJSON_MEDIA_TYPE,
+    CompressionMiddleware,
+    FastJSONResponse,
+    decode_vector,
+    encode_vector,
+    negotiate_encoding,
+)
+
+PAYLOAD = {"values": list(range(500))}
+
+
+@pytest.fixture
+def fake_brotli(monkeypatch):
+    """Brotli stand-in, so negotiation and headers are testable without the package."""
+    fake = SimpleNamespace(compress=lambda body, quality: b"br:" + zlib.compress(body))
+    monkeypatch.setattr(serialization, "brotli", fake)
+    return fake
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large():
+        return FastJSONResponse(PAYLOAD)
+
+    @app.get("/small")
+    async def small():
+        return FastJSONResponse({"ok": True})
+
+    @app.get("/stream")
+    async def stream():
+        lines = (json.dumps({"step": step}).encode() + b"\n" for step in range(200))
+        return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+    app.add_middleware(CompressionMiddleware, minimum_size=256)
+    return TestClient(app)
+
+
+def _raw(client, path, accept_encoding):
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response.headers, b"".join(response.iter_raw())
+
+
+def test_negotiate_encoding_prefers_brotli_and_honours_quality(fake_brotli):
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("br;q=0, *") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_negotiate_encoding_without_brotli_installed(monkeypatch):
+    monkeypatch.setattr(serialization, "brotli", None)
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("br, gzip") == "gzip"
+
+
+def test_compression_gzips_large_responses(client):
+    headers, body = _raw(client, "/large", "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == PAYLOAD
+
+
+def test_compression_uses_brotli_when_negotiated(client, fake_brotli):
+    headers, body = _raw(client, "/large", "gzip, br")
+    assert headers["content-encoding"] == "br"
+    assert json.loads(zlib.decompress(body[len(b"br:"):])) == PAYLOAD
+
+
+def test_compression_skips_small_bodies_streams_and_unaccepting_clients(client):
+    headers, body = _raw(client, "/small", "gzip")
+    assert "content-encoding" not in headers
+    assert json.loads(body) == {"ok": True}
+
+    headers, body = _raw(client, "/stream", "gzip")
+    assert "content-encoding" not in headers
+    assert len(body.splitlines()) == 200
+
+    headers, body = _raw(client, "/large", "identity")
+    assert "content-encoding" not in headers
+    assert json.loads(body) == PAYLOAD
+
+
+def test_encode_vector_base64_f16_round_trip():
+    vector = np.linspace(-2.0, 2.0, 37, dtype=np.float32)
+    payload = encode_vector(vector, "base64_f16")
+    assert payload["encoding"] == "base64_f16"
+    assert payload["shape"] == [37]
+    assert len(payload["data"]) == 4 * math.ceil(37 * 2 / 3)  # two bytes per element
+    decoded = decode_vector(json.loads(json.dumps(payload)))
+    assert decoded.dtype == np.float32
+    assert np.allclose(decoded, vector, atol=2e-3)
+
+    matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+    assert np.array_equal(decode_vector(encode_vector(matrix, "base64_f16")), matrix)
+
+
+def test_encode_vector_list_and_unknown_encodings():
+    assert encode_vector(None, "base64_f16") is None
+    assert encode_vector(np.array([1.0, 2.0])) == [1.0, 2.0]
+    assert decode_vector([1.0, 2.0]).tolist() == [1.0, 2.0]
+    with pytest.raises(ValueError, match="Unknown vector encoding"):
+        encode_vector([1.0], "base85")
@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.app.services.session_store as session_store
+from api.app.services.session_store import SessionStore
+
+SENTENCE = "A drought forces villages to share water through local councils."
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_session_store_get_refreshes_ttl_and_expired_sessions_drop(clock):
+    store = SessionStore(max_sessions=4, ttl_seconds=10)
+    session = store.create("state")
+    clock.now += 8
+    assert store.get(session.session_id).value == "state"
+    clock.now += 8  # 16 s after creation, but only 8 s after the last access
+    assert store.get(session.session_id) is not None
+    clock.now += 10
+    assert store.get(session.session_id) is None
+    assert len(store) == 0
+
+
+def test_session_store_evicts_least_recently_used_at_capacity(clock):
+    store = SessionStore(max_sessions=2, ttl_seconds=10)
+    first = store.create(1)
+    second = store.create(2)
+    store.get(first.session_id)
+    third = store.create(3)
+    assert store.get(second.session_id) is None
+    assert store.get(first.session_id).value == 1
+    assert store.get(third.session_id).value == 3
+    assert len(store) == 2
+
+
+def test_session_store_delete(clock):
+    store = SessionStore()
+    session = store.create("state")
+    assert store.delete(session.session_id)
+    assert not store.delete(session.session_id)
+    assert store.get(session.session_id) is None
+
+
+@pytest.fixture
+def client(api_app):
+    with TestClient(api_app) as client:
+        yield client
+
+
+@pytest.fixture
+def sessions(api_app, monkeypatch):
+    """A small, empty session store in place of the transition service's."""
+    from api.app.routes.transition import service
+
+    store = SessionStore(max_sessions=2, ttl_seconds=60)
+    monkeypatch.setattr(service, "sessions", store)
+    return store
+
+
+def _create(client) -> dict:
+    response = client.post("/api/transition/sessions", json={"sentence": SENTENCE})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_session_routes_create_advance_and_close(client, sessions):
+    created = _create(client)
+    assert created["success"] and created["step"] == 0
+    assert created["ttl_seconds"] == 60
+    session_id = created["session_id"]
+
+    for expected_step in (0, 1):
+        response = client.post(f"/api/transition/{session_id}")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["session_id"] == session_id
+        assert body["step"]["step"] == expected_step
+        assert body["step"]["summary"]
+
+    verbose = client.post(f"/api/transition/{session_id}", params={"verbose": True}).json()
+    assert verbose["step"]["step"] == 2 and "force_scores" in verbose["step"]
+
+    assert client.delete(f"/api/transition/{session_id}").json() == {
+        "success": True,
+        "session_id": session_id,
+    }
+    assert client.post(f"/api/transition/{session_id}").status_code == 404
+    assert client.delete(f"/api/transition/{session_id}").status_code == 404
+
+
+def test_session_routes_return_404_for_unknown_and_expired_sessions(client, sessions, clock):
+    response = client.post("/api/transition/does-not-exist")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown or expired session: does-not-exist"
+
+    session_id = _create(client)["session_id"]
+    clock.now += 61
+    assert client.post(f"/api/transition/{session_id}").status_code == 404
+    assert len(sessions) == 0
+
+
+def test_session_routes_evict_the_oldest_session_beyond_capacity(client, sessions):
+    oldest, middle, newest = (_create(client)["session_id"] for _ in range(3))
+    assert len(sessions) == 2
+    assert client.post(f"/api/transition/{oldest}").status_code == 404
+    assert client.post(f"/api/transition/{middle}").status_code == 200
+    assert client.post(f"/api/transition/{newest}").status_code == 200
@@ -126,3 +126,57 @@ export async function runSimulation(payload: SimulationPayload): Promise<StepRes
         }
     }
 }
+
+export type ChannelCommand =
+    | { type: 'start'; sentence: string; budget?: number; optimizer?: 'cma' | 'gradient'; verbose?: boolean }
+    | { type: 'step'; count?: number }
+    | { type: 'pause' }
+    | { type: 'budget'; steps: number }
+    | { type: 'cancel' };
+
+export type ChannelEvent =
+    | { type: 'started'; step: number; budget: number }
+    | ({ type: 'step'; budget: number } & Omit<StepResult, 'summary'> & { best_height: number })
+    | { type: 'decoded'; step: number; summary: string | null }
+    | { type: 'paused'; step: number; budget: number }
+    | { type: 'idle'; step: number }
+    | { type: 'cancelled' }
+    | { type: 'error'; detail: string };
+
+export interface SimulationChannel {
+    send: (command: ChannelCommand) => void;
+    close: () => void;
+}
+
+/**
+ * Open the interactive simulation WebSocket (`/api/ws/simulate`).
+ * The server keeps one engine session per connection; closing the channel
+ * (e.g. when the user navigates away) cancels any pending steps.
+ */
+export function openSimulationChannel(onEvent: (event: ChannelEvent) => void): SimulationChannel {
+    const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/api/ws/simulate`);
+    const pending: string[] = [];
+
+    socket.onopen = () => {
+        pending.splice(0).forEach((message) => socket.send(message));
+    };
+    socket.onmessage = (message) => {
+        try {
+            onEvent(JSON.parse(message.data) as ChannelEvent);
+        } catch (e) {
+            console.warn('Failed to parse channel event:', message.data, e);
+        }
+    };
+
+    return {
+        send: (command) => {
+            const message = JSON.stringify(command);
+            if (socket.readyState === WebSocket.OPEN) {
+                socket.send(message);
+            } else {
+                pending.push(message);
+            }
+        },
+        close: () => socket.close(),
+    };
+}